@@ -2,8 +2,14 @@ const { app, BrowserWindow } = require('electron');
 const { spawn } = require('child_process');
 const path = require('path');
 
+// run_app.py imprime "BLURKIT_READY <url>" cuando /healthz responde 200
+const READY_MARKER = 'BLURKIT_READY';
+const READY_TIMEOUT_MS = 60000;
+
 let flaskProcess = null;
 let mainWindow = null;
+let flaskUrl = 'http://127.0.0.1:5000';
+let flaskReady = false;
 
 function createWindow() {
   mainWindow = new BrowserWindow({
@@ -17,10 +23,10 @@ function createWindow() {
     autoHideMenuBar: true
   });
 
-  // Esperar a que Flask inicie antes de cargar
-  setTimeout(() => {
-    mainWindow.loadURL('http://127.0.0.1:5000');
-  }, 2000);
+  // Cargar cuando Flask avise de que está listo (o ya avisó)
+  if (flaskReady) {
+    mainWindow.loadURL(flaskUrl);
+  }
 
   mainWindow.on('closed', () => {
     mainWindow = null;
@@ -28,6 +34,13 @@ function createWindow() {
   });
 }
 
+function onFlaskReady(url) {
+  if (flaskReady) return;
+  flaskReady = true;
+  if (url) flaskUrl = url;
+  if (mainWindow) mainWindow.loadURL(flaskUrl);
+}
+
 function killFlaskProcess() {
   if (!flaskProcess) return;
   
@@ -68,10 +81,27 @@ function startFlask() {
     detached: false  // Importante: no detach para poder matar el proceso
   });
 
+  let stdoutBuffer = '';
   flaskProcess.stdout.on('data', (data) => {
     console.log(`Flask: ${data}`);
+    stdoutBuffer += data.toString();
+    const lines = stdoutBuffer.split(/\r?\n/);
+    stdoutBuffer = lines.pop();
+    for (const line of lines) {
+      if (line.startsWith(READY_MARKER)) {
+        onFlaskReady(line.slice(READY_MARKER.length).trim());
+      }
+    }
   });
 
+  // Ejecutables antiguos o un arranque bloqueado: cargar igualmente
+  setTimeout(() => {
+    if (!flaskReady) {
+      console.error('Flask did not report ready in time, loading anyway');
+      onFlaskReady();
+    }
+  }, READY_TIMEOUT_MS);
+
   flaskProcess.stderr.on('data', (data) => {
     console.error(`Flask Error: ${data}`);
   });
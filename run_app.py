@@ -1,8 +1,11 @@
 """Launcher script for BlurkitTool - Opens Flask app in browser"""
 import webbrowser
+import socket
 import time
 import sys
 import os
+import urllib.error
+import urllib.request
 from pathlib import Path
 from threading import Thread
 
@@ -15,34 +18,82 @@ else:
     # Running in normal Python
     bundle_dir = Path(__file__).parent
 
-# Add paths
-sys.path.insert(0, str(bundle_dir))
+# Los módulos de web/ se importan entre sí como módulos de primer nivel
+# (models, mod_index...), así que la app también: importarla como web.app
+# la dejaba cargable con dos nombres distintos
 sys.path.insert(0, str(Path(bundle_dir) / 'web'))
 
-# Importar Flask primero
-import flask
-from flask import Flask, render_template, request, redirect, url_for
+PORT = int(os.environ.get('BLURKIT_PORT', 5000))
+URL = f'http://127.0.0.1:{PORT}'
+# Línea que main.js espera en stdout para cargar la ventana
+READY_MARKER = 'BLURKIT_READY'
 
-# Ahora importar la aplicación
-import web.app as webapp
-app = webapp.app
 
-def open_browser():
-    """Open browser after 1.5 seconds"""
-    time.sleep(1.5)
-    webbrowser.open('http://127.0.0.1:5000')
+def wait_for_server(port, timeout=30.0):
+    """Wait until the server accepts connections; True if it did."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def wait_until_ready(port, timeout=60.0):
+    """Poll /healthz until the app reports it is warm; True if it did."""
+    deadline = time.monotonic() + timeout
+    if not wait_for_server(port, timeout):
+        return False
+    # Sin proxies del sistema: la petición es a localhost
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    while time.monotonic() < deadline:
+        try:
+            with opener.open(f'http://127.0.0.1:{port}/healthz', timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except urllib.error.HTTPError as e:
+            e.close()  # 503 mientras se calienta
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def announce_ready(open_in_browser):
+    """Print the readiness line (and open the browser) once the app is warm"""
+    ready = wait_until_ready(PORT)
+    if ready:
+        print(f"{READY_MARKER} {URL}", flush=True)
+    else:
+        print("La aplicación no respondió a tiempo en /healthz", flush=True)
+    if open_in_browser:
+        webbrowser.open(URL)
 
 if __name__ == '__main__':
+    # Necesario para el pool de procesos de /api/analyze_batch en el ejecutable
+    # de PyInstaller (Windows arranca los workers relanzando este script)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # Importar la aplicación solo en el proceso principal: los workers del
+    # pool no deben volver a inicializar la app ni la base de datos
+    import app as webapp
+    from serve import serve
+    app = webapp.app
+
     # Detectar si se pasó --no-browser como argumento (desde Electron)
     no_browser = '--no-browser' in sys.argv
     
+    Thread(target=announce_ready, args=(not no_browser,), daemon=True).start()
     if not no_browser:
-        # Start browser in background
-        Thread(target=open_browser, daemon=True).start()
         print("Abriendo en el navegador...")
     else:
         print("Ejecutando desde Electron (sin abrir navegador)...")
     
-    # Run Flask (without debug mode for production)
+    # Servidor WSGI con pool de hilos (waitress también funciona en Windows);
+    # start_worker pone en marcha la base de datos y los índices en segundo plano
     print("Iniciando BlurkitTool...")
-    app.run(port=5000, debug=False)
+    serve(app, host='127.0.0.1', port=PORT, server=os.environ.get('WEB_SERVER', 'waitress'),
+          on_start=webapp.start_worker)
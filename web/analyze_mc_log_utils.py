@@ -1,18 +1,45 @@
 import sys
 import re
 import json
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
+# ---------------------------------------------------------------------------
+# Patrones precompilados (se compilan una sola vez al importar el módulo)
+# ---------------------------------------------------------------------------
+_PLAYER_USER_RE = re.compile(r"Setting user: ([^\s]+)")
+_PLAYER_CONTENT_RE = re.compile(r"Loaded content for \[([^\]]+)\]")
+# Prioridades de extract_mc_version (la 0 gana sobre la 1, etc.);
+# la 2 solo se aplica a líneas del loader, la 3 a cualquier línea
+_MC_VERSION_RE = re.compile(r"(1\.[0-9]+(\.[0-9]+)?)")
+_VERSION_RES = [
+    re.compile(r"minecraft[\s:=-]*v?(1\.[0-9]+(\.[0-9]+)?)", re.IGNORECASE),
+    re.compile(r"version[\s:=-]*v?(1\.[0-9]+(\.[0-9]+)?)", re.IGNORECASE),
+    _MC_VERSION_RE,
+    _MC_VERSION_RE,
+]
+_LOADER_WORDS = ("fabricloader", "loader", "forge", "fabric")
+_LUNAR_CLIENT_RE = re.compile(r"lunar ?client", re.IGNORECASE)
+_LOADING_MODS_RE = re.compile(r"Loading \d+ mods")
+_LOADING_ENTRY_RE = re.compile(r"[|\\\-]*\s*([\w\-\.]+)\s+([\w\-\.\+]+)")
+_CONFIG_FILE_RE = re.compile(r"Loaded configuration file for ([\w\-]+):")
+_ENTRYPOINT_RE = re.compile(r"Found Entrypoint\(.*\) ([\w\.]+)\.([A-Z][\w]+)")
+_FABRIC_RESOURCES_RE = re.compile(r"fabric \(([^)]+)\)")
+_ADDED_BY_MODS_RE = re.compile(r"added by mods \[([^\]]+)\]")
+_MIXIN_RULE_RE = re.compile(r"as rule '.*' \(added by mods \[([\w\-, ]+)\]\)")
+_MOD_JAR_RE = re.compile(r"mods/([\w\-]+)-[\d\w.\-+]+\.jar")
+_MOD_INITIALIZED_RE = re.compile(r"Mod '([\w\-]+)' initialized")
+_BY_MOD_RE = re.compile(r"by mod '([\w\-]+)'")
+_PIPELINE_RE = re.compile(r"Pipeline for mod: ([\w\-]+)")
 
 
 def extract_player(log_lines: List[str]) -> str:
     for line in log_lines:
         if "Setting user:" in line:
-            match = re.search(r"Setting user: ([^\s]+)", line)
+            match = _PLAYER_USER_RE.search(line)
             if match:
                 return match.group(1)
         if "Loaded content for [" in line:
-            match = re.search(r"Loaded content for \[([^\]]+)\]", line)
+            match = _PLAYER_CONTENT_RE.search(line)
             if match:
                 return match.group(1)
     return None
@@ -20,175 +47,163 @@ def extract_player(log_lines: List[str]) -> str:
 def extract_mc_version(log_lines: List[str]) -> str:
     # 1. Buscar líneas que contengan 'minecraft' y una versión
     for line in log_lines:
-        match = re.search(r"minecraft[\s:=-]*v?(1\.[0-9]+(\.[0-9]+)?)", line, re.IGNORECASE)
+        match = _VERSION_RES[0].search(line)
         if match:
             return match.group(1)
     # 2. Buscar líneas con 'version' y un patrón de versión
     for line in log_lines:
-        match = re.search(r"version[\s:=-]*v?(1\.[0-9]+(\.[0-9]+)?)", line, re.IGNORECASE)
+        match = _VERSION_RES[1].search(line)
         if match:
             return match.group(1)
     # 3. Buscar cualquier patrón 1.x.x en líneas que mencionen fabricloader, loader, etc.
     for line in log_lines:
-        if any(word in line.lower() for word in ["fabricloader", "loader", "forge", "fabric"]):
-            match = re.search(r"(1\.[0-9]+(\.[0-9]+)?)", line)
+        lower_line = line.lower()
+        if any(word in lower_line for word in _LOADER_WORDS):
+            match = _MC_VERSION_RE.search(line)
             if match:
                 return match.group(1)
     # 4. Fallback: cualquier 1.x.x en el log
     for line in log_lines:
-        match = re.search(r"(1\.[0-9]+(\.[0-9]+)?)", line)
+        match = _MC_VERSION_RE.search(line)
         if match:
             return match.group(1)
     return None
 
-def extract_mods(log_lines: List[str]) -> List[Dict[str, Any]]:
-    mods = set()
+DEPENDENCY_PATTERNS = [
+    r"^fabric(-|$)", r"^fabricloader$", r"^fabric-api", r"^mixinextras$", r"^org_", r"^io_", r"^net_", r"^com_", r"^org\\.", r"^io\\.", r"^net\\.", r"^com\\.", r"^antlr", r"^jcpp$", r"^glsl", r"^resource-loader", r"^lwjgl", r"^block-view", r"^key-binding", r"^command-api", r"^lifecycle-events", r"^rendering-", r"^events-", r"^base$", r"^v[0-9]+$", r"^common$", r"^indigo$", r"^attachment$", r"^exampleinits$", r"^customingredientsync$", r"^customingredientinit$", r"^legacyhandler$", r"^lootinitializer$", r"^resourceconditionsimpl$", r"^packagemanager$", r"^modinitializer$", r"^pipeline$", r"^renderingcallbackinvoker$"
+]
+
+EXPLICIT_MODS = ["Lithium", "Sodium", "Iris", "Krypton", "Indium", "ModMenu", "MoreCulling", "SodiumExtra", "FabricSkyBoxes", "WorldEdit"]
+_EXPLICIT_MODS_LOWER = [(mod.lower(), mod) for mod in EXPLICIT_MODS]
+
+# Fragmentos de paquete que no identifican a un mod en los Entrypoint
+ENTRYPOINT_SKIP = {"net", "fabricmc", "fabric", "impl", "client", "main", "shared", "exampleinits", "init", "initializer", "indigo", "networking", "screenhandler", "event", "lookup", "handler", "convention", "attachment", "router", "sync", "conditions", "invoker", "base", "v0", "v1", "v2", "common", "customingredientsync", "customingredientinit", "legacyhandler", "lootinitializer", "resourceconditionsimpl", "packagemanager", "modinitializer", "pipeline", "renderingcallbackinvoker"}
+
+
+# Todos los patrones de dependencias fusionados en una sola alternancia
+# (una búsqueda por nombre en lugar de ~40)
+DEPENDENCY_RE = re.compile("|".join(f"(?:{pat})" for pat in DEPENDENCY_PATTERNS), re.IGNORECASE)
+
+
+def is_dependency(mod_name: str) -> bool:
+    return DEPENDENCY_RE.search(mod_name) is not None
+
+
+def _entrypoint_mod(package_path: str, class_name: str):
+    """Heurística: deduce el nombre del mod a partir del paquete de un Entrypoint."""
+    parts = package_path.split('.')
+    mod_candidate = None
+    # Si hay un fragmento tipo 'mods.<modname>' o 'mod.<modname>'
+    for i, part in enumerate(parts):
+        if part in ("mods", "mod") and i+1 < len(parts):
+            mod_candidate = parts[i+1]
+            break
+    # Si no, tomar el último fragmento que no sea fabricmc/fabric/impl/client/etc
+    if not mod_candidate:
+        filtered = [p for p in parts if p not in ENTRYPOINT_SKIP]
+        if filtered:
+            mod_candidate = filtered[-1]
+    # Si aún no, usar el class_name
+    if not mod_candidate:
+        mod_candidate = class_name
+    # Evitar duplicados y nombres genéricos
+    if mod_candidate and len(mod_candidate) > 2 and mod_candidate.lower() not in ENTRYPOINT_SKIP:
+        return mod_candidate
+    return None
+
+
+def extract_mods(log_lines: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Extrae mods y dependencias recorriendo el log una sola vez.
+
+    Acepta cualquier iterable de líneas (lista, archivo abierto, generador),
+    así que los logs grandes no necesitan estar completos en memoria.
+    """
     mod_details = {}
-    dependencies = set()
-    dependency_patterns = [
-        r"^fabric(-|$)", r"^fabricloader$", r"^fabric-api", r"^mixinextras$", r"^org_", r"^io_", r"^net_", r"^com_", r"^org\\.", r"^io\\.", r"^net\\.", r"^com\\.", r"^antlr", r"^jcpp$", r"^glsl", r"^resource-loader", r"^lwjgl", r"^block-view", r"^key-binding", r"^command-api", r"^lifecycle-events", r"^rendering-", r"^events-", r"^base$", r"^v[0-9]+$", r"^common$", r"^indigo$", r"^attachment$", r"^exampleinits$", r"^customingredientsync$", r"^customingredientinit$", r"^legacyhandler$", r"^lootinitializer$", r"^resourceconditionsimpl$", r"^packagemanager$", r"^modinitializer$", r"^pipeline$", r"^renderingcallbackinvoker$"
-    ]
-    def is_dependency(mod_name):
-        for pat in dependency_patterns:
-            if re.search(pat, mod_name, re.IGNORECASE):
-                return True
-        return False
-    # 1. Detectar bloque "Loading X mods:" (Fabric/Forge)
+
+    def add(mod_name):
+        if mod_name not in mod_details:
+            mod_details[mod_name] = {}
+
     loading_mods = False
     for line in log_lines:
-        if re.search(r"Loading \d+ mods", line):
+        # 1. Detectar bloque "Loading X mods:" (Fabric/Forge)
+        # (las demás heurísticas se aplican también a la cabecera y al cierre del bloque)
+        if "Loading " in line and _LOADING_MODS_RE.search(line):
             loading_mods = True
-            continue
-        if loading_mods:
+        elif loading_mods:
+            stripped = line.strip()
             # Fin del bloque si la línea empieza con [ o está vacía
-            if line.strip().startswith("[") or not line.strip():
+            if stripped.startswith("[") or not stripped:
                 loading_mods = False
-                continue
-            # Detectar mods y dependencias anidadas
-            # Ejemplo: "- sodium 0.4.10", "|-- fabric-api-base 0.4.31+1802ada577", "\-- mixinextras 0.5.0"
-            m = re.match(r"[|\\\-]*\s*([\w\-\.]+)\s+([\w\-\.\+]+)", line.strip())
-            if m:
-                mod_name = m.group(1)
-                mod_ver = m.group(2)
+            else:
+                # Detectar mods y dependencias anidadas
+                # Ejemplo: "- sodium 0.4.10", "|-- fabric-api-base 0.4.31+1802ada577", "\-- mixinextras 0.5.0"
+                m = _LOADING_ENTRY_RE.match(stripped)
                 # Ignorar entradas genéricas
-                if mod_name.lower() in ["java", "minecraft"]:
-                    continue
-                mods.add(mod_name)
-                if mod_name not in mod_details:
-                    mod_details[mod_name] = {}
-                if mod_ver:
-                    mod_details[mod_name]["version"] = mod_ver
-    # 2. "Loaded configuration file for X:"
-    for line in log_lines:
-        m = re.search(r"Loaded configuration file for ([\w\-]+):", line)
-        if m:
-            mod_name = m.group(1)
-            mods.add(mod_name)
-            if mod_name not in mod_details:
-                mod_details[mod_name] = {}
-    # 3. Mods explícitos por nombre
-    explicit_mods = ["Lithium", "Sodium", "Iris", "Krypton", "Indium", "ModMenu", "MoreCulling", "SodiumExtra", "FabricSkyBoxes", "WorldEdit"]
-    for line in log_lines:
-        for mod in explicit_mods:
-            if mod.lower() in line.lower():
-                mods.add(mod)
-                if mod not in mod_details:
-                    mod_details[mod] = {}
-    # 3b. Mods detectados por Entrypoint (Fabric/Lunar)
-    # Ejemplo: Found Entrypoint(main) net.fabricmc.fabric.impl.lookup.ApiLookupImpl
-    entrypoint_pattern = re.compile(r"Found Entrypoint\(.*\) ([\w\.]+)\.([A-Z][\w]+)")
-    for line in log_lines:
-        m = entrypoint_pattern.search(line)
-        if m:
-            # Heurística: tomar el penúltimo fragmento del paquete como nombre de mod si es posible
-            package_path = m.group(1)
-            class_name = m.group(2)
-            # Dividir el paquete por puntos
-            parts = package_path.split('.')
-            # Buscar el nombre de mod más probable
-            mod_candidate = None
-            # Si hay un fragmento tipo 'mods.<modname>' o 'mod.<modname>'
-            for i, part in enumerate(parts):
-                if part in ("mods", "mod") and i+1 < len(parts):
-                    mod_candidate = parts[i+1]
-                    break
-            # Si no, tomar el último fragmento que no sea fabricmc/fabric/impl/client/etc
-            if not mod_candidate:
-                skip = {"net", "fabricmc", "fabric", "impl", "client", "main", "shared", "exampleinits", "init", "initializer", "indigo", "networking", "screenhandler", "event", "lookup", "handler", "convention", "attachment", "router", "sync", "conditions", "invoker", "base", "v0", "v1", "v2", "common", "customingredientsync", "customingredientinit", "legacyhandler", "lootinitializer", "resourceconditionsimpl", "packagemanager", "modinitializer", "pipeline", "renderingcallbackinvoker"}
-                filtered = [p for p in parts if p not in skip]
-                if filtered:
-                    mod_candidate = filtered[-1]
-            # Si aún no, usar el class_name
-            if not mod_candidate:
-                mod_candidate = class_name
-            # Evitar duplicados y nombres genéricos
-            if mod_candidate and len(mod_candidate) > 2 and mod_candidate.lower() not in skip:
-                mods.add(mod_candidate)
-                if mod_candidate not in mod_details:
-                    mod_details[mod_candidate] = {}
-    # 4. Fabric/Forge mods en ResourceManager
-    for line in log_lines:
-        m = re.search(r"fabric \(([^)]+)\)", line)
-        if m:
-            for mod in m.group(1).split(","):
-                mod_name = mod.strip().split()[0]
-                mods.add(mod_name)
-                if mod_name not in mod_details:
-                    mod_details[mod_name] = {}
-    # 5. Forge/Fabric mods en "added by mods [...]"
-    for line in log_lines:
-        mod_match = re.findall(r"added by mods \[([^\]]+)\]", line)
-        for group in mod_match:
-            for mod in group.split(","):
-                mod_name = mod.strip()
-                mods.add(mod_name)
-                if mod_name not in mod_details:
-                    mod_details[mod_name] = {}
-    # 6. Mods en rutas de archivos .jar
-    for line in log_lines:
-        jar_matches = re.findall(r"mods/([\w\-]+)-[\d\w.\-+]+\.jar", line)
-        for mod_name in jar_matches:
-            mods.add(mod_name)
-            if mod_name not in mod_details:
-                mod_details[mod_name] = {}
-    # 7. Mods en mensajes de compatibilidad, inicialización, pipeline, etc.
-    for line in log_lines:
+                if m and m.group(1).lower() not in ["java", "minecraft"]:
+                    mod_name = m.group(1)
+                    add(mod_name)
+                    mod_details[mod_name]["version"] = m.group(2)
+        # 2. "Loaded configuration file for X:"
+        if "Loaded configuration file for " in line:
+            m = _CONFIG_FILE_RE.search(line)
+            if m:
+                add(m.group(1))
+        # 3. Mods explícitos por nombre
+        lower_line = line.lower()
+        for mod_lower, mod in _EXPLICIT_MODS_LOWER:
+            if mod_lower in lower_line:
+                add(mod)
+        # 3b. Mods detectados por Entrypoint (Fabric/Lunar)
+        # Ejemplo: Found Entrypoint(main) net.fabricmc.fabric.impl.lookup.ApiLookupImpl
+        if "Found Entrypoint(" in line:
+            m = _ENTRYPOINT_RE.search(line)
+            if m:
+                mod_candidate = _entrypoint_mod(m.group(1), m.group(2))
+                if mod_candidate:
+                    add(mod_candidate)
+        # 4. Fabric/Forge mods en ResourceManager
+        if "fabric (" in line:
+            m = _FABRIC_RESOURCES_RE.search(line)
+            if m:
+                for mod in m.group(1).split(","):
+                    add(mod.strip().split()[0])
+        if "added by mods [" in line:
+            # 5. Forge/Fabric mods en "added by mods [...]"
+            for group in _ADDED_BY_MODS_RE.findall(line):
+                for mod in group.split(","):
+                    add(mod.strip())
+            # 8. Mods en advertencias o errores relacionados con mods
+            m = _MIXIN_RULE_RE.search(line)
+            if m:
+                for mod_name in m.group(1).split(","):
+                    add(mod_name.strip())
+        # 6. Mods en rutas de archivos .jar
+        if "mods/" in line:
+            for mod_name in _MOD_JAR_RE.findall(line):
+                add(mod_name)
+        # 7. Mods en mensajes de compatibilidad, inicialización, pipeline, etc.
         # Ejemplo: "[main/INFO]: Mod 'Sodium' initialized"
-        m = re.search(r"Mod '([\w\-]+)' initialized", line)
-        if m:
-            mod_name = m.group(1)
-            mods.add(mod_name)
-            if mod_name not in mod_details:
-                mod_details[mod_name] = {}
+        if "' initialized" in line:
+            m = _MOD_INITIALIZED_RE.search(line)
+            if m:
+                add(m.group(1))
         # Ejemplo: "Compatibility level set to JAVA_17 by mod 'Krypton'"
-        m2 = re.search(r"by mod '([\w\-]+)'", line)
-        if m2:
-            mod_name = m2.group(1)
-            mods.add(mod_name)
-            if mod_name not in mod_details:
-                mod_details[mod_name] = {}
+        if "by mod '" in line:
+            m = _BY_MOD_RE.search(line)
+            if m:
+                add(m.group(1))
         # Ejemplo: "Pipeline for mod: Sodium"
-        m3 = re.search(r"Pipeline for mod: ([\w\-]+)", line)
-        if m3:
-            mod_name = m3.group(1)
-            mods.add(mod_name)
-            if mod_name not in mod_details:
-                mod_details[mod_name] = {}
-    # 8. Mods en advertencias o errores relacionados con mods
-    for line in log_lines:
-        m = re.search(r"as rule '.*' \(added by mods \[([\w\-, ]+)\]\)", line)
-        if m:
-            for mod_name in m.group(1).split(","):
-                mod_name = mod_name.strip()
-                mods.add(mod_name)
-                if mod_name not in mod_details:
-                    mod_details[mod_name] = {}
+        if "Pipeline for mod: " in line:
+            m = _PIPELINE_RE.search(line)
+            if m:
+                add(m.group(1))
     # Convertir a lista de dicts y separar dependencias
     mod_list = []
     dep_list = []
-    for mod in mods:
+    for mod, details in mod_details.items():
         entry = {"name": mod}
-        entry.update(mod_details.get(mod, {}))
+        entry.update(details)
         if is_dependency(mod):
             dep_list.append(entry)
         else:
@@ -200,17 +215,9 @@ def extract_mods(log_lines: List[str]) -> List[Dict[str, Any]]:
 
 def extract_client(log_lines: List[str]) -> str:
     for line in log_lines:
-        # Buscar varias formas de identificar Lunar Client
-        if re.search(r"lunar ?client", line, re.IGNORECASE):
-            return "LunarClient"
-        if re.search(r"\[LC\]", line) or re.search(r"\[LC ", line) or re.search(r"LUNARCLIENT_STATUS", line):
-            return "LunarClient"
-        if re.search(r"lunar", line, re.IGNORECASE) and ("client" in line.lower() or "[lc" in line.lower()):
-            return "LunarClient"
-        if re.search(r"fabric loader", line, re.IGNORECASE):
-            return "Fabric"
-        if re.search(r"forge", line, re.IGNORECASE):
-            return "Forge"
+        client = _client_of(line, line.lower())
+        if client:
+            return client
     return "Vanilla"  # Si no se detecta ninguno, asumir Vanilla
 
 def extract_errors(log_lines: List[str]) -> List[str]:
@@ -220,9 +227,171 @@ def extract_errors(log_lines: List[str]) -> List[str]:
             errors.append(line.strip())
     return errors
 
-def analyze_log_lines(log_lines: List[str]) -> Dict[str, Any]:
-    player = extract_player(log_lines)
-    mc_version = extract_mc_version(log_lines)
+def _client_of(line: str, lower_line: str):
+    """Cliente identificado por una línea, o None."""
+    # Buscar varias formas de identificar Lunar Client
+    if "lunar" in lower_line:
+        if _LUNAR_CLIENT_RE.search(line):
+            return "LunarClient"
+    if "[LC]" in line or "[LC " in line or "LUNARCLIENT_STATUS" in line:
+        return "LunarClient"
+    if "lunar" in lower_line and ("client" in lower_line or "[lc" in lower_line):
+        return "LunarClient"
+    if "fabric loader" in lower_line:
+        return "Fabric"
+    if "forge" in lower_line:
+        return "Forge"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Segmentación del log por fases
+# ---------------------------------------------------------------------------
+PHASE_BOOT = "boot"
+PHASE_MOD_LOAD = "mod_load"
+PHASE_WORLD_JOIN = "world_join"
+PHASE_GAMEPLAY = "gameplay"
+PHASES = (PHASE_BOOT, PHASE_MOD_LOAD, PHASE_WORLD_JOIN, PHASE_GAMEPLAY)
+
+CHAT_MARKER = "[CHAT]"
+_MOD_LOAD_MARKERS = ("Entrypoint(", "Loaded configuration file for ", "added by mods [", "MIXIN", "Mixin",
+                     "Forge mod loading", "Found valid mod file")
+_WORLD_JOIN_MARKERS = ("Connecting to ", "Starting integrated minecraft server", "Joining world", "logged in with entity id")
+
+# Fases que recorre cada extractor. Jugador, versión y cliente se fijan al
+# arrancar, así que dejan de buscarse al empezar el gameplay. Las líneas de
+# chat no las analiza nadie salvo con include_chat.
+EXTRACTOR_PHASES = {
+    "player": (PHASE_BOOT, PHASE_MOD_LOAD, PHASE_WORLD_JOIN),
+    "mc_version": (PHASE_BOOT, PHASE_MOD_LOAD, PHASE_WORLD_JOIN),
+    "client": (PHASE_BOOT, PHASE_MOD_LOAD, PHASE_WORLD_JOIN),
+    "mods": PHASES,
+    "errors": PHASES,
+}
+
+
+class LogSegmenter:
+    """Asigna cada línea a una fase (boot, mod_load, world_join, gameplay) en una pasada.
+
+    Las fases solo avanzan: la carga de mods empieza con "Loading N mods",
+    los Entrypoint o los mixins; la entrada al mundo con "Connecting to" o
+    el servidor integrado; el gameplay con la primera línea de chat.
+    Las líneas de chat se descartan salvo ``include_chat``.
+    """
+
+    def __init__(self, include_chat: bool = False):
+        self.include_chat = include_chat
+        self.phase = PHASE_BOOT
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.chat_skipped = 0
+
+    def _advance(self, line: str, is_chat: bool) -> str:
+        phase = self.phase
+        if is_chat:
+            phase = PHASE_GAMEPLAY
+        elif phase == PHASE_BOOT and (
+                any(marker in line for marker in _MOD_LOAD_MARKERS)
+                or ("Loading " in line and _LOADING_MODS_RE.search(line))):
+            phase = PHASE_MOD_LOAD
+        if phase in (PHASE_BOOT, PHASE_MOD_LOAD) and any(marker in line for marker in _WORLD_JOIN_MARKERS):
+            phase = PHASE_WORLD_JOIN
+        self.phase = phase
+        return phase
+
+    def segment(self, log_lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """Genera ``(fase, línea)`` omitiendo el chat si no se pidió."""
+        for line in log_lines:
+            is_chat = CHAT_MARKER in line
+            phase = self._advance(line, is_chat)
+            if is_chat and not self.include_chat:
+                self.chat_skipped += 1
+                continue
+            self.counts[phase] += 1
+            yield phase, line
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counts, "chat_skipped": self.chat_skipped}
+
+
+def segment_log(log_lines: Iterable[str], include_chat: bool = False) -> Iterator[Tuple[str, str]]:
+    """Atajo: ``(fase, línea)`` para cada línea del log."""
+    return LogSegmenter(include_chat).segment(log_lines)
+
+
+class _LogSummary:
+    """Jugador, versión, cliente y errores de un log en una sola pasada.
+
+    ``scan`` deja pasar las líneas (p. ej. hacia extract_mods) mientras
+    las analiza, así un log leído en streaming se recorre una única vez.
+    Jugador, versión y cliente solo se buscan en las fases de
+    EXTRACTOR_PHASES (en todas si ``all_phases``).
+    """
+
+    def __init__(self, all_phases: bool = False):
+        self._identity_phases = frozenset(PHASES if all_phases else EXTRACTOR_PHASES["player"])
+        self.player = None
+        self.client = None
+        self.errors = []
+        self.mc_version = None
+        # Prioridad de la versión encontrada (solo se buscan las más altas)
+        self._version_priority = len(_VERSION_RES)
+
+    def scan(self, segments: Iterable[Tuple[str, str]]) -> Iterator[str]:
+        for phase, line in segments:
+            self.feed(line, phase)
+            yield line
+
+    def feed(self, line: str, phase: str = PHASE_BOOT) -> None:
+        lower_line = line.lower()
+        if phase in self._identity_phases:
+            self._feed_identity(line, lower_line)
+        if "error" in lower_line or "exception" in lower_line:
+            self.errors.append(line.strip())
+
+    def _feed_identity(self, line: str, lower_line: str) -> None:
+        if self.player is None:
+            if "Setting user:" in line:
+                match = _PLAYER_USER_RE.search(line)
+                if match:
+                    self.player = match.group(1)
+            if self.player is None and "Loaded content for [" in line:
+                match = _PLAYER_CONTENT_RE.search(line)
+                if match:
+                    self.player = match.group(1)
+        if self._version_priority and "1." in line:
+            self._feed_version(line, lower_line)
+        if self.client is None:
+            self.client = _client_of(line, lower_line)
+
+    def _feed_version(self, line: str, lower_line: str) -> None:
+        for priority in range(self._version_priority):
+            if priority == 0 and "minecraft" not in lower_line:
+                continue
+            if priority == 1 and "version" not in lower_line:
+                continue
+            if priority == 2 and not any(word in lower_line for word in _LOADER_WORDS):
+                continue
+            match = _VERSION_RES[priority].search(line)
+            if match:
+                self.mc_version = match.group(1)
+                self._version_priority = priority
+                return
+
+
+def analyze_log_lines(log_lines: Iterable[str], include_chat: bool = False) -> Dict[str, Any]:
+    """Analiza un log completo recorriendo sus líneas una sola vez.
+
+    Acepta cualquier iterable (lista, archivo abierto, generador de
+    log_stream), así que el log no necesita estar entero en memoria.
+    Por defecto se omiten las líneas de chat y cada extractor solo mira
+    sus fases (ver EXTRACTOR_PHASES); ``include_chat=True`` analiza todas
+    las líneas con todos los extractores, como antes.
+    """
+    segmenter = LogSegmenter(include_chat)
+    summary = _LogSummary(all_phases=include_chat)
+    mods_result = extract_mods(summary.scan(segmenter.segment(log_lines)))
+    player = summary.player
+    mc_version = summary.mc_version
     player_with_version = None
     if player and mc_version:
         player_with_version = f"{player} (MC {mc_version})"
@@ -230,25 +399,25 @@ def analyze_log_lines(log_lines: List[str]) -> Dict[str, Any]:
         player_with_version = player
     elif mc_version:
         player_with_version = f"MC {mc_version}"
-    mods_result = extract_mods(log_lines)
     return {
         "player": player,
         "mc_version": mc_version,
         "player_with_version": player_with_version,
         "mods": mods_result["mods"],
         "dependencies": mods_result["dependencies"],
-        "client": extract_client(log_lines),
-        "errors": extract_errors(log_lines)
+        "client": summary.client or "Vanilla",
+        "errors": summary.errors,
+        "phases": segmenter.stats()
     }
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python analyze_mc_log.py <ruta_log>")
+    args = [a for a in sys.argv[1:] if a != "--chat"]
+    if not args:
+        print("Uso: python analyze_mc_log_utils.py <ruta_log> [--chat]")
         sys.exit(1)
-    log_path = sys.argv[1]
+    log_path = args[0]
     with open(log_path, encoding="utf-8", errors="ignore") as f:
-        log_lines = f.readlines()
-    result = analyze_log_lines(log_lines)
+        result = analyze_log_lines(f, include_chat="--chat" in sys.argv)
     print(json.dumps(result, indent=2, ensure_ascii=False))
 
 if __name__ == "__main__":
@@ -6,14 +6,16 @@ Multi-user system with role-based permissions and SQLite database.
 
 import sys
 import os
+import math
 import subprocess
+import tempfile
 from pathlib import Path
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, make_response
 from flask_login import LoginManager, login_user, logout_user, current_user
 from flask_bcrypt import Bcrypt
 from datetime import datetime
 
-from time import time
+from time import time, perf_counter
 
 # Tiempo máximo para considerar a un usuario como online (en segundos)
 ONLINE_TIMEOUT = 180  # 3 minutos
@@ -26,58 +28,19 @@ online_users = {}
 # ============================================================================
 
 def auto_git_pull_on_startup():
-    """Pull latest changes from GitHub on app startup.
+    """Pull latest changes from GitHub before the server starts.
     
     Ensures database is always in sync between local and Render.
     Runs silently - doesn't interrupt app if git is unavailable.
     Only runs in production (Render), not in local development.
+    Called from ``__main__`` before the server starts, never on import:
+    a blocking fetch there delayed every worker boot.
     """
-    try:
-        # Skip auto-pull in local development
-        if os.environ.get('FLASK_ENV') != 'production':
-            return
-        
-        repo_path = Path(__file__).resolve().parent.parent
-        
-        # Only pull if .git folder exists
-        if not (repo_path / '.git').exists():
-            return
-        
-        # Configure git
-        subprocess.run(
-            ['git', 'config', 'user.email', 'auto-sync@blurkittool.local'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=5
-        )
-        subprocess.run(
-            ['git', 'config', 'user.name', 'Auto Sync'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=5
-        )
-        
-        # Fetch and reset to origin/main (works in detached HEAD state on Render)
-        subprocess.run(
-            ['git', 'fetch', 'origin', 'main', '--quiet'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=10
-        )
-        result = subprocess.run(
-            ['git', 'reset', '--hard', 'origin/main'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=10
-        )
-        
-        if result.returncode == 0:
-            print("[Auto-sync] Database synced from GitHub", flush=True)
-        else:
-            print(f"[Auto-sync warning] Git pull failed: {result.stderr.decode()}", flush=True)
-    except Exception as e:
-        # Silently fail - don't interrupt app startup
-        print(f"[Auto-sync error] {str(e)}", flush=True)
+    if os.environ.get('FLASK_ENV') != 'production':
+        return
+    # Vaciar el WAL: el reset sustituye blurkit.db y el WAL antiguo no le corresponde
+    pull_on_startup(Path(__file__).resolve().parent.parent,
+                    prepare=lambda: sqlite_tuning.require_checkpoint(str(db_path)))
 
 # Helper to locate resources when packaged with PyInstaller
 def resource_path(relative_path):
@@ -91,11 +54,25 @@ def resource_path(relative_path):
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from models import db, User, Mod
+from mod_index import mod_index
+from mod_search import mod_search
+from page_cache import VersionedCache
+from mod_stats import compute_stats
+from git_sync import GitSyncWorker, pull_on_startup
+import sqlite_tuning
+import history
+from result_cache import ResultCache, content_key
+from rate_limit import RateLimiter, MemoryBackend, SQLiteBackend
+from log_stream import LogUpload, LogStreamError, LogTooLargeError
+from batch_analysis import BatchAnalyzer, collect_logs, summarize
+from gpt_analysis import GptEnricher, mod_lists, select_chunks
+from ml_integration import model_registry
 from auth import login_required, roles_required, mod_required, smod_required, admin_required
-import sys
-sys.path.insert(0, str(Path(__file__).resolve().parent))
 from analyze_mc_log_utils import analyze_log_lines
-from flask import jsonify
+from warmup import Warmup
+from profiling import Profiler
+from serve import serve, settings as serve_settings
+from sqlalchemy import text
 
 # Flask app with proper paths
 app = Flask(__name__)
@@ -106,52 +83,149 @@ app.config['SESSION_COOKIE_SECURE'] = os.environ.get('FLASK_ENV') == 'production
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
-@app.route('/menu')
-@login_required
-def menu():
+# Stage timings, Server-Timing headers and sampled cProfile (see profiling.py);
+# registered first so its timer covers the other request hooks
+profiler = Profiler(
+    app,
+    enabled=os.environ.get('PROFILING', '').lower() in ('1', 'true', 'yes', 'on'),
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01)),
+    keep=int(os.environ.get('PROFILE_KEEP', 20))
+)
+
+def mod_stats():
+    """Mod counts by status, category and platform (cached per mod-list version).
+
+    Falls back to zeros (and flashes the error) if the mods table cannot be read.
+    """
     try:
-        total_mods = Mod.query.count()
-        prohibidos_count = Mod.query.filter_by(status='prohibido').count()
-        permitidos_count = Mod.query.filter_by(status='permitido').count()
+        return page_cache.get_or_compute('stats', mod_index.version(), compute_stats)
     except Exception as e:
-        total_mods = prohibidos_count = permitidos_count = 0
         flash(f'Error al consultar mods: {e}', 'danger')
-    stats = {
-        'total': total_mods,
-        'prohibidos': prohibidos_count,
-        'permitidos': permitidos_count
-    }
-    return render_template('menu.html', stats=stats)
+        return {'total': 0, 'prohibidos': 0, 'permitidos': 0,
+                'by_status': {}, 'by_category': [], 'by_platform': []}
+
+
+@app.route('/menu')
+@login_required
+def menu():
+    return render_template('menu.html', stats=mod_stats())
+
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    """Mod catalogue statistics - viewable by all roles."""
+    return render_template('dashboard.html', stats=mod_stats())
 
 # ===================== API: Análisis de logs Minecraft =====================
 @app.route('/api/analyze_log', methods=['POST'])
 def api_analyze_log():
-    """API endpoint para analizar logs de Minecraft. Recibe texto plano o archivo."""
+    """API endpoint para analizar logs de Minecraft. Recibe texto plano o archivo.
+
+    ``?include_chat=1`` analiza también las líneas de chat (más lento).
+    """
     if request.content_type and request.content_type.startswith('multipart/form-data'):
         f = request.files.get('logfile')
         if not f or f.filename == '':
             return jsonify({'error': 'No se seleccionó archivo'}), 400
-        try:
-            content = f.read().decode('utf-8', errors='ignore')
-        except Exception:
-            content = f.read().decode('latin-1', errors='ignore')
-        log_lines = content.splitlines()
+        content = LogUpload(f.stream, f.filename)
     else:
-        log_text = request.get_data(as_text=True)
-        if not log_text.strip():
-            return jsonify({'error': 'No se envió contenido'}), 400
-        log_lines = log_text.splitlines()
-    result = analyze_log_lines(log_lines)
+        content = LogUpload(request.stream)
+        try:
+            if not content.has_content():
+                return jsonify({'error': 'No se envió contenido'}), 400
+        except LogStreamError as e:
+            return jsonify({'error': str(e)}), 400
+    try:
+        result = run_log_analysis(content, use_gpt=False, include_chat=_include_chat())
+    except LogStreamError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify(result)
-from models import LoginAttempt
+
+
+@app.route('/api/gpt/<key>')
+@login_required
+def api_gpt_status(key):
+    """Status of a background GPT enrichment (polled by analysis.html)."""
+    if len(key) != 64 or any(c not in '0123456789abcdef' for c in key):
+        return jsonify({'error': 'Clave inválida'}), 400
+    return jsonify(gpt_enricher.status(key))
+
+
+batch_analyzer = BatchAnalyzer()
+
+
+def _include_chat():
+    """``include_chat`` flag of the current request (query string or form)."""
+    value = request.args.get('include_chat') or request.form.get('include_chat') or ''
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+@app.route('/api/analyze_batch', methods=['POST'])
+@login_required
+def api_analyze_batch():
+    """Analyze many logs at once (several ``logfiles`` and/or zips of logs).
+
+    Returns one classified result per log plus an aggregate summary
+    (prohibited mods by number of logs, clients, MC versions).
+    ``include_chat=1`` (query or form field) also scans chat lines.
+    Answers 413 if the logs (zips expanded) exceed ``BATCH_MAX_MB`` in total.
+    """
+    files = request.files.getlist('logfiles') + request.files.getlist('logfile')
+    if not any(f.filename for f in files):
+        return jsonify({'error': 'No se seleccionó archivo'}), 400
+    started = perf_counter()
+    with tempfile.TemporaryDirectory(prefix='blurkit-batch-') as workdir:
+        try:
+            entries, skipped = collect_logs(files, workdir)
+        except LogTooLargeError as e:
+            return jsonify({'error': str(e)}), 413
+        analyses = batch_analyzer.analyze(entries, include_chat=_include_chat())
+    results = []
+    for (_, filename), resultado in zip(entries, analyses):
+        if resultado.get('error'):
+            results.append({'filename': filename, 'error': resultado['error']})
+            continue
+        classify_mods(resultado)
+        results.append({
+            'filename': filename,
+            'player': resultado.get('player'),
+            'mc_version': resultado.get('mc_version'),
+            'client': resultado.get('client'),
+            'mods_prohibidos': resultado['mods_prohibidos'],
+            'mods_permitidos': resultado['mods_permitidos'],
+            'mods_desconocidos': resultado['mods_desconocidos'],
+            'dependencias_prohibidas': resultado['dependencias_prohibidas'],
+            'total_mods': resultado['total_mods'],
+            'error_count': len(resultado.get('errors', [])),
+        })
+    results.extend(skipped)
+
+    def canonical(name):
+        db_mod = mod_index.lookup(name)
+        return db_mod['name'] if db_mod else name
+
+    summary = summarize(results, canonical)
+    summary['elapsed_ms'] = round((perf_counter() - started) * 1000, 1)
+    return jsonify({'results': results, 'summary': summary})
+
+
 app.config['PERMANENT_SESSION_LIFETIME'] = 600  # 10 minutos
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Uploads are parsed as a stream (log_stream.py), so the limit only bounds the request body
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 64)) * 1024 * 1024
 
 # Database path - use absolute path
 basedir = Path(__file__).resolve().parent
 db_path = basedir / 'instance' / 'blurkit.db'
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{db_path}')
+# Analysis history lives in its own file so it is never pushed with blurkit.db
+app.config['SQLALCHEMY_BINDS'] = {
+    'history': os.environ.get('HISTORY_DATABASE_URL', f"sqlite:///{basedir / 'instance' / 'history.db'}")
+}
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# WAL, busy timeout, mmap and a connection pool for SQLite (see sqlite_tuning.py)
+sqlite_tuning.install()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_tuning.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 
 # Initialize extensions
@@ -162,9 +236,6 @@ login_manager.login_view = 'login'
 login_manager.login_message = 'Por favor inicia sesión para acceder a esta página.'
 login_manager.login_message_category = 'info'
 
-# Auto-pull database changes on app startup
-auto_git_pull_on_startup()
-
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -175,13 +246,12 @@ def load_user(user_id):
 
 
 @app.before_request
-def restore_session_history():
-    """Restore history from session to memory before each request."""
+def make_session_permanent():
+    """Keep sessions permanent and drop the legacy cookie history."""
     if current_user.is_authenticated:
-        user_key = current_user.username
-        # Si hay historial en sesión y no en memoria, restaurarlo
-        if 'logs_history' in session and user_key not in logs_history:
-            logs_history[user_key] = session.get('logs_history', [])
+        # El historial ahora vive en el servidor (history.py); limpiar cookies antiguas
+        if 'logs_history' in session:
+            session.pop('logs_history', None)
         # Hacer sesiones permanentes
         session.permanent = True
 
@@ -205,110 +275,167 @@ def force_logout_on_render():
 # PUBLIC ROUTES (No login required)
 # ============================================================================
 
-# Rate limiting - simple in-memory storage (use Redis in production)
-login_attempts = {}
-
-# In-memory history cache for session support (primary storage is in Flask sessions)
-# Structure: {username: [{'timestamp': str, 'filename': str, 'resultado': dict}, ...]}
-logs_history = {}
-MAX_HISTORY_ITEMS = 20
+# Login throttling shared by all gunicorn workers (see rate_limit.py)
+if os.environ.get('RATE_LIMIT_BACKEND', 'sqlite') == 'memory':
+    _login_backend = MemoryBackend(int(os.environ.get('LOGIN_WINDOW_SECONDS', 900)))
+else:
+    _login_backend = SQLiteBackend(
+        os.environ.get('RATE_LIMIT_DB') or basedir / 'instance' / 'rate_limits.db',
+        int(os.environ.get('LOGIN_WINDOW_SECONDS', 900))
+    )
+login_limiter = RateLimiter(
+    limit=int(os.environ.get('LOGIN_MAX_ATTEMPTS', 5)),
+    window=_login_backend.window,
+    backend=_login_backend
+)
+
+
+@profiler.timed('history')
+def save_history(filename, resultado):
+    """Store an analysis in the server-side history; returns its id."""
+    return history.add_entry(current_user, filename, resultado)
+
+
+# Cache of analysis results by log content (see result_cache.py)
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 256)),
+    ttl=int(os.environ.get('RESULT_CACHE_TTL', 3600)),
+    db_path=os.environ.get('RESULT_CACHE_DB') or None,
+    max_bytes=int(os.environ.get('RESULT_CACHE_MAX_MB', 64)) * 1024 * 1024
+)
+
+
+# Forma del resultado local; cambiarla invalida la caché persistente
+ANALYZER_VERSION = 'phases-1'
+
+# GPT enrichments run in the background; their status is shared by all workers
+gpt_enricher = GptEnricher(
+    result_cache,
+    max_workers=int(os.environ.get('GPT_WORKERS', 2)),
+    db_path=os.environ.get('GPT_JOBS_DB') or basedir / 'instance' / 'gpt_jobs.db'
+)
+
+
+def run_log_analysis(content, use_gpt=True, include_chat=False):
+    """Analyze a log locally (through the result cache) and start the GPT enrichment.
+
+    ``content`` is the log text or a :class:`LogUpload`, which is read as
+    a stream (once to hash it, again on a cache miss).
+    The local analysis is returned right away. If OPENAI_API_KEY is set
+    (and ``use_gpt``), GPT runs in the background and ``resultado['gpt']``
+    holds its status; analysis.html polls /api/gpt/<key> until it is done.
+    GPT results depend on the permitted/prohibited lists sent in the
+    prompt, so their cache key also includes the mod-list version.
+    Chat lines are skipped unless ``include_chat``; both variants are
+    cached separately.
+    Raises LogStreamError for unreadable compressed uploads.
+    """
+    lines = content.splitlines if isinstance(content, str) else content.lines
+    with profiler.stage('decode'):
+        key = content_key('local+chat' if include_chat else 'local', lines(), ANALYZER_VERSION)
+    with profiler.stage('extract'):
+        resultado = result_cache.get_or_compute(key, lambda: analyze_log_lines(lines(), include_chat=include_chat))
+    openai_api_key = os.environ.get('OPENAI_API_KEY') if use_gpt else None
+    if openai_api_key:
+        with profiler.stage('gpt'):
+            gpt_key = content_key('gpt', [key], mod_index.version())
+            status = gpt_enricher.status(gpt_key)
+            if status['status'] in ('unknown', 'error'):
+                permitidos, prohibidos = mod_lists(mod_index.mods())
+                status = gpt_enricher.submit(gpt_key, select_chunks(lines()), openai_api_key, permitidos, prohibidos)
+        resultado['gpt'] = status
+    return resultado
+
+
+@profiler.timed('classify')
+def classify_mods(resultado):
+    """Split the detected mods/dependencies of ``resultado`` by their status in the mods table (in place)."""
+    mods = resultado.get('mods', [])
+    dependencies = resultado.get('dependencies', [])
+    mods_prohibidos = []
+    mods_permitidos = []
+    mods_desconocidos = []
+    # Mejor comparación: ignora mayúsculas/minúsculas y espacios, busca en aliases
+    for mod, db_mod in zip(mods, mod_index.classify(m['name'] for m in mods)):
+        if db_mod:
+            mod_info = {**mod, 'category': db_mod['category'], 'platform': db_mod['platform'], 'description': db_mod['description']}
+            if db_mod['status'] == 'prohibido':
+                mods_prohibidos.append(mod_info)
+            elif db_mod['status'] == 'permitido':
+                mods_permitidos.append(mod_info)
+            else:
+                mods_desconocidos.append(mod)
+        else:
+            mods_desconocidos.append(mod)
+    # Clasificar dependencias/librerías igual que mods
+    dependencias_permitidas = []
+    dependencias_prohibidas = []
+    dependencias_desconocidas = []
+    for dep, db_mod in zip(dependencies, mod_index.classify(d['name'] for d in dependencies)):
+        if db_mod:
+            if db_mod['status'] == 'prohibido':
+                dependencias_prohibidas.append({**dep, 'category': db_mod['category'], 'platform': db_mod['platform']})
+            elif db_mod['status'] == 'permitido':
+                dependencias_permitidas.append({**dep, 'category': db_mod['category'], 'platform': db_mod['platform']})
+            else:
+                dependencias_desconocidas.append(dep)
+        else:
+            dependencias_desconocidas.append(dep)
+
+    resultado['mods_prohibidos'] = mods_prohibidos
+    resultado['mods_permitidos'] = mods_permitidos
+    resultado['mods_desconocidos'] = mods_desconocidos
+    resultado['dependencias_permitidas'] = dependencias_permitidas
+    resultado['dependencias_prohibidas'] = dependencias_prohibidas
+    resultado['dependencias_desconocidas'] = dependencias_desconocidas
+    resultado['dependencias'] = dependencies  # Para compatibilidad con el frontend
+    resultado['total'] = len(mods) + len(dependencies)
+    resultado['total_mods'] = len(mods_permitidos) + len(mods_prohibidos) + len(mods_desconocidos)
+    return resultado
+
+
+@profiler.timed('render')
+def render_analysis(resultado=None, page_num=1):
+    """Render analysis.html with one page of the current user's history."""
+    pagination, items = history.page(current_user, page_num)
+    return render_template('analysis.html', resultado=resultado, logs_history=items, pagination=pagination)
 
 # ============================================================================
 # GIT AUTO-SYNC FUNCTION (for Render deployment)
 # ============================================================================
 
+def _git_sync_enabled():
+    # Only run in production (Render) with a token configured, to avoid local pushes
+    return os.environ.get('FLASK_ENV') == 'production' and bool(os.environ.get('GITHUB_TOKEN'))
+
+
+def _git_sync_remote():
+    # Format: https://<token>@github.com/<user>/<repo>.git
+    github_token = os.environ.get('GITHUB_TOKEN')
+    return f'https://{github_token}@github.com/pabloacerbi125-ops/Blurkittool.git'
+
+
+sync_worker = GitSyncWorker(
+    repo_path=Path(__file__).resolve().parent.parent,
+    paths=['web/instance/blurkit.db'],
+    remote=_git_sync_remote,
+    debounce=float(os.environ.get('GIT_SYNC_DEBOUNCE', 10)),
+    max_wait=float(os.environ.get('GIT_SYNC_MAX_WAIT', 60)),
+    enabled=_git_sync_enabled,
+    # git solo ve blurkit.db: volcar el WAL antes de hacer pull/commit
+    prepare=lambda: sqlite_tuning.require_checkpoint(str(db_path)),
+).register_atexit()
+
+
 def auto_commit_and_push(message):
-    """Auto-commit database changes and push to GitHub.
-    
-    Uses GITHUB_TOKEN environment variable for authentication.
-    Only works on Render or environments with git configured.
+    """Queue a commit + push of the database to GitHub.
+
+    Returns immediately; the background worker (see git_sync.py) groups
+    changes made within the debounce window into a single commit and
+    retries failed pushes with backoff. Uses GITHUB_TOKEN for auth and
+    only runs in production (Render).
     """
-    try:
-        # Only run in production (Render) to avoid local pushes
-        if os.environ.get('FLASK_ENV') != 'production':
-            print("[Auto-sync] Skipped: Not running in production", flush=True)
-            return False
-
-        # Only run if token is configured (production/Render)
-        github_token = os.environ.get('GITHUB_TOKEN')
-        if not github_token:
-            print(f"[Auto-sync] Skipped: No GITHUB_TOKEN configured", flush=True)
-            return False
-        
-        print(f"[Auto-sync] Starting push: {message}", flush=True)
-        
-        repo_path = Path(__file__).resolve().parent.parent
-        
-        # Configure git with token (temporary, for this session)
-        subprocess.run(
-            ['git', 'config', 'user.email', 'render-auto-sync@blurkittool.local'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=5
-        )
-        subprocess.run(
-            ['git', 'config', 'user.name', 'Render Auto-Sync'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=5
-        )
-        
-        # Pull antes de hacer commit/push
-        subprocess.run(
-            ['git', 'pull', 'origin', 'main', '--rebase'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=10
-        )
-
-        # Stage database file
-        subprocess.run(
-            ['git', 'add', 'web/instance/blurkit.db'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=5
-        )
-        
-        # Check if there are changes
-        result = subprocess.run(
-            ['git', 'diff', '--cached', '--quiet'],
-            cwd=repo_path,
-            capture_output=True,
-            timeout=5
-        )
-        
-        if result.returncode != 0:  # There are changes
-            # Commit
-            commit_result = subprocess.run(
-                ['git', 'commit', '-m', message],
-                cwd=repo_path,
-                capture_output=True,
-                timeout=5
-            )
-            print(f"[Auto-sync] Commit result: {commit_result.returncode}", flush=True)
-            
-            # Push with token
-            # Format: https://<token>@github.com/<user>/<repo>.git
-            remote_url = f'https://{github_token}@github.com/pabloacerbi125-ops/Blurkittool.git'
-            push_result = subprocess.run(
-                ['git', 'push', remote_url, 'HEAD:main'],  # use HEAD because Render runs in detached HEAD
-                cwd=repo_path,
-                capture_output=True,
-                timeout=10
-            )
-            print(f"[Auto-sync] Push result: {push_result.returncode}", flush=True)
-            if push_result.returncode == 0:
-                print(f"[Auto-sync] SUCCESS: {message}", flush=True)
-            else:
-                print(f"[Auto-sync] Push failed: {push_result.stderr.decode()}", flush=True)
-            return push_result.returncode == 0
-        else:
-            print(f"[Auto-sync] No changes to commit", flush=True)
-            return False
-    except Exception as e:
-        # Silently fail - don't interrupt the app
-        print(f"[Auto-sync error] {str(e)}", flush=True)
-        return False
+    return sync_worker.enqueue(message)
 
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -322,20 +449,12 @@ def login():
         password = request.form.get('password', '')
         ip_address = request.remote_addr
         
-        # Simple rate limiting (5 attempts per IP)
-        current_time = datetime.now()
-        if ip_address in login_attempts:
-            attempts, last_attempt, last_username = login_attempts[ip_address]
-            # Reset after 15 minutes
-            if (current_time - last_attempt).total_seconds() > 900:
-                login_attempts[ip_address] = (1, current_time, username)
-            elif attempts >= 5:
-                flash('Demasiados intentos fallidos. Intenta de nuevo en 15 minutos.', 'danger')
-                return render_template('login.html')
-            else:
-                login_attempts[ip_address] = (attempts + 1, current_time, username)
-        else:
-            login_attempts[ip_address] = (1, current_time, username)
+        # Rate limiting per IP (failed attempts in a sliding window)
+        limit = login_limiter.check(ip_address)
+        if limit.blocked:
+            minutes = max(1, math.ceil(limit.retry_after / 60))
+            flash(f'Demasiados intentos fallidos. Intenta de nuevo en {minutes} minutos.', 'danger')
+            return render_template('login.html')
         
         user = User.query.filter_by(username=username).first()
         
@@ -345,12 +464,7 @@ def login():
                 return redirect(url_for('login'))
             
             # Reset login attempts on success
-            if ip_address in login_attempts:
-                del login_attempts[ip_address]
-            
-            # Clear from database on successful login
-            LoginAttempt.query.filter_by(ip_address=ip_address).delete()
-            db.session.commit()
+            login_limiter.reset(ip_address)
             
             # Update last login
             user.last_login = datetime.now()
@@ -365,23 +479,8 @@ def login():
                 return redirect(next_page)
             return redirect(url_for('menu'))
         else:
-            # Save failed attempt to database
-            attempt = LoginAttempt.query.filter_by(ip_address=ip_address).first()
-            if attempt:
-                attempt.attempts += 1
-                attempt.last_attempt = current_time
-                attempt.username = username
-                attempt.is_blocked = attempt.attempts >= 5
-            else:
-                attempt = LoginAttempt(
-                    ip_address=ip_address,
-                    username=username,
-                    attempts=1,
-                    last_attempt=current_time,
-                    is_blocked=False
-                )
-                db.session.add(attempt)
-            db.session.commit()
+            # One upsert in the shared store
+            login_limiter.hit(ip_address, username)
             
             flash('Usuario o contraseña incorrectos.', 'danger')
     
@@ -401,14 +500,111 @@ def logout():
 # PUBLIC ROUTES (No login required)
 # ============================================================================
 
+# Rendered public pages and mod-list snapshots, valid for one mod-list version
+page_cache = VersionedCache(max_entries=int(os.environ.get('PAGE_CACHE_SIZE', 128)))
+
+
+def mod_list():
+    """Every mod as a ``to_dict()`` snapshot sorted by name (cached per mod-list version)."""
+    return page_cache.get_or_compute(
+        'mod_list', mod_index.version(),
+        lambda: sorted(mod_index.mods(), key=lambda m: m['name'] or '')
+    )
+
+
+def public_page(key, render, version=None):
+    """Serve a page rendered once per mod-list version, with ETag / If-None-Match.
+
+    ``render`` returns the HTML; it only runs when the version changed or
+    the page is not cached yet. Clients always revalidate (``no-cache``)
+    and get a 304 while the page is unchanged.
+    """
+    if app.debug:
+        return render()
+    html, etag = page_cache.page(key, mod_index.version() if version is None else version, render)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(html)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+def _warm_database():
+    db.session.execute(text('SELECT 1'))
+    return db.engine.dialect.name
+
+
+def _warm_pages():
+    mod_list()
+    page_cache.get_or_compute('stats', mod_index.version(), compute_stats)
+
+
+# Started by run_app.py, by __main__ and by the first /healthz (see warmup.py)
+warmup = Warmup(app, [
+    ('database', _warm_database),
+    ('mod_index', lambda: f"{len(mod_index.mods())} mods"),
+    ('search_index', lambda: 'fts5' if mod_search.ensure_index() else 'ilike'),
+    ('page_cache', _warm_pages),
+])
+
+
+def unshared_state():
+    """Settings that keep state in one process only (empty if several workers can share it).
+
+    The login limiter and the result cache are shared through SQLite
+    only when configured so; GPT jobs and git syncs always are. Profiler
+    figures stay per process (see profiling.py).
+    """
+    missing = []
+    if login_limiter.backend.name == 'memory':
+        missing.append('RATE_LIMIT_BACKEND=sqlite')
+    if not result_cache.db_path:
+        missing.append('RESULT_CACHE_DB')
+    return missing
+
+
+def start_worker():
+    """Prepare a serving process (see serve.py) and start its warm-up.
+
+    With gunicorn this runs in each worker after the fork: connections
+    opened by the parent (``db.create_all()``) must not be shared, so the
+    pool is dropped without closing them. The batch process pool is
+    created here too, never in the parent.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    batch_analyzer.start()
+    warmup.start()
+
+
+@app.route('/healthz')
+def healthz():
+    """Readiness probe: 200 once the database and in-memory indexes are warm, 503 before.
+
+    The first call starts the warm-up if nothing else did. Once warm,
+    each call still checks that the database answers.
+    """
+    warmup.start()
+    report = warmup.report()
+    if warmup.ready:
+        try:
+            db.session.execute(text('SELECT 1'))
+        except Exception as e:
+            report['status'] = 'error'
+            report['checks']['database'] = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    response = jsonify(report)
+    response.status_code = 200 if report['status'] == 'ok' else 503
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
 @app.route('/')
 def home():
-    """Public homepage - shows mods list and rules without login."""
-    all_mods = Mod.query.order_by(Mod.name).all()
-    permitidos = [(idx, m.to_dict()) for idx, m in enumerate(all_mods) if m.status == 'permitido']
-    prohibidos = [(idx, m.to_dict()) for idx, m in enumerate(all_mods) if m.status == 'prohibido']
-    
-    return render_template('home.html', permitidos=permitidos, prohibidos=prohibidos)
+    """Public homepage - menu and rules without login (does not list mods)."""
+    return public_page('home', lambda: render_template('home.html'), version='static')
 
 
 @app.route('/page')
@@ -420,17 +616,97 @@ def page():
 @app.route('/modsjg')
 def modsjg():
     search = request.args.get('search', '').strip().lower()
-    all_mods = Mod.query.order_by(Mod.name).all()
-    filtered_mods = []
-    for m in all_mods:
-        m_dict = m.to_dict()
-        name = m_dict['name'].lower() if m_dict['name'] else ''
-        aliases = ','.join(m_dict.get('alias', [])).lower() if m_dict.get('alias') else ''
-        if not search or search in name or search in aliases:
-            filtered_mods.append(m_dict)
-    permitidos = [(idx, m) for idx, m in enumerate(filtered_mods) if m['status'] == 'permitido']
-    prohibidos = [(idx, m) for idx, m in enumerate(filtered_mods) if m['status'] == 'prohibido']
-    return render_template('modsjg.html', permitidos=permitidos, prohibidos=prohibidos)
+
+    def render():
+        if search:
+            # Resultados del índice de búsqueda, ordenados por relevancia
+            snapshots = {m['id']: m for m in mod_index.mods()}
+            filtered_mods = [snapshots[i] for i in mod_search.search_ids(search) if i in snapshots]
+        else:
+            filtered_mods = mod_list()
+        permitidos = [(idx, m) for idx, m in enumerate(filtered_mods) if m['status'] == 'permitido']
+        prohibidos = [(idx, m) for idx, m in enumerate(filtered_mods) if m['status'] == 'prohibido']
+        return render_template('modsjg.html', permitidos=permitidos, prohibidos=prohibidos)
+
+    # La plantilla muestra el término tal cual, así que la clave usa el original
+    return public_page(('modsjg', request.args.get('search', '')), render)
+
+
+API_MODS_DEFAULT_LIMIT = 100
+API_MODS_MAX_LIMIT = 500
+# Longitud máxima de Mod.name, y por tanto de un cursor válido
+API_MODS_MAX_CURSOR = Mod.name.type.length
+API_MOD_FIELDS = ('id', 'name', 'status', 'category', 'platform', 'description', 'alias', 'created_at', 'updated_at')
+
+
+@app.route('/api/mods')
+def api_mods():
+    """Mod catalogue as JSON, keyset-paginated by name (public, like /modsjg).
+
+    Query parameters:
+        after: return mods whose name sorts after this one (``next_cursor``
+            of the previous page); omitted for the first page.
+        limit: page size (default 100, max 500).
+        status, category, platform: exact-match filters.
+        fields: comma-separated subset of the mod fields.
+
+    An invalid ``limit``, cursor or field name gets a 400 with an
+    ``error`` message.
+
+    Each page costs one indexed range query, however deep the client has
+    paged. Responses carry an ETag tied to the mod-list version, so
+    pollers get a 304 until the catalogue changes.
+    """
+    try:
+        limit = int(request.args.get('limit', API_MODS_DEFAULT_LIMIT))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return jsonify({'error': 'limit debe ser un entero positivo'}), 400
+    limit = min(limit, API_MODS_MAX_LIMIT)
+    after = request.args.get('after')
+    if after is not None and not 0 < len(after) <= API_MODS_MAX_CURSOR:
+        return jsonify({'error': 'after debe ser el nombre de un mod (next_cursor)'}), 400
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    unknown = [f for f in fields if f not in API_MOD_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Campos desconocidos: {', '.join(unknown)}", 'fields': list(API_MOD_FIELDS)}), 400
+
+    version = mod_index.version()
+    etag = content_key('api_mods', [request.query_string.decode('utf-8', 'replace')], version)[:32]
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        query = Mod.query
+        for column in ('status', 'category', 'platform'):
+            value = request.args.get(column)
+            if value:
+                query = query.filter(getattr(Mod, column) == value)
+        if after:
+            query = query.filter(Mod.name > after)
+        rows = query.order_by(Mod.name).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        mods = [m.to_dict() for m in rows]
+        if fields:
+            mods = [{f: m[f] for f in fields} for m in mods]
+        next_cursor = rows[-1].name if has_more else None
+        next_url = None
+        if next_cursor is not None:
+            args = request.args.to_dict()
+            args['after'] = next_cursor
+            next_url = url_for('api_mods', **args)
+        response = jsonify({
+            'mods': mods,
+            'count': len(mods),
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'next': next_url,
+            'version': version,
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
 
 
 @app.route('/reglas')
@@ -450,13 +726,8 @@ def index():
     search_term = request.args.get('search', '').strip()
     
     if search_term:
-        # Filtrar mods por nombre o alias
-        mods = Mod.query.filter(
-            db.or_(
-                Mod.name.ilike(f'%{search_term}%'),
-                Mod.aliases.ilike(f'%{search_term}%')
-            )
-        ).order_by(Mod.name).all()
+        # Buscar en nombre, alias, categoría y descripción (ver mod_search.py)
+        mods = mod_search.search(search_term)
     else:
         mods = Mod.query.order_by(Mod.name).all()
     
@@ -473,15 +744,8 @@ def search():
     if request.method == 'POST':
         term = request.form.get('term', '').lower().strip()
         
-        # Search in name and aliases
-        mods = Mod.query.filter(
-            db.or_(
-                Mod.name.ilike(f'%{term}%'),
-                Mod.aliases.ilike(f'%{term}%')
-            )
-        ).all()
-        
-        resultado = [m.to_dict() for m in mods]
+        # Search in name, aliases, category and description, best match first
+        resultado = [m.to_dict() for m in mod_search.search(term)]
     
     return render_template('search.html', resultado=resultado)
 
@@ -489,28 +753,21 @@ def search():
 @app.route('/analysis', methods=['GET'])
 @login_required
 def analysis_page():
-    """View analysis history - accessible to all roles."""
-    # Load history from session if available
-    user_key = current_user.username
-    history = session.get('logs_history', logs_history.get(user_key, []))
-    # Restaurar en memoria para consistencia
-    if history:
-        logs_history[user_key] = history
-        session.permanent = True
-    return render_template('analysis.html', resultado=None, logs_history=history)
+    """View analysis history - accessible to all roles.
+
+    ``?page=N`` selects the history page; ``?id=X`` loads one stored result.
+    """
+    page_num = request.args.get('page', 1, type=int)
+    entry_id = request.args.get('id', type=int)
+    resultado = history.get_resultado(current_user, entry_id) if entry_id else None
+    return render_analysis(resultado, page_num)
 
 
 @app.route('/clear_history', methods=['POST'])
 @login_required
 def clear_history():
     """Clear analysis history for current user."""
-    user_key = current_user.username
-    # Limpiar de memoria
-    if user_key in logs_history:
-        del logs_history[user_key]
-    # Limpiar de sesión
-    session.pop('logs_history', None)
-    session.modified = True
+    history.clear(current_user)
     flash('Historial limpiado correctamente', 'success')
     return redirect(url_for('analysis_page'))
 
@@ -519,153 +776,35 @@ def clear_history():
 @login_required
 def analyze():
     """Analyze log - accessible to all roles."""
-    log_text = request.form.get('log', '')
+    with profiler.stage('parse'):
+        log_text = request.form.get('log', '')
     resultado = None
     if not log_text.strip():
         flash('Por favor, pega un log antes de analizar.', 'warning')
-        user_key = current_user.username
-        history = session.get('logs_history', logs_history.get(user_key, []))
-        return render_template('analysis.html', resultado=None, logs_history=history)
+        return render_analysis()
     # Si hay texto, sigue el flujo normal
     if log_text.strip():
-        from core import analyze_log_with_gpt
-        openai_api_key = os.environ.get('OPENAI_API_KEY')
-        if openai_api_key:
-            resultado = analyze_log_with_gpt(log_text, openai_api_key)
-            # Si hay error, fallback al análisis local
-            if resultado.get('error'):
-                from analyze_mc_log_utils import analyze_log_lines
-                resultado = analyze_log_lines(log_text.splitlines())
-        else:
-            from analyze_mc_log_utils import analyze_log_lines
-            resultado = analyze_log_lines(log_text.splitlines())
-
-        # Si la IA no detectó el nombre del jugador, intenta extraerlo localmente
-        if not resultado.get('player'):
-            from analyze_mc_log_utils import extract_player
-            resultado['player'] = extract_player(log_text.splitlines())
-
-        # Clasificar mods y dependencias igual que en upload
-        mods = resultado.get('mods', [])
-        dependencies = resultado.get('dependencies', [])
-        mods_prohibidos = []
-        mods_permitidos = []
-        mods_desconocidos = []
-        # Mejor comparación: ignora mayúsculas/minúsculas y espacios, busca en aliases
-        all_mods_db = list(Mod.query.all())
-        def match_mod(mod_name):
-            mod_name_norm = mod_name.lower().replace(' ', '')
-            for m in all_mods_db:
-                # Normaliza nombre y aliases
-                db_name = m.name.lower().replace(' ', '')
-                if mod_name_norm == db_name:
-                    return m
-                if m.aliases:
-                    for alias in m.aliases.split(','):
-                        if mod_name_norm == alias.strip().lower().replace(' ', ''):
-                            return m
-            return None
-
-        for mod in mods:
-            mod_name = mod['name']
-            db_mod = match_mod(mod_name)
-            if db_mod:
-                mod_info = {**mod, 'category': db_mod.category, 'platform': db_mod.platform, 'description': db_mod.description}
-                if db_mod.status == 'prohibido':
-                    mods_prohibidos.append(mod_info)
-                elif db_mod.status == 'permitido':
-                    mods_permitidos.append(mod_info)
-                else:
-                    mods_desconocidos.append(mod)
-            else:
-                mods_desconocidos.append(mod)
-        # Clasificar dependencias/librerías igual que mods
-        dependencias_permitidas = []
-        dependencias_prohibidas = []
-        dependencias_desconocidas = []
-        for dep in dependencies:
-            dep_name = dep['name'].lower()
-            db_mod = mods_db.get(dep_name)
-            if db_mod:
-                if db_mod.status == 'prohibido':
-                    dependencias_prohibidas.append({**dep, 'category': db_mod.category, 'platform': db_mod.platform})
-                elif db_mod.status == 'permitido':
-                    dependencias_permitidas.append({**dep, 'category': db_mod.category, 'platform': db_mod.platform})
-                else:
-                    dependencias_desconocidas.append(dep)
-            else:
-                dependencias_desconocidas.append(dep)
+        resultado = run_log_analysis(log_text)
 
-        resultado['mods_prohibidos'] = mods_prohibidos
-        resultado['mods_permitidos'] = mods_permitidos
-        resultado['mods_desconocidos'] = mods_desconocidos
-        resultado['dependencias_permitidas'] = dependencias_permitidas
-        resultado['dependencias_prohibidas'] = dependencias_prohibidas
-        resultado['dependencias_desconocidas'] = dependencias_desconocidas
-        resultado['dependencias'] = dependencies  # Para compatibilidad con el frontend
-        resultado['total'] = len(mods) + len(dependencies)
-        resultado['total_mods'] = len(mods_permitidos) + len(mods_prohibidos) + len(mods_desconocidos)
-
-        user_key = current_user.username
-        if user_key not in logs_history:
-            logs_history[user_key] = []
-        history_item = {
-            'timestamp': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-            'user': current_user.username,
-            'filename': 'pasted_log',
-            'resultado': resultado
-        }
-        logs_history[user_key].insert(0, history_item)
-        if len(logs_history[user_key]) > MAX_HISTORY_ITEMS:
-            logs_history[user_key].pop()
-        session['logs_history'] = logs_history.get(user_key, [])
-        session.permanent = True
-        session.modified = True
-        history_to_display = session.get('logs_history', logs_history.get(current_user.username, []))
-        if history_to_display:
-            logs_history[current_user.username] = history_to_display
-        return render_template('analysis.html', resultado=resultado, logs_history=history_to_display)
+        # Clasificar mods y dependencias contra la base de datos
+        classify_mods(resultado)
+
+        save_history('pasted_log', resultado)
+        return render_analysis(resultado)
 
 
 @app.route('/paste', methods=['GET'])
 @login_required
 def paste_page():
     """Paste log page - accessible to all roles."""
-    user_key = current_user.username
-    history = session.get('logs_history', logs_history.get(user_key, []))
     if request.method == 'POST':
         log_text = request.form.get('logtext', '')
-        from core import analyze_log_with_gpt
-        openai_api_key = os.environ.get('OPENAI_API_KEY')
-        if openai_api_key:
-            resultado = analyze_log_with_gpt(log_text, openai_api_key)
-            if resultado.get('error'):
-                from analyze_mc_log_utils import analyze_log_lines
-                resultado = analyze_log_lines(log_text.splitlines())
-        else:
-            from analyze_mc_log_utils import analyze_log_lines
-            resultado = analyze_log_lines(log_text.splitlines())
+        resultado = classify_mods(run_log_analysis(log_text))
 
         # Guardar en historial igual que upload
-        if user_key not in logs_history:
-            logs_history[user_key] = []
-        history_item = {
-            'timestamp': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-            'user': current_user.username,
-            'filename': 'pasted_log',
-            'resultado': resultado
-        }
-        logs_history[user_key].insert(0, history_item)
-        if len(logs_history[user_key]) > MAX_HISTORY_ITEMS:
-            logs_history[user_key].pop()
-        session['logs_history'] = logs_history.get(user_key, [])
-        session.permanent = True
-        session.modified = True
-        history_to_display = session.get('logs_history', logs_history.get(current_user.username, []))
-        if history_to_display:
-            logs_history[current_user.username] = history_to_display
-        return render_template('analysis.html', resultado=resultado, logs_history=history_to_display)
-    return render_template('paste.html', logs_history=history)
+        save_history('pasted_log', resultado)
+        return render_analysis(resultado)
+    return render_template('paste.html', logs_history=history.recent(current_user))
 
 
 @app.route('/upload', methods=['GET', 'POST'])
@@ -673,78 +812,29 @@ def paste_page():
 def upload():
     """Upload log file - accessible to all roles."""
     if request.method == 'GET':
-        user_key = current_user.username
-        history = session.get('logs_history', logs_history.get(user_key, []))
-        return render_template('upload.html', logs_history=history)
+        return render_template('upload.html', logs_history=history.recent(current_user))
     
-    f = request.files.get('logfile')
+    # El cuerpo multipart se recibe y separa aquí
+    with profiler.stage('parse'):
+        f = request.files.get('logfile')
     if not f or f.filename == '':
         flash('No se seleccionó archivo', 'danger')
         return render_template('upload.html')
     
     filename = f.filename
+    # El archivo (texto, .gz o .zip) se lee en streaming, sin cargarlo entero en memoria
+    content = LogUpload(f.stream, filename)
+
+    # Análisis local inmediato; GPT (si está configurado) llega después
     try:
-        content = f.read().decode('utf-8', errors='ignore')
-    except Exception:
-        content = f.read().decode('latin-1', errors='ignore')
-    
-    # Usar GPT-3.5-turbo si la variable de entorno está presente
-    from core import analyze_log_with_gpt
-    openai_api_key = os.environ.get('OPENAI_API_KEY')
-    if openai_api_key:
-        resultado = analyze_log_with_gpt(content, openai_api_key)
-        # Si hay error, fallback al análisis local
-        if resultado.get('error'):
-            resultado = analyze_log_lines(content.splitlines())
-    else:
-        resultado = analyze_log_lines(content.splitlines())
-
-    # Adaptar el resultado IA (allowed/unknown/mods_main/dependencies) a los campos esperados por el frontend
-    # Log de depuración: guardar el JSON crudo de la IA para inspección
-    import logging
-    logging.basicConfig(level=logging.INFO)
-    with open('ia_raw_result.json', 'w', encoding='utf-8') as f:
-        import json as _json
-        f.write(_json.dumps(resultado, ensure_ascii=False, indent=2))
-    # Si la IA ya devuelve la estructura final, solo la copiamos y calculamos el total
-    if all(k in resultado for k in ['mods_permitidos', 'mods_prohibidos', 'mods_desconocidos', 'dependencias']):
-        resultado['total'] = (
-            len(resultado['mods_permitidos'])
-            + len(resultado['mods_prohibidos'])
-            + len(resultado['mods_desconocidos'])
-            + len(resultado['dependencias'])
-        )
-        resultado['total_mods'] = (
-            len(resultado['mods_permitidos'])
-            + len(resultado['mods_prohibidos'])
-            + len(resultado['mods_desconocidos'])
-        )
-    elif any(k in resultado for k in ['allowed', 'unknown', 'mods_main', 'dependencies']):
-        pass  # Aquí iría el código legacy si se necesitara
-    # Si la IA no detectó el nombre del jugador, intenta extraerlo localmente
-    if not resultado.get('player'):
-        from analyze_mc_log_utils import extract_player
-        resultado['player'] = extract_player(content.splitlines())
-
-    user_key = current_user.username
-    if user_key not in logs_history:
-        logs_history[user_key] = []
-    history_item = {
-        'timestamp': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-        'user': current_user.username,
-        'filename': filename,
-        'resultado': resultado
-    }
-    logs_history[user_key].insert(0, history_item)
-    if len(logs_history[user_key]) > MAX_HISTORY_ITEMS:
-        logs_history[user_key].pop()
-    session['logs_history'] = logs_history.get(current_user.username, [])
-    session.permanent = True
-    session.modified = True
-    history_to_display = session.get('logs_history', logs_history.get(current_user.username, []))
-    if history_to_display:
-        logs_history[current_user.username] = history_to_display
-    return render_template('analysis.html', resultado=resultado, logs_history=history_to_display)
+        resultado = run_log_analysis(content)
+    except LogStreamError as e:
+        flash(str(e), 'danger')
+        return render_template('upload.html', logs_history=history.recent(current_user))
+    classify_mods(resultado)
+
+    save_history(filename, resultado)
+    return render_analysis(resultado)
 
 
 # ============================================================================
@@ -785,6 +875,7 @@ def add_mod():
     
     db.session.add(nuevo)
     db.session.commit()
+    mod_index.invalidate()
     
     # Auto-sync to GitHub
     auto_commit_and_push(f'Add mod: {nuevo_nombre}')
@@ -832,6 +923,7 @@ def edit(idx):
             mod.aliases = ''
         
         db.session.commit()
+        mod_index.invalidate()
         
         # Auto-sync to GitHub
         auto_commit_and_push(f'Update mod: {nuevo_nombre}')
@@ -859,6 +951,7 @@ def delete(idx):
     
     db.session.delete(mod)
     db.session.commit()
+    mod_index.invalidate()
     
     # Auto-sync to GitHub
     auto_commit_and_push(f'Delete mod: {mod_name}')
@@ -1048,68 +1141,74 @@ def admin_delete_user(user_id):
 @admin_required
 def admin_security():
     """Security dashboard - admin only."""
-    blocked_ips = []
-    current_time = datetime.now()
-    
-    # Get from database first (persistent data)
-    db_attempts = LoginAttempt.query.all()
-    for attempt in db_attempts:
-        # Skip if older than 15 minutes
-        if (current_time - attempt.last_attempt).total_seconds() > 900:
-            db.session.delete(attempt)
-            continue
-            
-        blocked_ips.append({
-            'ip': attempt.ip_address,
-            'username': attempt.username if attempt.username else 'desconocido',
-            'attempts': attempt.attempts,
-            'blocked': attempt.is_blocked or attempt.attempts >= 5,
-            'time_remaining': max(0, int((900 - (current_time - attempt.last_attempt).total_seconds()) / 60))
-        })
-    db.session.commit()
+    # Expired keys are purged in bulk by active()
+    blocked_ips = [{
+        'ip': status.key,
+        'username': status.label or 'desconocido',
+        'attempts': status.attempts,
+        'blocked': status.blocked,
+        'time_remaining': math.ceil(status.retry_after / 60)
+    } for status in login_limiter.active()]
     
-    # Also get from memory for real-time updates
-    for ip, data in login_attempts.items():
-        try:
-            if isinstance(data, tuple):
-                if len(data) == 3:
-                    attempts, last_attempt, username = data
-                elif len(data) == 2:
-                    attempts, last_attempt = data
-                    username = 'desconocido'
-                else:
-                    continue
-            else:
-                continue
-        except (ValueError, TypeError):
-            continue
-        
-        time_remaining = 900 - (current_time - last_attempt).total_seconds()
-        if time_remaining > 0:
-            # Check if already in list from DB
-            if not any(item['ip'] == ip for item in blocked_ips):
-                blocked_ips.append({
-                    'ip': ip,
-                    'username': str(username) if username else 'desconocido',
-                    'attempts': attempts,
-                    'blocked': attempts >= 5,
-                    'time_remaining': max(0, int(time_remaining / 60))
-                })
-    
-    return render_template('admin_security.html', blocked_ips=blocked_ips)
+    return render_template('admin_security.html', blocked_ips=blocked_ips, limiter=login_limiter.stats())
+
+
+@app.route('/admin/system')
+@admin_required
+def admin_system():
+    """Background services status (git auto-sync, result cache, loaded models) - admin only."""
+    sync = sync_worker.status()
+    if sync['last_sync_at']:
+        sync['last_sync_at'] = datetime.fromtimestamp(sync['last_sync_at']).strftime('%d/%m/%Y %H:%M:%S')
+    models = []
+    for path, entry in sorted(model_registry.stats().items()):
+        entry['name'] = os.path.basename(path)
+        entry['loaded_at'] = datetime.fromtimestamp(entry['loaded_at']).strftime('%d/%m/%Y %H:%M:%S')
+        models.append(entry)
+    return render_template('admin_system.html', sync=sync, cache=result_cache.stats(), models=models)
+
+
+@app.route('/admin/profiling')
+@admin_required
+def admin_profiling():
+    """Per-route latency percentiles, stage breakdown and cProfile captures - admin only."""
+    info = profiler.stats()
+    info['started_at'] = datetime.fromtimestamp(info['started_at']).strftime('%d/%m/%Y %H:%M:%S')
+    captures = profiler.profiles()
+    for capture in captures:
+        capture['at'] = datetime.fromtimestamp(capture['at']).strftime('%d/%m/%Y %H:%M:%S')
+    selected = profiler.profile(request.args.get('profile', type=int) or 0)
+    return render_template('admin_profiling.html', info=info, routes=profiler.report(),
+                           captures=captures, selected=selected)
+
+
+@app.route('/admin/profiling/<int:profile_id>.prof')
+@admin_required
+def admin_profiling_download(profile_id):
+    """Download a cProfile capture in pstats format (snakeviz, pstats) - admin only."""
+    capture = profiler.profile(profile_id)
+    if capture is None:
+        return render_template('error.html', error_code=404, error_message='Captura no encontrada.'), 404
+    response = make_response(capture['dump'])
+    response.headers['Content-Type'] = 'application/octet-stream'
+    response.headers['Content-Disposition'] = f'attachment; filename=blurkit-{profile_id}.prof'
+    return response
+
+
+@app.route('/admin/profiling/reset', methods=['POST'])
+@admin_required
+def admin_profiling_reset():
+    """Forget the collected timings and captures - admin only."""
+    profiler.reset()
+    flash('Estadísticas de rendimiento reiniciadas.', 'success')
+    return redirect(url_for('admin_profiling'))
 
 
 @app.route('/admin/security/unblock/<ip>', methods=['POST'])
 @admin_required
 def admin_unblock_ip(ip):
     """Unblock an IP - admin only."""
-    # Remove from memory
-    if ip in login_attempts:
-        del login_attempts[ip]
-    
-    # Remove from database
-    LoginAttempt.query.filter_by(ip_address=ip).delete()
-    db.session.commit()
+    login_limiter.reset(ip)
     
     flash(f'IP {ip} desbloqueada exitosamente.', 'success')
     return redirect(url_for('admin_security'))
@@ -1119,16 +1218,7 @@ def admin_unblock_ip(ip):
 @admin_required
 def admin_clear_all_blocks():
     """Clear all blocked IPs - admin only."""
-    # Count from both memory and database
-    count_memory = len(login_attempts)
-    count_db = LoginAttempt.query.count()
-    
-    # Clear both
-    login_attempts.clear()
-    LoginAttempt.query.delete()
-    db.session.commit()
-    
-    total = count_memory + count_db
+    total = login_limiter.clear()
     flash(f'{total} direcciones IP desbloqueadas.', 'success')
     return redirect(url_for('admin_security'))
 
@@ -1188,7 +1278,8 @@ def internal_error(e):
 @app.errorhandler(413)
 def request_entity_too_large(e):
     """Handle file too large errors."""
-    flash('El archivo es demasiado grande. Máximo 16MB.', 'danger')
+    max_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    flash(f'El archivo es demasiado grande. Máximo {max_mb}MB.', 'danger')
     return redirect(url_for('upload'))
 
 
@@ -1197,11 +1288,22 @@ def request_entity_too_large(e):
 # ============================================================================
 
 if __name__ == '__main__':
+    # Auto-pull database changes before serving
+    auto_git_pull_on_startup()
     with app.app_context():
         # Create tables if they don't exist
         db.create_all()
     
-    # Run app
+    # Run app: development server with reloader only in development
     port = int(os.environ.get('PORT', 5000))
-    debug = os.environ.get('FLASK_ENV') == 'development'
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    if os.environ.get('FLASK_ENV') == 'development':
+        warmup.start()
+        app.run(host='0.0.0.0', port=port, debug=True)
+    else:
+        workers = serve_settings()['workers']
+        missing = unshared_state()
+        if workers > 1 and missing:
+            # Cada worker tendría su propio limitador/caché: se sirve con uno solo
+            print(f"[Serve] WEB_WORKERS={workers} needs {', '.join(missing)}; using 1 worker", flush=True)
+            workers = 1
+        serve(app, host='0.0.0.0', port=port, on_start=start_worker, workers=workers)
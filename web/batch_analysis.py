@@ -0,0 +1,210 @@
+"""Parallel analysis of many logs at once (POST /api/analyze_batch).
+
+Uploaded files (plain, .gz, or zips with several logs) are written to a
+temporary directory and analyzed with ``analyze_log_lines`` in a
+``ProcessPoolExecutor``, so a batch uses every core instead of one
+request thread. Workers only receive a file path and return the plain
+analysis dict; classification against the mods table happens in the
+web process (see ``app.classify_mods``).
+
+The pool uses the ``spawn`` start method: the web process is
+multi-threaded (gunicorn gthread, waitress), and a forked child would
+inherit held locks, the SQLAlchemy pool and the background threads.
+Its processes only import ``batch_worker`` (see :func:`_detach_main`).
+A batch may write at most ``MAX_BATCH_BYTES`` to the temporary
+directory; past that, :func:`collect_logs` raises ``LogTooLargeError``.
+"""
+
+import atexit
+import importlib.machinery
+import os
+import sys
+import threading
+import zipfile
+from itertools import repeat
+
+from batch_worker import analyze_path
+from log_stream import LogTooLargeError, MAX_LOG_BYTES, ZIP_MAGIC
+
+MAX_BATCH_FILES = int(os.environ.get('BATCH_MAX_FILES', 200))
+# Bytes que un lote puede escribir en el directorio temporal (logs descomprimidos de los zips incluidos)
+MAX_BATCH_BYTES = int(os.environ.get('BATCH_MAX_MB', 1024)) * 1024 * 1024
+COPY_CHUNK_BYTES = 1024 * 1024
+# Por debajo de este tamaño total no compensa repartir el trabajo entre procesos
+INLINE_MAX_BYTES = 256 * 1024
+BATCH_LOG_EXTENSIONS = ('.log', '.txt', '.log.gz', '.txt.gz')
+
+
+def _is_log_member(info):
+    name = info.filename.lower()
+    return not info.is_dir() and name.endswith(BATCH_LOG_EXTENSIONS) and '__macosx/' not in name
+
+
+def collect_logs(files, workdir, max_files=MAX_BATCH_FILES, max_bytes=MAX_BATCH_BYTES):
+    """Save uploaded files into ``workdir``, expanding zip archives.
+
+    Returns ``(entries, skipped)`` where entries are ``(path, filename)``
+    tuples and skipped are ``{'filename', 'error'}`` dicts for files that
+    could not be queued. Raises LogTooLargeError as soon as the batch
+    would write more than ``max_bytes`` in total.
+    """
+    entries = []
+    skipped = []
+    written = 0
+
+    def too_large():
+        return LogTooLargeError(f'El lote supera el máximo de {max_bytes // (1024 * 1024)}MB')
+
+    def add(filename, source):
+        nonlocal written
+        if len(entries) >= max_files:
+            skipped.append({'filename': filename, 'error': f'Máximo {max_files} logs por lote'})
+            return
+        path = os.path.join(workdir, f'{len(entries):04d}.log')
+        with open(path, 'wb') as out:
+            for chunk in iter(lambda: source.read(COPY_CHUNK_BYTES), b''):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise too_large()
+                out.write(chunk)
+        entries.append((path, filename))
+
+    for f in files:
+        if not f or not f.filename:
+            continue
+        stream = f.stream
+        stream.seek(0)
+        is_zip = stream.read(4).startswith(ZIP_MAGIC)
+        stream.seek(0)
+        if not is_zip:
+            add(f.filename, stream)
+            continue
+        try:
+            archive = zipfile.ZipFile(stream)
+            members = [i for i in archive.infolist() if _is_log_member(i)]
+        except zipfile.BadZipFile:
+            skipped.append({'filename': f.filename, 'error': 'Archivo zip dañado'})
+            continue
+        for info in members:
+            name = f'{f.filename}/{info.filename}'
+            # zipfile nunca lee más de file_size, así que el tamaño declarado es fiable
+            if info.file_size > MAX_LOG_BYTES:
+                skipped.append({'filename': name, 'error': 'El log es demasiado grande'})
+                continue
+            if written + info.file_size > max_bytes and len(entries) < max_files:
+                raise too_large()
+            try:
+                with archive.open(info) as member:
+                    add(name, member)
+            except (zipfile.BadZipFile, OSError) as e:
+                skipped.append({'filename': name, 'error': f'No se pudo extraer: {e}'})
+    return entries, skipped
+
+
+def _detach_main():
+    """Keep spawned pool processes from re-running the main script.
+
+    ``spawn`` children execute a script started as ``python app.py`` again,
+    as ``__mp_main__``: every pool process would build its own app (database
+    engines, limiter, GPT enricher, git-sync atexit hooks). multiprocessing
+    skips that for a main module whose spec is named ``__main__``; the
+    workers only need :mod:`batch_worker`, which does not import the app.
+    """
+    main = sys.modules.get('__main__')
+    if main is not None and getattr(main, '__spec__', None) is None:
+        main.__spec__ = importlib.machinery.ModuleSpec('__main__', None)
+
+
+class BatchAnalyzer:
+    """Process pool shared by all batch requests.
+
+    :meth:`start` creates it in each serving process (``app.start_worker``,
+    after gunicorn forks); otherwise the first large batch does.
+
+    Args:
+        max_workers: Pool size (``BATCH_WORKERS`` env var, default: CPUs).
+        inline_max_bytes: Batches of one file or smaller than this total
+            size are analyzed in the calling thread.
+    """
+
+    def __init__(self, max_workers=None, inline_max_bytes=INLINE_MAX_BYTES):
+        self.max_workers = max_workers or int(os.environ.get('BATCH_WORKERS', 0)) or os.cpu_count() or 1
+        self.inline_max_bytes = inline_max_bytes
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Create the pool (its processes are spawned on the first batch)."""
+        if self.max_workers > 1:
+            self._pool()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # multiprocessing no se importa al importar la app (arranque más rápido)
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                _detach_main()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def analyze(self, entries, include_chat=False):
+        """Analyze ``(path, filename)`` entries; results keep the input order."""
+        if not entries:
+            return []
+        total_size = sum(os.path.getsize(path) for path, _ in entries)
+        if self.max_workers == 1 or len(entries) == 1 or total_size <= self.inline_max_bytes:
+            return [analyze_path(path, filename, include_chat) for path, filename in entries]
+        paths, filenames = zip(*entries)
+        try:
+            return list(self._pool().map(analyze_path, paths, filenames, repeat(include_chat, len(paths))))
+        except Exception as e:
+            # BrokenProcessPool (p. ej. un worker muerto por falta de memoria): recrear el pool
+            print(f"[Batch] Process pool failed, analyzing inline: {e}", flush=True)
+            self.shutdown()
+            return [analyze_path(path, filename, include_chat) for path, filename in entries]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def summarize(results, canonical=lambda name: name):
+    """Aggregate classified results: which prohibited mods appeared in how many logs.
+
+    ``canonical`` maps a detected mod name to the name used for grouping
+    (e.g. the mods-table name, so aliases count as the same mod).
+    """
+    prohibited = {}
+    clients = {}
+    versions = {}
+    analyzed = failed = flagged = 0
+    for result in results:
+        if result.get('error'):
+            failed += 1
+            continue
+        analyzed += 1
+        names = {canonical(m['name']) for m in result.get('mods_prohibidos', [])}
+        if names:
+            flagged += 1
+        for name in names:
+            entry = prohibited.setdefault(name, {'name': name, 'logs': 0, 'files': []})
+            entry['logs'] += 1
+            entry['files'].append(result['filename'])
+        client = result.get('client') or 'Desconocido'
+        clients[client] = clients.get(client, 0) + 1
+        version = result.get('mc_version') or 'Desconocida'
+        versions[version] = versions.get(version, 0) + 1
+    return {
+        'files': len(results),
+        'analyzed': analyzed,
+        'failed': failed,
+        'with_prohibited': flagged,
+        'prohibited_mods': sorted(prohibited.values(), key=lambda e: (-e['logs'], e['name'].lower())),
+        'clients': clients,
+        'mc_versions': versions,
+    }
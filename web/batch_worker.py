@@ -0,0 +1,17 @@
+"""Code run inside the batch process pool (see batch_analysis.py).
+
+Kept apart from the web app: pool processes are spawned and import only
+this module and the analyzer, never ``app``.
+"""
+
+from analyze_mc_log_utils import analyze_log_lines
+from log_stream import LogUpload, LogStreamError
+
+
+def analyze_path(path, filename, include_chat=False):
+    """Analyze one log stored on disk (runs inside a worker process)."""
+    try:
+        with open(path, 'rb') as f:
+            return analyze_log_lines(LogUpload(f, filename).lines(), include_chat=include_chat)
+    except LogStreamError as e:
+        return {'error': str(e)}
@@ -0,0 +1,797 @@
+# benchmark.py
+"""
+Benchmarks de los analizadores de logs.
+
+Uso:
+    python benchmark.py keywords [--lines 20000] [--sizes 107,1000,10000]
+    python benchmark.py gpt [--latency 1.0] [--jitter 0.3] [--chunks 4] [--deadline 3]
+    python benchmark.py regex [--lines 200000]
+    python benchmark.py phases [--lines 200000] [--chat-ratio 0.6]
+    python benchmark.py suite [--lines 50000] [--json out.json] [--compare base.json]
+    python benchmark.py search [--sizes 1000,10000,50000]
+    python benchmark.py sqlite [--readers 4] [--writers 2] [--seconds 5]
+    python benchmark.py startup [--repeat 5] [--top 15]
+    python benchmark.py serve [--light 8] [--heavy 2] [--seconds 10]
+
+``suite`` mide los analizadores y la ruta /analyze sobre logs de
+gen_lunar_log.py y guarda los tiempos en JSON para comparar commits.
+``startup`` muestra qué cuesta importar app.py (``-X importtime``) y el
+tiempo hasta el primer byte de run_app.py. ``serve`` lanza app.py con
+cada servidor (serve.py) y mide peticiones concurrentes y el apagado
+con SIGTERM.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+WEB_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(WEB_DIR))
+
+from keyword_matcher import KeywordMatcher, ahocorasick
+
+
+def _timings(fn, *args, repeat=3):
+    """Tiempos (segundos) de ``repeat`` ejecuciones."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _timeit(fn, *args, repeat=3):
+    """Devuelve el mejor tiempo (segundos) de ``repeat`` ejecuciones."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _load_prohibited():
+    with open(WEB_DIR / 'prohibited_mods.txt', 'r', encoding='utf-8') as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+
+def _sample_lines(n):
+    """Líneas de log variadas (carga de mods, chat, advertencias)."""
+    rnd = random.Random(42)
+    templates = [
+        "[14:22:{s:02d}] [Render thread/INFO]: [STDOUT]: Found Entrypoint(client) me.{w}.mods.{w}.client.{W}ClientMod",
+        "[14:22:{s:02d}] [main/INFO]: Loaded configuration file for {W}: 42 options available",
+        "[14:22:{s:02d}] [Render thread/INFO]: [System] [CHAT] <Player{s}> {w} {w} gg",
+        "[14:22:{s:02d}] [main/WARN]: Force-disabling mixin '{w}' as rule '{w}' (added by mods [{w}]) disables it",
+        "[14:22:{s:02d}] [Render thread/INFO]: Reloading ResourceManager: vanilla, fabric ({w} 1.0)",
+    ]
+    lines = []
+    for i in range(n):
+        w = ''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 9)))
+        lines.append(rnd.choice(templates).format(s=i % 60, w=w, W=w.capitalize()).lower())
+    return lines
+
+
+def _mc_log_lines(n):
+    """Log sintético tipo Fabric; las líneas que identifican jugador/versión/cliente
+    van al final para medir el peor caso (recorrido completo)."""
+    rnd = random.Random(42)
+    mods = ['sodium', 'iris', 'lithium', 'krypton', 'modmenu', 'wurst', 'fabric-api-base', 'mixinextras']
+    templates = [
+        "[14:22:{s:02d}] [Render thread/INFO]: [System] [CHAT] <Player{s}> {w} {w} gg",
+        "[14:22:{s:02d}] [Server thread/INFO]: Preparing spawn area: {s}%",
+        "[14:22:{s:02d}] [Render thread/WARN]: Missing sound for event: minecraft:{w}.{w}",
+        "[14:22:{s:02d}] [main/INFO]: Found Entrypoint(client) me.{w}.mods.{m}.client.{W}ClientMod",
+        "[14:22:{s:02d}] [main/INFO]: Loaded configuration file for {m}: 42 options available",
+        "[14:22:{s:02d}] [main/WARN]: Force-disabling mixin '{w}' as rule '{w}' (added by mods [{m}]) disables it",
+        "[14:22:{s:02d}] [Render thread/INFO]: Reloading ResourceManager: vanilla, fabric ({m} 1.0)",
+        "[14:22:{s:02d}] [main/ERROR]: Exception loading {W} from mods/{m}-1.2.3.jar",
+    ]
+    lines = ["[14:22:00] [main/INFO]: Loading 8 mods:"]
+    lines += [f"\t- {m} 1.{i}.0" for i, m in enumerate(mods)]
+    for i in range(n):
+        w = ''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 9)))
+        lines.append(rnd.choice(templates).format(s=i % 60, w=w, W=w.capitalize(), m=rnd.choice(mods)))
+    lines += [
+        "[14:23:00] [Render thread/INFO]: Setting user: Player123",
+        "[14:23:00] [Render thread/INFO]: Loading Minecraft 1.20.1 with Fabric Loader 0.14.21",
+    ]
+    return lines
+
+
+def bench_regex(args):
+    """Coste por función de analyze_mc_log_utils sobre un log sintético grande."""
+    import analyze_mc_log_utils as utils
+
+    lines = _mc_log_lines(args.lines)
+    print(f"{len(lines)} líneas")
+    print(f"{'función':<22} {'total (s)':>10} {'µs/línea':>9}")
+    for name in ('extract_player', 'extract_mc_version', 'extract_client', 'extract_errors',
+                 'extract_mods', 'analyze_log_lines'):
+        elapsed = _timeit(getattr(utils, name), lines)
+        print(f"{name:<22} {elapsed:10.3f} {elapsed / len(lines) * 1e6:9.2f}")
+
+    names = [m['name'] for m in utils.extract_mods(lines)['mods']] * 200
+    names += ['fabric-api-base', 'org_lwjgl', 'mixinextras', 'sodium', 'wurst'] * 2000
+
+    def loop():
+        # Implementación anterior: un re.search por patrón
+        return [any(re.search(p, n, re.IGNORECASE) for p in utils.DEPENDENCY_PATTERNS) for n in names]
+
+    t_loop = _timeit(loop)
+    t_fused = _timeit(lambda: [utils.is_dependency(n) for n in names])
+    print(f"\nis_dependency ({len(names)} nombres, {len(utils.DEPENDENCY_PATTERNS)} patrones)")
+    print(f"{'bucle de patrones':<22} {t_loop:10.3f}")
+    print(f"{'alternancia fusionada':<22} {t_fused:10.3f}")
+
+
+def _session_log_lines(n, chat_ratio):
+    """Sesión completa: arranque, carga de mods, entrada al servidor y ``n``
+    líneas de juego de las que ``chat_ratio`` son chat."""
+    rnd = random.Random(3)
+    head = [line for line in _mc_log_lines(200) if '[CHAT]' not in line]
+    lines = head[-2:] + head[:-2] + ["[14:23:01] [Render thread/INFO]: Connecting to play.example.net, 25565"]
+    for i in range(n):
+        w = ''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 9)))
+        if rnd.random() < chat_ratio:
+            lines.append(f"[15:{i // 60 % 60:02d}:{i % 60:02d}] [Render thread/INFO]: [System] [CHAT] <Player{i % 97}> {w} lunar 1.8 error gg")
+        else:
+            lines.append(f"[15:{i // 60 % 60:02d}:{i % 60:02d}] [Render thread/WARN]: Missing sound for event: minecraft:{w}")
+    return lines
+
+
+def bench_phases(args):
+    """Análisis por fases (sin chat) frente al recorrido completo de todas las líneas."""
+    from analyze_mc_log_utils import analyze_log_lines
+
+    lines = _session_log_lines(args.lines, args.chat_ratio)
+    phases = analyze_log_lines(lines)['phases']
+    print(f"{len(lines)} líneas, {args.chat_ratio:.0%} chat; fases: {phases}")
+    t_full = _timeit(analyze_log_lines, lines, True)
+    t_phases = _timeit(analyze_log_lines, lines)
+    print(f"{'completo (include_chat)':<24} {t_full:8.3f}s")
+    print(f"{'por fases':<24} {t_phases:8.3f}s  (x{t_full / t_phases:.1f})")
+
+
+def bench_search(args):
+    """Búsqueda de mods: ILIKE frente al índice FTS5 al crecer el catálogo."""
+    from flask import Flask
+    from models import db, Mod
+    from mod_search import ModSearch
+
+    rnd = random.Random(5)
+    terms = ['sodium', 'wurst', 'xray', 'kill', 'sodum', 'zzqqx']
+    print(f"{'mods':>7} {'ILIKE (ms)':>11} {'FTS5 (ms)':>10}")
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix='blurkit-search-')
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'mods.db')}"
+        db.init_app(app)
+        with app.app_context():
+            Mod.__table__.create(db.engine)
+            base = ['Sodium', 'Wurst Client', 'XRay', 'Kill Aura', 'Lithium', 'Iris', 'Meteor']
+            rows = []
+            for i in range(size):
+                w = ''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(5, 10)))
+                name = f"{base[i]}" if i < len(base) else f"{w.capitalize()} {i}"
+                rows.append({'name': name, 'status': rnd.choice(['permitido', 'prohibido']),
+                             'aliases': f"{w[:4]}, {w[::-1]}", 'category': rnd.choice(['pvp', 'render', 'utility']),
+                             'description': f"mod {w} para {rnd.choice(['pvp', 'fps', 'mapas'])}"})
+            db.session.execute(db.insert(Mod), rows)
+            db.session.commit()
+            search = ModSearch()
+            search.ensure_index()
+
+            def ilike():
+                for term in terms:
+                    search._like(term, None)
+
+            def fts():
+                for term in terms:
+                    search.search(term)
+
+            t_like = _timeit(ilike) / len(terms) * 1000
+            t_fts = _timeit(fts) / len(terms) * 1000
+            db.session.remove()
+        print(f"{size:>7} {t_like:11.2f} {t_fts:10.2f}")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _sqlite_worker(uri, tuned, role, seconds, seed):
+    """Proceso lector o escritor (como un worker de gunicorn) contra ``uri``."""
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+    import sqlite_tuning
+
+    if tuned:
+        sqlite_tuning.install()
+        engine = create_engine(uri, **sqlite_tuning.engine_options(uri))
+    else:
+        engine = create_engine(uri)
+    rnd = random.Random(seed)
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if role == 'reader':
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT count(*) FROM mods WHERE status = :s"),
+                                 {'s': rnd.choice(['permitido', 'prohibido'])}).scalar()
+                    conn.execute(text("SELECT * FROM mods ORDER BY name LIMIT 50 OFFSET :o"),
+                                 {'o': rnd.randint(0, 4900)}).all()
+            else:
+                with engine.begin() as conn:
+                    ip = f"10.0.0.{rnd.randint(1, 50)}"
+                    updated = conn.execute(text(
+                        "UPDATE login_attempts SET attempts = attempts + 1, last_attempt = :t WHERE ip_address = :ip"
+                    ), {'t': time.time(), 'ip': ip}).rowcount
+                    if not updated:
+                        conn.execute(text(
+                            "INSERT INTO login_attempts (ip_address, username, attempts, last_attempt) "
+                            "VALUES (:ip, 'bench', 1, :t)"), {'ip': ip, 't': time.time()})
+                    if rnd.random() < 0.1:
+                        conn.execute(text("UPDATE mods SET description = :d WHERE id = :id"),
+                                     {'d': f'edit {time.time()}', 'id': rnd.randint(1, 5000)})
+                time.sleep(0.005)
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors += 1
+    engine.dispose()
+    return role, latencies, errors
+
+
+def bench_sqlite(args):
+    """Lectores y escritores simultáneos (procesos) con la configuración por defecto y con sqlite_tuning."""
+    import multiprocessing
+    import sqlite3
+
+    print(f"{args.readers} lectores + {args.writers} escritores, {args.seconds}s por configuración")
+    print(f"{'config':<8} {'lect/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>8} {'escr/s':>7} {'p95 ms':>7} {'errores':>8}")
+    for tuned in (False, True):
+        workdir = tempfile.mkdtemp(prefix='blurkit-sqlite-')
+        path = os.path.join(workdir, 'bench.db')
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            "CREATE TABLE mods (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, status TEXT NOT NULL, description TEXT);"
+            "CREATE TABLE login_attempts (id INTEGER PRIMARY KEY, ip_address TEXT NOT NULL, username TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL, last_attempt REAL NOT NULL);"
+            "CREATE INDEX ix_login_attempts_ip ON login_attempts (ip_address);"
+        )
+        conn.executemany("INSERT INTO mods (name, status, description) VALUES (?, ?, ?)",
+                         [(f"mod{i:05d}", 'permitido' if i % 2 else 'prohibido', 'x' * 80) for i in range(5000)])
+        conn.commit()
+        conn.close()
+        uri = f"sqlite:///{path}"
+        jobs = [('reader', i) for i in range(args.readers)] + [('writer', 100 + i) for i in range(args.writers)]
+        with multiprocessing.get_context('spawn').Pool(len(jobs)) as pool:
+            results = pool.starmap(_sqlite_worker, [(uri, tuned, role, args.seconds, seed) for role, seed in jobs])
+        reads = [lat for role, lats, _ in results if role == 'reader' for lat in lats]
+        writes = [lat for role, lats, _ in results if role == 'writer' for lat in lats]
+        errors = sum(err for _, _, err in results)
+        print(f"{'tuned' if tuned else 'default':<8} {len(reads) / args.seconds:8.0f} "
+              f"{_percentile(reads, 50) * 1000:7.2f} {_percentile(reads, 95) * 1000:7.2f} {_percentile(reads, 99) * 1000:8.2f} "
+              f"{len(writes) / args.seconds:7.0f} {_percentile(writes, 95) * 1000:7.2f} {errors:8d}")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_keywords(args):
+    """Compara ``palabra in línea`` frente a Aho-Corasick al crecer la lista."""
+    base = _load_prohibited()
+    lines = _sample_lines(args.lines)
+    rnd = random.Random(7)
+    print(f"{args.lines} líneas; pyahocorasick: {'sí' if ahocorasick else 'no'}")
+    print(f"{'patrones':>9} {'naive (s)':>10} {'python (s)':>11} {'nativo (s)':>11}")
+    for size in args.sizes:
+        patterns = list(base)
+        while len(patterns) < size:
+            patterns.append(''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(5, 12))))
+        patterns = patterns[:size]
+
+        def naive():
+            return [[p for p in patterns if p in line] for line in lines]
+
+        py_matcher = KeywordMatcher(patterns, use_native=False)
+        t_naive = _timeit(naive)
+        t_py = _timeit(lambda: [py_matcher.matches(line) for line in lines])
+        t_native = None
+        if ahocorasick is not None:
+            native = KeywordMatcher(patterns)
+            t_native = _timeit(lambda: [native.matches(line) for line in lines])
+        native_txt = f"{t_native:11.3f}" if t_native is not None else f"{'-':>11}"
+        print(f"{size:>9} {t_naive:10.3f} {t_py:11.3f} {native_txt}")
+
+
+def bench_gpt(args):
+    """Latencia del análisis IA contra mock_openai: secuencial vs concurrente y con tiempo límite."""
+    from gpt_analysis import analyze_chunks, select_chunks
+    from mock_openai import start_mock_server
+
+    server = start_mock_server(latency=args.latency, jitter=args.jitter, seed=1)
+    lines = Path(args.log).read_text(encoding='utf-8', errors='replace').splitlines() if args.log else _sample_lines(args.lines)
+    chunks = select_chunks(lines, chunk_chars=args.chunk_chars, max_chunks=args.chunks)
+    permitidos, prohibidos = ['sodium'], _load_prohibited()
+
+    def run(batch, deadline):
+        return asyncio.run(analyze_chunks(batch, 'mock', permitidos, prohibidos,
+                                          deadline=deadline, base_url=server.base_url))
+
+    run(chunks[:1], 60)  # calentar (importar openai)
+    print(f"{len(chunks)} fragmentos; latencia mock {args.latency}s ± {args.jitter}s")
+    start = time.perf_counter()
+    for chunk in chunks:
+        run([chunk], 60)
+    print(f"secuencial:          {time.perf_counter() - start:6.2f}s")
+    start = time.perf_counter()
+    result = run(chunks, 60)
+    print(f"concurrente:         {time.perf_counter() - start:6.2f}s  ({result.get('chunks_done')}/{len(chunks)})")
+    start = time.perf_counter()
+    result = run(chunks, args.deadline)
+    print(f"límite {args.deadline:>4}s:        {time.perf_counter() - start:6.2f}s  "
+          f"({result.get('chunks_done')}/{len(chunks)}, parcial={result.get('partial')})")
+    server.shutdown()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=WEB_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _analyze_route():
+    """POST /analyze de principio a fin contra una copia temporal de la base de datos.
+
+    Devuelve ``(post, cleanup)``; ``post(texto)`` vacía la caché de
+    resultados antes de cada petición para medir siempre el análisis en frío.
+    """
+    workdir = tempfile.mkdtemp(prefix='blurkit-bench-')
+    source = WEB_DIR / 'instance' / 'blurkit.db'
+    if source.exists():
+        shutil.copy(source, os.path.join(workdir, 'blurkit.db'))
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'blurkit.db')}"
+    os.environ['HISTORY_DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'history.db')}"
+    os.environ.pop('OPENAI_API_KEY', None)
+    import app as webapp
+    from models import db, User
+
+    with webapp.app.app_context():
+        db.create_all()
+        user = User.query.filter_by(username='benchmark').first()
+        if user is None:
+            password = webapp.bcrypt.generate_password_hash('benchmark').decode('utf-8')
+            db.session.add(User(username='benchmark', email='benchmark@localhost',
+                                password_hash=password, role='admin'))
+            db.session.commit()
+    client = webapp.app.test_client()
+    client.post('/login', data={'username': 'benchmark', 'password': 'benchmark'})
+
+    def post(text):
+        webapp.result_cache.clear()
+        response = client.post('/analyze', data={'log': text})
+        if response.status_code != 200:
+            raise RuntimeError(f'/analyze devolvió {response.status_code}')
+
+    return post, lambda: shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_suite(args):
+    """Analizadores y ruta /analyze sobre logs generados; resultados en JSON."""
+    from analyze_mc_log_utils import analyze_log_lines
+    from core import analizar_log_desde_lineas, get_log_analyzer, load_mods
+    from gen_lunar_log import generate_log
+
+    try:
+        mods = load_mods(str(WEB_DIR / 'instance' / 'blurkit.db'))
+    except FileNotFoundError:
+        mods = []
+    log_analyzer = get_log_analyzer(str(WEB_DIR / 'prohibited_mods.txt'), str(WEB_DIR / 'hack_detector_model.pkl'))
+    post, cleanup = _analyze_route() if args.route else (None, None)
+    params = {'lines': args.lines, 'mods': args.mods, 'prohibited': args.prohibited,
+              'chat_ratio': args.chat_ratio, 'duplicate_ratio': args.duplicate_ratio, 'repeat': args.repeat}
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'ml_model': log_analyzer.ml_model is not None,
+        'params': params,
+        'results': [],
+    }
+    prohibited = _load_prohibited()[:args.prohibited]
+    print(f"{'loader':<8} {'función':<31} {'mejor (s)':>10} {'media (s)':>10} {'µs/línea':>9}")
+    try:
+        for loader in args.loaders:
+            lines = generate_log(loader, lines=args.lines, mods=args.mods, prohibited=prohibited,
+                                 chat_ratio=args.chat_ratio, duplicate_ratio=args.duplicate_ratio)
+            text = '\n'.join(lines)
+            targets = [
+                ('analyze_log_lines', analyze_log_lines, lines),
+                ('analizar_log_desde_lineas', lambda ls: analizar_log_desde_lineas(ls, mods), lines),
+                ('MinecraftLogAnalyzer.parse_log', log_analyzer.parse_log, lines),
+            ]
+            if post is not None:
+                targets.append(('POST /analyze', post, text))
+            for name, fn, data in targets:
+                times = _timings(fn, data, repeat=args.repeat)
+                best, mean = min(times), sum(times) / len(times)
+                report['results'].append({'loader': loader, 'function': name, 'lines': len(lines),
+                                          'bytes': len(text.encode('utf-8')), 'best_s': round(best, 6),
+                                          'mean_s': round(mean, 6), 'us_per_line': round(best / len(lines) * 1e6, 3)})
+                print(f"{loader:<8} {name:<31} {best:10.3f} {mean:10.3f} {best / len(lines) * 1e6:9.2f}")
+    finally:
+        if cleanup is not None:
+            cleanup()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.json}")
+    if args.compare:
+        _compare(report, args.compare, args.threshold)
+
+
+def _compare(report, baseline_path, threshold):
+    """Imprime la variación de cada medida respecto a un JSON anterior de ``suite``."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['loader'], r['function']): r for r in baseline.get('results', [])}
+    print(f"\nComparación con {baseline_path} (commit {baseline.get('commit')})")
+    for result in report['results']:
+        old = previous.get((result['loader'], result['function']))
+        if old is None or not old['best_s']:
+            continue
+        change = (result['best_s'] / old['best_s'] - 1) * 100
+        flag = '  <-- más lento' if change > threshold else ''
+        print(f"{result['loader']:<8} {result['function']:<31} {old['best_s']:8.3f} -> {result['best_s']:8.3f} "
+              f"({change:+6.1f}%){flag}")
+
+
+# Dependencias opcionales que no deben cargarse al importar la app
+LAZY_MODULES = ('openai', 'sklearn', 'numpy', 'scipy', 'joblib')
+
+
+def _startup_env(workdir):
+    """Entorno con bases de datos temporales (la app crea tablas en el primer uso)."""
+    source = WEB_DIR / 'instance' / 'blurkit.db'
+    if source.exists() and not os.path.exists(os.path.join(workdir, 'blurkit.db')):
+        shutil.copy(source, os.path.join(workdir, 'blurkit.db'))
+    env = dict(os.environ)
+    env.pop('FLASK_ENV', None)
+    env.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'blurkit.db')}",
+        'HISTORY_DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'history.db')}",
+        'RATE_LIMIT_DB': os.path.join(workdir, 'rate_limits.db'),
+        'GPT_JOBS_DB': os.path.join(workdir, 'gpt_jobs.db'),
+        'RESULT_CACHE_DB': os.path.join(workdir, 'result_cache.db'),
+        'PYTHONUNBUFFERED': '1',
+    })
+    return env
+
+
+def _import_times(env):
+    """``{módulo: (propio_us, acumulado_us, nivel)}`` de ``import app`` según ``-X importtime``."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=WEB_DIR,
+                            env=env, capture_output=True, text=True, timeout=120)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip(' '))) // 2
+        times[name.strip()] = (int(own), int(cumulative), level)
+    if 'app' not in times:
+        raise RuntimeError(f'import app falló:\n{result.stderr[-2000:]}')
+    return times
+
+
+def _time_to_first_byte(env, timeout=60.0):
+    """Segundos desde lanzar run_app.py hasta la primera respuesta de /."""
+    import socket
+    import urllib.request
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    env = dict(env, BLURKIT_PORT=str(port))
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(WEB_DIR.parent / 'run_app.py'), '--no-browser'],
+                               cwd=WEB_DIR.parent, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f'run_app.py terminó con código {process.returncode}')
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=2) as response:
+                    response.read()
+                return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError('run_app.py no respondió a tiempo')
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def bench_startup(args):
+    """Coste de importar app.py por módulo y tiempo hasta el primer byte de run_app.py."""
+    workdir = tempfile.mkdtemp(prefix='blurkit-startup-')
+    try:
+        env = _startup_env(workdir)
+        # Mejor valor de cada módulo en ``repeat`` procesos nuevos
+        best = {}
+        for _ in range(args.repeat):
+            for name, (own, cumulative, level) in _import_times(env).items():
+                old = best.get(name)
+                if old is None or cumulative < old[1]:
+                    best[name] = (own, cumulative, level)
+        total = best['app'][1]
+        app_level = best['app'][2]
+        print(f"import app: {total / 1000:.1f} ms (propio {best['app'][0] / 1000:.1f} ms, "
+              f"{len(best)} módulos)\n")
+
+        print(f"{'import directo de app.py':<34} {'acumulado (ms)':>14} {'%':>6}")
+        direct = [(n, t) for n, t in best.items() if t[2] == app_level + 1]
+        for name, (own, cumulative, level) in sorted(direct, key=lambda item: -item[1][1])[:args.top]:
+            print(f"{name:<34} {cumulative / 1000:14.1f} {cumulative / total * 100:6.1f}")
+
+        packages = {}
+        for name, (own, cumulative, level) in best.items():
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + own
+        print(f"\n{'paquete (tiempo propio)':<34} {'ms':>14} {'%':>6}")
+        for package, own in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{package:<34} {own / 1000:14.1f} {own / total * 100:6.1f}")
+
+        loaded = [m for m in LAZY_MODULES if m in best]
+        print(f"\nDependencias pesadas cargadas al importar: {', '.join(loaded) if loaded else 'ninguna'}")
+
+        if args.ttfb:
+            times = sorted(_time_to_first_byte(env) for _ in range(args.repeat))
+            print(f"\nrun_app.py hasta el primer byte de /: mejor {times[0] * 1000:.0f} ms, "
+                  f"mediana {times[len(times) // 2] * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+SERVE_MODES = ('flask', 'waitress', 'gunicorn')
+
+
+def _free_port():
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _request(port, method, path, body=None, timeout=120):
+    """``(segundos, estado)`` de una petición en una conexión nueva."""
+    import http.client
+
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers={'Content-Type': 'text/plain'} if body else {})
+        response = conn.getresponse()
+        response.read()
+        return time.perf_counter() - start, response.status
+    finally:
+        conn.close()
+
+
+def _start_server(env, mode, args):
+    """Lanza ``python app.py`` con el servidor ``mode``; devuelve ``(proceso, puerto)`` ya listo."""
+    port = _free_port()
+    env = dict(env, WEB_SERVER=mode, PORT=str(port), WEB_WORKERS=str(args.workers),
+               WEB_THREADS=str(args.threads))
+    process = subprocess.Popen([sys.executable, 'app.py'], cwd=WEB_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'app.py ({mode}) terminó con código {process.returncode}')
+        try:
+            if _request(port, 'GET', '/healthz', timeout=2)[1] == 200:
+                return process, port
+        except OSError:
+            pass
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f'app.py ({mode}) no respondió a tiempo')
+
+
+def _stop_server(process):
+    """SIGTERM y segundos hasta que el proceso termina."""
+    start = time.perf_counter()
+    process.terminate()
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return time.perf_counter() - start
+
+
+def _load(port, args, log):
+    """Clientes ligeros (GET) y pesados (POST de un log) en paralelo durante ``args.seconds``."""
+    import threading
+
+    deadline = time.perf_counter() + args.seconds
+    results = {'light': [], 'heavy': [], 'errors': 0}
+    lock = threading.Lock()
+
+    def client(kind, index):
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            try:
+                if kind == 'light':
+                    path = '/modsjg' if n % 2 else '/healthz'
+                    elapsed, status = _request(port, 'GET', path)
+                else:
+                    # Línea única para que la caché de resultados no responda por el análisis
+                    body = f"{log}\n[14:23:01] [main/INFO]: request {index}-{n}\n".encode()
+                    elapsed, status = _request(port, 'POST', '/api/analyze_log', body)
+            except OSError:
+                status = None
+            with lock:
+                if status == 200:
+                    results[kind].append(elapsed)
+                else:
+                    results['errors'] += 1
+
+    threads = [threading.Thread(target=client, args=('light', i)) for i in range(args.light)]
+    threads += [threading.Thread(target=client, args=('heavy', i)) for i in range(args.heavy)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results['seconds'] = time.perf_counter() - start
+    return results
+
+
+def _graceful(port, process, log):
+    """Envía SIGTERM con un análisis en curso; True si la respuesta llega completa."""
+    import threading
+
+    outcome = {}
+
+    def post():
+        try:
+            outcome['status'] = _request(port, 'POST', '/api/analyze_log', f"{log}\nshutdown".encode())[1]
+        except OSError as e:
+            outcome['status'] = type(e).__name__
+
+    thread = threading.Thread(target=post)
+    thread.start()
+    time.sleep(0.1)
+    seconds = _stop_server(process)
+    thread.join()
+    return outcome['status'], seconds
+
+
+def bench_serve(args):
+    """Rendimiento con peticiones concurrentes: servidor de desarrollo vs waitress vs gunicorn."""
+    workdir = tempfile.mkdtemp(prefix='blurkit-serve-')
+    try:
+        env = _startup_env(workdir)
+        log = '\n'.join(_mc_log_lines(args.lines))
+        print(f"{args.light} clientes GET (/modsjg, /healthz) + {args.heavy} clientes POST "
+              f"/api/analyze_log ({len(log) / 1e6:.1f} MB), {args.seconds:.0f} s por servidor; "
+              f"gunicorn {args.workers} workers x {args.threads} hilos, waitress {args.threads} hilos\n")
+        print(f"{'servidor':<10} {'GET/s':>7} {'GET p50':>9} {'GET p95':>9} {'POST/s':>7} "
+              f"{'POST p50':>9} {'errores':>8} {'SIGTERM':>18}")
+        for mode in args.servers:
+            process, port = _start_server(env, mode, args)
+            try:
+                results = _load(port, args, log)
+                status, seconds = _graceful(port, process, log)
+            finally:
+                if process.poll() is None:
+                    _stop_server(process)
+            light = [t * 1000 for t in results['light']]
+            heavy = [t * 1000 for t in results['heavy']]
+            print(f"{mode:<10} {len(light) / results['seconds']:7.1f} {_percentile(light, 50):7.0f}ms "
+                  f"{_percentile(light, 95):7.0f}ms {len(heavy) / results['seconds']:7.2f} "
+                  f"{_percentile(heavy, 50):7.0f}ms {results['errors']:8d} "
+                  f"{f'{status} en {seconds:.1f} s':>18}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de BlurkitTool")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    kw = sub.add_parser('keywords', help='Palabras clave prohibidas: naive vs Aho-Corasick')
+    kw.add_argument('--lines', type=int, default=20000)
+    kw.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=[107, 1000, 10000])
+    kw.set_defaults(func=bench_keywords)
+
+    rx = sub.add_parser('regex', help='Coste por función de analyze_mc_log_utils')
+    rx.add_argument('--lines', type=int, default=200000)
+    rx.set_defaults(func=bench_regex)
+
+    ph = sub.add_parser('phases', help='Análisis por fases vs recorrido completo')
+    ph.add_argument('--lines', type=int, default=200000)
+    ph.add_argument('--chat-ratio', type=float, default=0.6)
+    ph.set_defaults(func=bench_phases)
+
+    se = sub.add_parser('search', help='Búsqueda de mods: ILIKE vs FTS5')
+    se.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=[1000, 10000, 50000])
+    se.set_defaults(func=bench_search)
+
+    sq = sub.add_parser('sqlite', help='Lectores/escritores concurrentes: SQLite por defecto vs WAL')
+    sq.add_argument('--readers', type=int, default=4)
+    sq.add_argument('--writers', type=int, default=2)
+    sq.add_argument('--seconds', type=float, default=5.0)
+    sq.set_defaults(func=bench_sqlite)
+
+    st = sub.add_parser('suite', help='Analizadores y /analyze sobre logs generados (JSON)')
+    st.add_argument('--lines', type=int, default=50000)
+    st.add_argument('--loaders', type=lambda s: s.split(','), default=['fabric', 'forge', 'lunar', 'vanilla'])
+    st.add_argument('--mods', type=int, default=40)
+    st.add_argument('--prohibited', type=int, default=3, help='mods prohibidos a inyectar')
+    st.add_argument('--chat-ratio', type=float, default=0.3)
+    st.add_argument('--duplicate-ratio', type=float, default=0.2)
+    st.add_argument('--repeat', type=int, default=3)
+    st.add_argument('--no-route', dest='route', action='store_false', help='no medir POST /analyze')
+    st.add_argument('--json', help='guardar los resultados en este archivo')
+    st.add_argument('--compare', help='JSON de una ejecución anterior con el que comparar')
+    st.add_argument('--threshold', type=float, default=10.0, help='%% de empeoramiento que se marca')
+    st.set_defaults(func=bench_suite)
+
+    su = sub.add_parser('startup', help='Coste de importar app.py y tiempo hasta el primer byte')
+    su.add_argument('--repeat', type=int, default=5)
+    su.add_argument('--top', type=int, default=15)
+    su.add_argument('--no-ttfb', dest='ttfb', action='store_false', help='no lanzar run_app.py')
+    su.set_defaults(func=bench_startup)
+
+    sv = sub.add_parser('serve', help='Peticiones concurrentes: servidor de desarrollo vs waitress vs gunicorn')
+    sv.add_argument('--servers', type=lambda s: s.split(','), default=list(SERVE_MODES))
+    sv.add_argument('--light', type=int, default=8, help='clientes GET en paralelo')
+    sv.add_argument('--heavy', type=int, default=2, help='clientes que suben un log en paralelo')
+    sv.add_argument('--lines', type=int, default=50000, help='líneas de cada log subido')
+    sv.add_argument('--seconds', type=float, default=10.0)
+    sv.add_argument('--workers', type=int, default=2)
+    sv.add_argument('--threads', type=int, default=8)
+    sv.set_defaults(func=bench_serve)
+
+    gpt = sub.add_parser('gpt', help='Análisis IA contra el servidor mock (sin red)')
+    gpt.add_argument('--log', help='log a usar (por defecto, líneas generadas)')
+    gpt.add_argument('--lines', type=int, default=20000)
+    gpt.add_argument('--latency', type=float, default=1.0)
+    gpt.add_argument('--jitter', type=float, default=0.3)
+    gpt.add_argument('--chunks', type=int, default=4)
+    gpt.add_argument('--chunk-chars', type=int, default=8000)
+    gpt.add_argument('--deadline', type=float, default=1.0)
+    gpt.set_defaults(func=bench_gpt)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
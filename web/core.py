@@ -1,64 +1,15 @@
-import openai
-
-def analyze_log_with_gpt(log_text: str, openai_api_key: str) -> dict:
+def analyze_log_with_gpt(log_text: str, openai_api_key: str, **kwargs) -> dict:
     """
-    Analiza un log de Minecraft usando GPT-3.5-turbo y devuelve un JSON estructurado igual a analyze_mc_log_utils.py.
+    Analiza un log de Minecraft con GPT y devuelve un JSON estructurado
+    (mods_permitidos, mods_prohibidos, mods_desconocidos, dependencias).
+
+    Envía en paralelo las regiones del log que mencionan mods (no solo los
+    primeros 8 KB) con un tiempo límite; ver gpt_analysis.py.
     """
-    client = openai.OpenAI(api_key=openai_api_key)
+    from gpt_analysis import analyze_lines, mod_lists
     # Cargar mods permitidos y prohibidos desde la BD
-    mods_bd = load_mods()
-    permitidos = []
-    prohibidos = []
-    for m in mods_bd:
-        if m['status'] == 'permitido':
-            permitidos.append(m['name'])
-            if 'alias' in m and m['alias']:
-                if isinstance(m['alias'], list):
-                    permitidos.extend(m['alias'])
-                elif isinstance(m['alias'], str):
-                    permitidos.extend([a.strip() for a in m['alias'].split(',') if a.strip()])
-        elif m['status'] == 'prohibido':
-            prohibidos.append(m['name'])
-            if 'alias' in m and m['alias']:
-                if isinstance(m['alias'], list):
-                    prohibidos.extend(m['alias'])
-                elif isinstance(m['alias'], str):
-                    prohibidos.extend([a.strip() for a in m['alias'].split(',') if a.strip()])
-    permitidos_txt = "\n".join(sorted(set(permitidos)))
-    prohibidos_txt = "\n".join(sorted(set(prohibidos)))
-    # PROMPT: la IA debe clasificar
-    prompt = (
-        "Eres un experto en análisis de logs de Minecraft.\n"
-        "Tu tarea es:\n"
-        "- Extraer y listar absolutamente TODOS los mods, librerías y dependencias que aparezcan en el log, aunque no estén en ninguna lista.\n"
-        "- Clasifica cada mod y dependencia en uno de estos grupos: 'mods_permitidos', 'mods_prohibidos', 'mods_desconocidos', 'dependencias'.\n"
-        "- Usa las siguientes listas para comparar (case-insensitive, ignora espacios y guiones):\n"
-        "  - Permitidos:\n" + permitidos_txt + "\n"
-        "  - Prohibidos:\n" + prohibidos_txt + "\n"
-        "- Si el nombre no está en ninguna lista, ponlo en 'mods_desconocidos'.\n"
-        "- Distingue dependencias/librerías si es posible (por contexto del log).\n"
-        "- Para cada mod o dependencia, incluye el nombre y, si está disponible, la versión.\n"
-        "El resultado debe ser un JSON con la siguiente estructura:\n"
-        "{\n  'mods_permitidos': [ { 'name': '', 'version': '' } ],\n  'mods_prohibidos': [ { 'name': '', 'version': '' } ],\n  'mods_desconocidos': [ { 'name': '', 'version': '' } ],\n  'dependencias': [ { 'name': '', 'version': '' } ]\n}\n"
-        "No expliques nada, solo responde con el JSON.\n"
-        "\nLOG:\n" + log_text[:8000] + "\n"
-    )
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=1024,
-        temperature=0.1,
-    )
-    import json as _json
-    import re as _re
-    content = response.choices[0].message.content
-    match = _re.search(r'\{.*\}', content, _re.DOTALL)
-    if match:
-        try:
-            return _json.loads(match.group(0))
-        except Exception:
-            pass
-    return {"error": "No se pudo analizar el JSON", "raw": content}
+    permitidos, prohibidos = mod_lists(load_mods())
+    return analyze_lines(log_text.splitlines(), openai_api_key, permitidos, prohibidos, **kwargs)
 # Cargar mods desde la base de datos SQLite
 import sqlite3
 
@@ -128,9 +79,8 @@ DEFAULT_MODS = [
 
 
 # Integración del sistema inteligente de detección de mods/hacks ilegales en logs de Minecraft.
-import pickle
-
-from ml_integration import MLLogModel, load_ml_model
+from keyword_matcher import KeywordMatcher
+from ml_integration import get_ml_log_model, model_registry
 from log_analyzer import MinecraftLogAnalyzer
 
 # Utilidad para normalizar nombres de mods (minúsculas y solo alfanumérico)
@@ -139,24 +89,29 @@ def normalizar(texto: str) -> str:
     texto = (texto or "").lower()
     return re.sub(r"[^a-z0-9]", "", texto)
 
+def _load_keyword_matcher(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return KeywordMatcher([line.strip().lower() for line in f if line.strip()])
+
+def get_log_analyzer(prohibited_mods_path=None, model_path='web/hack_detector_model.pkl'):
+    """Devuelve un MinecraftLogAnalyzer con la lista y el modelo residentes en memoria.
+
+    La lista de mods prohibidos y el modelo ML solo se vuelven a leer de disco
+    cuando cambian (ver ``ml_integration.ModelRegistry``).
+    """
+    if prohibited_mods_path is None:
+        prohibited_mods_path = str(BASE_DIR / 'web' / 'prohibited_mods.txt')
+    matcher = model_registry.get(prohibited_mods_path, _load_keyword_matcher, default=KeywordMatcher([]))
+    # ML activado solo si el modelo existe
+    ml_model = get_ml_log_model(model_path)
+    return MinecraftLogAnalyzer([], regex_patterns=[], ml_model=ml_model, keyword_matcher=matcher)
+
 def detectar_mods_ilegales_en_log(log_path, prohibited_mods_path='web/prohibited_mods.txt', model_path='web/hack_detector_model.pkl'):
     """Analiza un log y retorna una lista de detecciones de mods/hacks ilegales."""
     # Usar rutas absolutas para evitar errores
     prohibited_mods_path = str(BASE_DIR / 'web' / 'prohibited_mods.txt')
     # model_path = str(BASE_DIR / 'web' / 'hack_detector_model.pkl')
-    # Cargar lista de mods prohibidos
-    try:
-        with open(prohibited_mods_path, 'r', encoding='utf-8') as f:
-            hacks = [line.strip() for line in f if line.strip()]
-    except Exception:
-        hacks = []
-    # ML activado solo si el modelo existe
-    try:
-        clf, vectorizer = load_ml_model(model_path)
-        ml_model = MLLogModel(clf, vectorizer)
-    except Exception:
-        ml_model = None
-    analyzer = MinecraftLogAnalyzer(hacks, regex_patterns=[], ml_model=ml_model)
+    analyzer = get_log_analyzer(prohibited_mods_path, model_path)
     with open(log_path, 'r', encoding='utf-8') as f:
         lines = f.readlines()
     return analyzer.parse_log(lines)
@@ -1,5 +1,48 @@
+# gen_lunar_log.py
+"""
+Generador de logs sintéticos de Minecraft para pruebas y benchmarks.
 
-log = '''[14:21:26] [main/INFO]: Loaded configuration file for Lithium: 144 options available, 1 override(s) found
+Sin argumentos escribe lunar_sample.log con el log de ejemplo de Lunar.
+Con argumentos genera logs Fabric, Forge, Lunar o Vanilla del tamaño
+pedido, controlando el número de mods, los mods prohibidos inyectados,
+el volumen de chat y la proporción de líneas duplicadas.
+
+Uso:
+    python gen_lunar_log.py
+    python gen_lunar_log.py --loader fabric --lines 200000 --mods 80 \\
+        --prohibited wurst,baritone --chat-ratio 0.4 --duplicate-ratio 0.2 -o big.log
+"""
+import argparse
+import random
+import re
+import string
+from typing import Iterable, List
+
+LOADERS = ("fabric", "forge", "lunar", "vanilla")
+
+# Mods habituales (id, versión) con los que se rellena la lista de mods
+COMMON_MODS = [
+    ("sodium", "0.5.3"), ("lithium", "0.11.2"), ("iris", "1.6.11"), ("krypton", "0.2.3"),
+    ("indium", "1.0.27"), ("modmenu", "7.2.2"), ("moreculling", "0.19.0"), ("sodiumextra", "0.5.1"),
+    ("ferritecore", "6.0.1"), ("entityculling", "1.6.2"), ("lambdynamiclights", "2.3.2"),
+    ("continuity", "3.0.0"), ("cloth-config", "11.1.106"), ("appleskin", "2.5.1"),
+    ("betterf3", "7.0.1"), ("zoomify", "2.11.2"), ("fabricskyboxes", "0.7.3"), ("dynamicfps", "3.2.1"),
+    ("immediatelyfast", "1.2.6"), ("c2me", "0.2.0"), ("starlight", "1.1.2"), ("xaerominimap", "23.8.3"),
+    ("jei", "15.2.0"), ("journeymap", "5.9.7"), ("optifine", "HD_U_I6"), ("controlling", "12.0.2"),
+]
+
+# Líneas de juego (sin información de mods)
+NOISE_TEMPLATES = [
+    "[{t}] [Render thread/WARN]: Missing sound for event: minecraft:{w}.{w}",
+    "[{t}] [Render thread/INFO]: Loaded {n} advancements",
+    "[{t}] [Server thread/INFO]: Preparing spawn area: {p}%",
+    "[{t}] [Render thread/WARN]: Received passengers for unknown entity",
+    "[{t}] [Render thread/INFO]: Reloading ResourceManager: vanilla, server",
+    "[{t}] [Netty Client IO #{p}/INFO]: Unknown custom packet identifier: {w}:{w}",
+]
+CHAT_TEMPLATE = "[{t}] [Render thread/INFO]: [System] [CHAT] <{w}{p}> {w} {w} gg"
+
+LUNAR_SAMPLE = '''[14:21:26] [main/INFO]: Loaded configuration file for Lithium: 144 options available, 1 override(s) found
 [14:21:26] [main/INFO]: Loaded configuration file for Sodium: 42 options available, 3 override(s) found
 [14:21:43] [main/WARN]: Force-disabling mixin 'alloc.blockstate.StateMixin' as rule 'mixin.alloc.blockstate' (added by mods [ferritecore]) disables it and children
 [14:21:43] [main/WARN]: Force-disabling mixin 'features.render.entity.CuboidMixin' as rule 'mixin.features.render.entity' (added by mods [iris]) disables it and children
@@ -54,5 +97,114 @@ log = '''[14:21:26] [main/INFO]: Loaded configuration file for Lithium: 144 opti
 [14:22:22] [Render thread/INFO]: [STDOUT]: [14:22:22] [IchorPipeline/Render thread/INFO] Entrypoint(client) had 14 invokes.
 '''
 
-with open("lunar_sample.log", "w", encoding="utf-8") as f:
-    f.write(log)
+
+def _mod_id(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "mod"
+
+
+def _clock(second: int) -> str:
+    return f"{14 + second // 3600 % 10:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+
+
+def _header(loader: str, mods: List[tuple], player: str, mc_version: str) -> List[str]:
+    """Arranque y carga de mods de cada loader."""
+    if loader == "fabric":
+        lines = [f"[14:00:00] [main/INFO]: Loading Minecraft {mc_version} with Fabric Loader 0.14.21",
+                 f"[14:00:00] [main/INFO]: Loading {len(mods) + 2} mods:",
+                 "\t- fabricloader 0.14.21", "\t- java 17"]
+        lines += [f"\t- {mod_id} {version}" for mod_id, version in mods]
+        lines += [f"[14:00:02] [main/INFO]: Loaded configuration file for {mod_id}: 42 options available"
+                  for mod_id, _ in mods[::3]]
+        lines += [f"[14:00:05] [Render thread/INFO]: Found Entrypoint(client) com.example.mods.{mod_id.replace('-', '')}.client.Init"
+                  for mod_id, _ in mods]
+    elif loader == "forge":
+        lines = [f"[14:00:00] [main/INFO]: ModLauncher running: args [--username, {player}, --version, {mc_version}-forge-47.2.0]",
+                 f"[14:00:01] [main/INFO]: Forge mod loading, version 47.2.0, for MC {mc_version} with MCP 20230612"]
+        lines += [f"[14:00:02] [main/INFO]: Found valid mod file mods/{mod_id}-{version}.jar with {{{mod_id}}} mods"
+                  for mod_id, version in mods]
+        lines += [f"[14:00:04] [modloading-worker-0/INFO]: Mod '{mod_id}' initialized" for mod_id, _ in mods[::2]]
+    elif loader == "lunar":
+        lines = [f"[14:00:00] [main/INFO]: [LC] Starting Lunar Client for Minecraft {mc_version}"]
+        lines += LUNAR_SAMPLE.splitlines()
+        lines += [f"[14:00:03] [main/WARN]: Force-disabling mixin 'render.{mod_id}' as rule 'mixin.render' (added by mods [{mod_id}]) disables it and children"
+                  for mod_id, _ in mods]
+    else:
+        lines = [f"[14:00:00] [main/INFO]: Loading Minecraft {mc_version}",
+                 "[14:00:01] [Render thread/INFO]: Backend library: LWJGL version 3.3.1 SNAPSHOT"]
+    lines.append(f"[14:00:06] [Render thread/INFO]: Setting user: {player}")
+    lines.append("[14:00:10] [Render thread/INFO]: Connecting to play.example.net, 25565")
+    return lines
+
+
+def generate_log(loader: str = "fabric", lines: int = 10000, mods: int = 20,
+                 prohibited: Iterable[str] = (), chat_ratio: float = 0.3,
+                 duplicate_ratio: float = 0.1, player: str = "Player123",
+                 mc_version: str = "1.20.1", seed: int = 0) -> List[str]:
+    """Genera un log de unas ``lines`` líneas (nunca menos que la cabecera).
+
+    Los mods prohibidos se añaden a la lista de mods del loader (en Vanilla
+    no hay lista de mods). ``chat_ratio`` es la fracción de líneas de juego
+    que son chat y ``duplicate_ratio`` la que repite una línea reciente.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Loader desconocido: {loader} (usa {', '.join(LOADERS)})")
+    rnd = random.Random(seed)
+    mod_list = [COMMON_MODS[i % len(COMMON_MODS)] if i < len(COMMON_MODS)
+                else (f"{COMMON_MODS[i % len(COMMON_MODS)][0]}-addon{i}", "1.0.0") for i in range(mods)]
+    mod_list += [(_mod_id(name), "1.0.0") for name in prohibited]
+    if loader == "vanilla":
+        mod_list = []
+    log = _header(loader, mod_list, player, mc_version)
+    recent = []
+    second = 10
+    while len(log) < lines:
+        second += rnd.random() < 0.3
+        if recent and rnd.random() < duplicate_ratio:
+            log.append(rnd.choice(recent))
+            continue
+        w = "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 9)))
+        template = CHAT_TEMPLATE if rnd.random() < chat_ratio else rnd.choice(NOISE_TEMPLATES)
+        line = template.format(t=_clock(second), w=w, n=rnd.randint(100, 1300), p=rnd.randint(0, 99))
+        log.append(line)
+        recent.append(line)
+        if len(recent) > 64:
+            recent.pop(0)
+    return log
+
+
+def write_log(path: str, **kwargs) -> int:
+    """Escribe un log generado en ``path``; devuelve el número de líneas."""
+    lines = generate_log(**kwargs)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera logs sintéticos de Minecraft")
+    parser.add_argument("--loader", choices=LOADERS)
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--mods", type=int, default=20)
+    parser.add_argument("--prohibited", default="", help="mods prohibidos a inyectar, separados por comas")
+    parser.add_argument("--chat-ratio", type=float, default=0.3)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--player", default="Player123")
+    parser.add_argument("--mc-version", default="1.20.1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args()
+    if args.loader is None:
+        # Comportamiento original: el log de ejemplo de Lunar
+        with open(args.output or "lunar_sample.log", "w", encoding="utf-8") as f:
+            f.write(LUNAR_SAMPLE)
+        return
+    output = args.output or f"{args.loader}_{args.lines}.log"
+    count = write_log(output, loader=args.loader, lines=args.lines, mods=args.mods,
+                      prohibited=[p.strip() for p in args.prohibited.split(",") if p.strip()],
+                      chat_ratio=args.chat_ratio, duplicate_ratio=args.duplicate_ratio,
+                      player=args.player, mc_version=args.mc_version, seed=args.seed)
+    print(f"{output}: {count} líneas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""Background git auto-sync for the SQLite database.
+
+Routes that change the database call :meth:`GitSyncWorker.enqueue` and
+return immediately. A single worker thread groups every change made
+within a debounce window into one commit (with a combined message),
+then pulls, commits and pushes, retrying with exponential backoff.
+
+:func:`pull_on_startup` brings the database up to date once, before the
+server starts (``python app.py``); importing the app never touches git.
+
+Every gunicorn worker has its own worker thread, but they share one
+working tree: each sync holds an exclusive file lock
+(``.git/auto-sync.lock``), so only one process runs git at a time.
+"""
+
+import atexit
+import contextlib
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+
+# Segundos que una sincronización espera a que otro proceso suelte el lock
+LOCK_TIMEOUT = 120
+
+
+def _try_lock(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(f):
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def repo_lock(repo_path, timeout=LOCK_TIMEOUT):
+    """Exclusive lock on ``repo_path`` shared by every process (gunicorn workers).
+
+    Raises RuntimeError if another process holds it for ``timeout`` seconds.
+    """
+    path = os.path.join(str(repo_path), '.git', 'auto-sync.lock')
+    with open(path, 'a+') as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _try_lock(f)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"git working tree busy for {timeout}s (lock {path})")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+class GitSyncWorker:
+    """Debounced, retrying git commit/push worker.
+
+    Args:
+        repo_path: Working tree to commit in.
+        paths: Files to stage (relative to ``repo_path``).
+        remote: Push target (remote name or URL); a callable is evaluated
+            on every push so tokens are never stored on the instance.
+        branch: Remote branch for pull and push.
+        debounce: Seconds of quiet to wait before syncing a burst.
+        max_wait: Upper bound on how long a burst can be delayed.
+        max_retries: Push attempts per batch before giving up.
+        backoff: Initial retry delay in seconds (doubled on each retry).
+        enabled: Callable deciding whether syncing is active right now.
+        prepare: Optional callable run before pulling and before staging
+            (e.g. a WAL checkpoint so the database file is complete). It
+            must raise if the files are not ready; the sync is retried.
+    """
+
+    def __init__(self, repo_path, paths, remote='origin', branch='main',
+                 debounce=10.0, max_wait=60.0, max_retries=4, backoff=5.0,
+                 enabled=lambda: True, author=('Render Auto-Sync', 'render-auto-sync@blurkittool.local'),
+                 prepare=None):
+        self.repo_path = str(repo_path)
+        self.paths = list(paths)
+        self.remote = remote
+        self.branch = branch
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.enabled = enabled
+        self.author = author
+        self.prepare = prepare
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._busy = threading.Event()
+        self._pending = 0
+        # A local commit exists that has not been pushed yet (retry must push it)
+        self._unpushed = False
+        self._status_lock = threading.Lock()
+        self._status = {
+            'last_sync_at': None,
+            'last_status': None,
+            'last_message': None,
+            'last_error': None,
+            'syncs': 0,
+            'failures': 0,
+            'retries': 0,
+        }
+
+    # ------------------------------------------------------------------ API
+
+    def enqueue(self, message):
+        """Schedule a sync for ``message``. Returns False if syncing is disabled."""
+        if not self.enabled():
+            print(f"[Auto-sync] Skipped: {message}", flush=True)
+            return False
+        self._ensure_thread()
+        with self._status_lock:
+            self._pending += 1
+        self._queue.put(message)
+        return True
+
+    def status(self):
+        """Snapshot for the admin page: queue depth and last sync result."""
+        with self._status_lock:
+            data = dict(self._status)
+            data['queue_depth'] = self._pending
+        data['syncing'] = self._busy.is_set()
+        data['running'] = self._thread is not None and self._thread.is_alive()
+        return data
+
+    def flush(self, timeout=None):
+        """Block until queued changes are synced (used at shutdown and in tests)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stop(self, timeout=30):
+        """Sync whatever is pending (skipping the debounce) and stop the worker."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # -------------------------------------------------------------- worker
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='git-sync', daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self):
+        """Wait for one message, then gather the rest of the burst."""
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+        self._busy.set()
+        messages = [first]
+        started = time.monotonic()
+        while not self._stop.is_set():
+            remaining = self.max_wait - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            try:
+                messages.append(self._queue.get(timeout=min(self.debounce, remaining)))
+            except queue.Empty:
+                break
+        # Al detenerse, incluir todo lo pendiente sin esperar
+        while True:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def _run(self):
+        while True:
+            messages = self._collect_batch()
+            if messages is None:
+                return
+            try:
+                self._sync_with_retries(self.combine_messages(messages))
+            finally:
+                self._busy.clear()
+                with self._status_lock:
+                    self._pending -= len(messages)
+
+    @staticmethod
+    def combine_messages(messages):
+        # Preserve order, drop repeats (e.g. the same mod edited twice)
+        unique = list(dict.fromkeys(messages))
+        if len(unique) == 1:
+            return unique[0]
+        body = '\n'.join(f'- {m}' for m in unique)
+        return f'Auto-sync: {len(unique)} changes\n\n{body}'
+
+    def _sync_with_retries(self, message):
+        delay = self.backoff
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                status = self.sync_once(message)
+                self._record(status, message, None)
+                return True
+            except Exception as e:
+                print(f"[Auto-sync error] attempt {attempt}/{self.max_retries}: {e}", flush=True)
+                if attempt == self.max_retries:
+                    self._record('error', message, str(e))
+                    return False
+                with self._status_lock:
+                    self._status['retries'] += 1
+                # A stop request shortens the wait but still retries
+                self._stop.wait(delay)
+                delay *= 2
+        return False
+
+    def _record(self, status, message, error):
+        with self._status_lock:
+            self._status['last_sync_at'] = time.time()
+            self._status['last_status'] = status
+            self._status['last_message'] = message
+            self._status['last_error'] = error
+            if error:
+                self._status['failures'] += 1
+            else:
+                self._status['syncs'] += 1
+
+    def _git(self, *args, timeout=10, check=True):
+        result = subprocess.run(
+            ['git', *args],
+            cwd=self.repo_path,
+            capture_output=True,
+            timeout=timeout
+        )
+        if check and result.returncode != 0:
+            stderr = result.stderr.decode(errors='ignore').strip()
+            # Never leak credentials embedded in the remote URL
+            stderr = re.sub(r'https://[^@\s/]+@', 'https://***@', stderr)
+            raise RuntimeError(f"git {args[0]} failed: {stderr}")
+        return result
+
+    def sync_once(self, message):
+        """Pull, commit and push once. Returns 'pushed' or 'no-changes'.
+
+        Holds :func:`repo_lock`: another worker's sync in the same working
+        tree would collide on ``.git/index.lock``.
+        """
+        with repo_lock(self.repo_path):
+            return self._sync_locked(message)
+
+    def _sync_locked(self, message):
+        remote = self.remote() if callable(self.remote) else self.remote
+        name, email = self.author
+        self._git('config', 'user.email', email, timeout=5)
+        self._git('config', 'user.name', name, timeout=5)
+        if self.prepare:
+            self.prepare()
+        # Pull antes de hacer commit/push (falla silenciosa, igual que antes)
+        self._git('pull', remote, self.branch, '--rebase', check=False)
+        if self.prepare:
+            self.prepare()
+        self._git('add', *self.paths, timeout=5)
+        if self._git('diff', '--cached', '--quiet', timeout=5, check=False).returncode != 0:
+            self._git('commit', '-m', message, timeout=5)
+            self._unpushed = True
+        elif not self._unpushed:
+            print("[Auto-sync] No changes to commit", flush=True)
+            return 'no-changes'
+        # use HEAD because Render runs in detached HEAD
+        self._git('push', remote, f'HEAD:{self.branch}')
+        self._unpushed = False
+        print(f"[Auto-sync] SUCCESS: {message.splitlines()[0]}", flush=True)
+        return 'pushed'
+
+    def register_atexit(self):
+        atexit.register(self.stop)
+        return self
+
+
+def pull_on_startup(repo_path, prepare=None, branch='main'):
+    """Fetch and hard-reset ``repo_path`` to ``origin/<branch>``.
+
+    Blocking (up to ~25s with a slow remote), so it must run before the
+    server starts and never on import. Failures are printed and ignored.
+    ``prepare`` runs before the reset (WAL checkpoint); if it raises, the
+    reset is skipped.
+    """
+    repo_path = str(repo_path)
+    if not os.path.exists(os.path.join(repo_path, '.git')):
+        return False
+
+    def git(*args, timeout=10):
+        return subprocess.run(['git', *args], cwd=repo_path, capture_output=True, timeout=timeout)
+
+    try:
+        with repo_lock(repo_path):
+            git('config', 'user.email', 'auto-sync@blurkittool.local', timeout=5)
+            git('config', 'user.name', 'Auto Sync', timeout=5)
+            if prepare:
+                prepare()
+            # Fetch + reset funciona también con el HEAD separado de Render
+            git('fetch', 'origin', branch, '--quiet')
+            result = git('reset', '--hard', f'origin/{branch}')
+        if result.returncode == 0:
+            print("[Auto-sync] Database synced from GitHub", flush=True)
+            return True
+        print(f"[Auto-sync warning] Git pull failed: {result.stderr.decode()}", flush=True)
+    except Exception as e:
+        # No interrumpir el arranque
+        print(f"[Auto-sync error] {str(e)}", flush=True)
+    return False
+
@@ -0,0 +1,409 @@
+"""GPT enrichment of log analyses.
+
+The local analyzer (``analyze_mc_log_utils``) is the fast path; GPT is an
+optional second opinion that arrives later:
+
+- :func:`select_chunks` keeps only the regions of the log that mention
+  mods (loading blocks, entrypoints, jars, mixins...) with a little
+  context, instead of the first 8 KB, and splits them into chunks.
+- :func:`analyze_chunks` sends every chunk concurrently with the asyncio
+  OpenAI client and merges whatever answered before a hard deadline.
+- :class:`GptEnricher` runs that in a background thread and stores the
+  merged result in the ``gpt_jobs`` SQLite table shared by all workers,
+  where the analysis page polls it.
+
+``OPENAI_BASE_URL`` points the client at another server, e.g.
+``mock_openai.py`` for tests and benchmarks without network access.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlite_tuning
+from analyze_mc_log_utils import CHAT_MARKER
+
+GPT_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+# Tiempo máximo (segundos) para todas las peticiones de un análisis
+GPT_DEADLINE = float(os.environ.get('GPT_DEADLINE', 20))
+GPT_CHUNK_CHARS = 8000
+GPT_MAX_CHUNKS = int(os.environ.get('GPT_MAX_CHUNKS', 4))
+# Líneas de contexto antes/después de cada línea relevante
+GPT_CONTEXT_LINES = 2
+
+CATEGORIES = ('mods_prohibidos', 'mods_permitidos', 'dependencias', 'mods_desconocidos')
+# Si un mod aparece en varias categorías (distintos fragmentos), gana la primera
+_CATEGORY_RANK = {name: rank for rank, name in enumerate(CATEGORIES)}
+
+# Fragmentos (en minúsculas) que marcan una línea útil para identificar mods
+RELEVANT_HINTS = (
+    'mod', '.jar', 'entrypoint', 'mixin', 'fabric', 'forge', 'lunar',
+    'loading', 'setting user', 'loaded configuration file',
+)
+_LOADING_RE = re.compile(r"Loading \d+ mods")
+
+
+def normalize_name(name):
+    """Compare mod names ignoring case, spaces and punctuation (like the prompt asks)."""
+    return re.sub(r'[^a-z0-9]', '', (name or '').lower())
+
+
+def select_chunks(lines, chunk_chars=GPT_CHUNK_CHARS, max_chunks=GPT_MAX_CHUNKS,
+                  context=GPT_CONTEXT_LINES):
+    """Pick the mod-related regions of a log and pack them into chunks.
+
+    ``lines`` can be any iterable (e.g. a streamed upload); at most
+    ``chunk_chars * max_chunks`` characters are kept in memory.
+    Non-contiguous regions are separated by a ``...`` line.
+    Chat lines are dropped: they never identify mods and a long session
+    would otherwise fill the chunks with noise.
+    """
+    chunks = []
+    current = []
+    size = 0
+    budget_left = True
+
+    def emit(text):
+        nonlocal current, size, budget_left
+        if size + len(text) + 1 > chunk_chars and current:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+            if len(chunks) >= max_chunks:
+                budget_left = False
+                return
+        current.append(text[:chunk_chars])
+        size += len(current[-1]) + 1
+
+    before = deque(maxlen=context)
+    after_left = 0
+    last_emitted = -2
+    loading = False
+    for number, line in enumerate(lines):
+        if not budget_left:
+            break
+        if CHAT_MARKER in line:
+            continue
+        lower_line = line.lower()
+        if _LOADING_RE.search(line):
+            loading = True
+            relevant = True
+        elif loading:
+            stripped = line.strip()
+            loading = bool(stripped) and not stripped.startswith('[')
+            relevant = loading
+        else:
+            relevant = any(hint in lower_line for hint in RELEVANT_HINTS)
+        if relevant:
+            first = number - len(before)
+            if first > last_emitted + 1 and last_emitted >= 0:
+                emit('...')
+            for offset, previous in enumerate(before):
+                if first + offset > last_emitted:
+                    emit(previous)
+            emit(line)
+            last_emitted = number
+            after_left = context
+            before.clear()
+        elif after_left:
+            emit(line)
+            last_emitted = number
+            after_left -= 1
+        else:
+            before.append(line)
+    if current and budget_left:
+        chunks.append('\n'.join(current))
+    return chunks
+
+
+def mod_lists(mods):
+    """(permitidos, prohibidos) names and aliases from ``Mod.to_dict()``-like dicts."""
+    permitidos = set()
+    prohibidos = set()
+    for m in mods:
+        target = {'permitido': permitidos, 'prohibido': prohibidos}.get(m.get('status'))
+        if target is None:
+            continue
+        target.add(m['name'])
+        aliases = m.get('alias') or []
+        if isinstance(aliases, str):
+            aliases = aliases.split(',')
+        target.update(a.strip() for a in aliases if a and a.strip())
+    return sorted(permitidos), sorted(prohibidos)
+
+
+def build_prompt(log_text, permitidos, prohibidos):
+    permitidos_txt = "\n".join(permitidos)
+    prohibidos_txt = "\n".join(prohibidos)
+    # PROMPT: la IA debe clasificar
+    return (
+        "Eres un experto en análisis de logs de Minecraft.\n"
+        "Tu tarea es:\n"
+        "- Extraer y listar absolutamente TODOS los mods, librerías y dependencias que aparezcan en el log, aunque no estén en ninguna lista.\n"
+        "- Clasifica cada mod y dependencia en uno de estos grupos: 'mods_permitidos', 'mods_prohibidos', 'mods_desconocidos', 'dependencias'.\n"
+        "- Usa las siguientes listas para comparar (case-insensitive, ignora espacios y guiones):\n"
+        "  - Permitidos:\n" + permitidos_txt + "\n"
+        "  - Prohibidos:\n" + prohibidos_txt + "\n"
+        "- Si el nombre no está en ninguna lista, ponlo en 'mods_desconocidos'.\n"
+        "- Distingue dependencias/librerías si es posible (por contexto del log).\n"
+        "- Para cada mod o dependencia, incluye el nombre y, si está disponible, la versión.\n"
+        "El resultado debe ser un JSON con la siguiente estructura:\n"
+        "{\n  'mods_permitidos': [ { 'name': '', 'version': '' } ],\n  'mods_prohibidos': [ { 'name': '', 'version': '' } ],\n  'mods_desconocidos': [ { 'name': '', 'version': '' } ],\n  'dependencias': [ { 'name': '', 'version': '' } ]\n}\n"
+        "No expliques nada, solo responde con el JSON.\n"
+        "\nLOG (solo las regiones relevantes):\n" + log_text + "\n"
+    )
+
+
+def parse_response(content):
+    """Extract the JSON object from a chat answer."""
+    match = re.search(r'\{.*\}', content or '', re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(0))
+        except ValueError:
+            pass
+    return {"error": "No se pudo analizar el JSON", "raw": content}
+
+
+def merge_results(results):
+    """Union of several chunk answers, one entry per normalized mod name."""
+    best = {}
+    for result in results:
+        for category in CATEGORIES:
+            for item in result.get(category) or []:
+                if isinstance(item, str):
+                    item = {'name': item}
+                if not isinstance(item, dict) or not item.get('name'):
+                    continue
+                key = normalize_name(item['name'])
+                rank = _CATEGORY_RANK[category]
+                current = best.get(key)
+                if current is None or rank < current[0]:
+                    best[key] = (rank, category, item)
+    merged = {category: [] for category in CATEGORIES}
+    for _, category, item in best.values():
+        merged[category].append(item)
+    return merged
+
+
+async def _ask(client, prompt, model):
+    response = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=1024,
+        temperature=0.1,
+    )
+    return parse_response(response.choices[0].message.content)
+
+
+async def analyze_chunks(chunks, api_key, permitidos, prohibidos, deadline=GPT_DEADLINE,
+                         base_url=None, model=GPT_MODEL):
+    """Ask GPT about every chunk concurrently; merge what finished before ``deadline``.
+
+    The result has the four classification lists plus ``chunks``,
+    ``chunks_done`` and ``partial`` (some chunk timed out or failed),
+    or an ``error`` key if no chunk produced a usable answer.
+    """
+    if not chunks:
+        return {'error': 'El log no contiene regiones con mods', 'chunks': 0, 'chunks_done': 0}
+    import openai
+    client = openai.AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url or os.environ.get('OPENAI_BASE_URL') or None,
+        timeout=deadline,
+        max_retries=0,
+    )
+    try:
+        tasks = [asyncio.ensure_future(_ask(client, build_prompt(chunk, permitidos, prohibidos), model))
+                 for chunk in chunks]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        await client.close()
+    answers = []
+    errors = []
+    for task in tasks:
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            errors.append(str(task.exception()))
+        elif task.result().get('error'):
+            errors.append(task.result()['error'])
+        else:
+            answers.append(task.result())
+    summary = {'chunks': len(chunks), 'chunks_done': len(answers), 'partial': bool(pending or errors)}
+    if not answers:
+        error = 'Tiempo de espera agotado' if pending and not errors else (errors[0] if errors else 'Sin respuesta')
+        return {'error': error, **summary}
+    return {**merge_results(answers), **summary}
+
+
+def analyze_lines(lines, api_key, permitidos, prohibidos, **kwargs):
+    """Synchronous helper: select chunks from ``lines`` and run :func:`analyze_chunks`."""
+    chunks = select_chunks(lines)
+    return asyncio.run(analyze_chunks(chunks, api_key, permitidos, prohibidos, **kwargs))
+
+
+class GptEnricher:
+    """Runs GPT enrichments in the background and publishes their status.
+
+    Each job is identified by its cache key, so the same log is never
+    sent twice while a request for it is in flight or done.
+
+    With ``db_path`` the state of every job (pending, error or the
+    result) lives in the ``gpt_jobs`` table of that SQLite file, shared by
+    all gunicorn workers: /api/gpt/<key> answers the same whichever
+    worker receives the poll, and only one worker claims a key. A pending
+    job older than ``stale_after`` seconds (its worker died) can be
+    claimed again. Without it the state is per process and results land
+    in ``cache``.
+    """
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS gpt_jobs ('
+        'key TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, updated REAL NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_gpt_jobs_updated ON gpt_jobs (updated)',
+    )
+    # Reclama la clave si no existe, falló, quedó colgada o caducó; si no, no cambia nada
+    _CLAIM = (
+        "INSERT INTO gpt_jobs (key, status, result, updated) VALUES (:key, 'pending', NULL, :now) "
+        'ON CONFLICT (key) DO UPDATE SET status = excluded.status, result = NULL, updated = excluded.updated '
+        "WHERE gpt_jobs.status = 'error' "
+        "OR (gpt_jobs.status = 'pending' AND gpt_jobs.updated <= :stale) "
+        "OR (gpt_jobs.status = 'done' AND gpt_jobs.updated <= :expired)"
+    )
+
+    def __init__(self, cache, max_workers=2, max_errors=256, db_path=None, stale_after=GPT_DEADLINE + 60):
+        self.cache = cache
+        self.db_path = str(db_path) if db_path else None
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gpt')
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._pending = set()
+        # Los errores no se cachean (un timeout puede ser pasajero), solo se recuerdan
+        self._errors = OrderedDict()
+        self._max_errors = max_errors
+
+    # ------------------------------------------------------------ SQLite tier
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=sqlite_tuning.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                                   isolation_level=None)
+            sqlite_tuning.apply_pragmas(conn)
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+    def _claim(self, key):
+        """True if this process now owns ``key`` (its row was inserted or reset to pending)."""
+        now = time.time()
+        cursor = self._connect().execute(self._CLAIM, {
+            'key': key, 'now': now, 'stale': now - self.stale_after, 'expired': now - self.cache.ttl,
+        })
+        return cursor.rowcount == 1
+
+    def _finish(self, key, status, result):
+        now = time.time()
+        conn = self._connect()
+        conn.execute('UPDATE gpt_jobs SET status = ?, result = ?, updated = ? WHERE key = ?',
+                     (status, json.dumps(result, ensure_ascii=False, default=str), now, key))
+        with self._lock:
+            self._writes += 1
+            expire = self._writes % 50 == 0
+        if expire:
+            conn.execute('DELETE FROM gpt_jobs WHERE updated <= ?', (now - max(self.cache.ttl, self.stale_after),))
+
+    def _db_status(self, key):
+        row = self._connect().execute(
+            'SELECT status, result, updated FROM gpt_jobs WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return {'status': 'unknown', 'key': key}
+        status, result, updated = row
+        age = time.time() - updated
+        if (status == 'pending' and age > self.stale_after) or (status == 'done' and age > self.cache.ttl):
+            return {'status': 'unknown', 'key': key}
+        if status == 'pending':
+            return {'status': 'pending', 'key': key}
+        return {'status': status, 'key': key, 'result': json.loads(result)}
+
+    # -------------------------------------------------------------------- API
+
+    def submit(self, key, chunks, api_key, permitidos, prohibidos, **kwargs):
+        """Start the enrichment for ``key`` unless it is done or running; return its status."""
+        status = self.status(key)
+        if status['status'] in ('done', 'pending'):
+            return status
+        if self.db_path:
+            try:
+                if not self._claim(key):
+                    # Otro worker la reclamó entre status() y aquí
+                    return self.status(key)
+            except sqlite3.Error as e:
+                print(f"[GPT] Job table unavailable: {e}", flush=True)
+                return {'status': 'error', 'key': key, 'result': {'error': 'No se pudo registrar el análisis IA'}}
+        else:
+            with self._lock:
+                if key in self._pending:
+                    return {'status': 'pending', 'key': key}
+                self._pending.add(key)
+                self._errors.pop(key, None)
+        self._executor.submit(self._run, key, chunks, api_key, permitidos, prohibidos, kwargs)
+        return {'status': 'pending', 'key': key}
+
+    def _run(self, key, chunks, api_key, permitidos, prohibidos, kwargs):
+        try:
+            result = asyncio.run(analyze_chunks(chunks, api_key, permitidos, prohibidos, **kwargs))
+        except Exception as e:
+            result = {'error': str(e)}
+        if result.get('error'):
+            print(f"[GPT] Enrichment failed: {result['error']}", flush=True)
+        if self.db_path:
+            try:
+                self._finish(key, 'error' if result.get('error') else 'done', result)
+            except sqlite3.Error as e:
+                print(f"[GPT] Could not store result: {e}", flush=True)
+            return
+        if result.get('error'):
+            with self._lock:
+                self._errors[key] = result
+                while len(self._errors) > self._max_errors:
+                    self._errors.popitem(last=False)
+        else:
+            self.cache.set(key, result)
+        with self._lock:
+            self._pending.discard(key)
+
+    def status(self, key):
+        """``{'status': 'done'|'pending'|'error'|'unknown', 'key': ..., 'result': ...}``.
+
+        Polling does not count as a lookup in the result cache statistics.
+        """
+        if self.db_path:
+            try:
+                return self._db_status(key)
+            except sqlite3.Error as e:
+                print(f"[GPT] Job table unavailable: {e}", flush=True)
+                return {'status': 'unknown', 'key': key}
+        with self._lock:
+            if key in self._pending:
+                return {'status': 'pending', 'key': key}
+            error = self._errors.get(key)
+        if error is not None:
+            return {'status': 'error', 'key': key, 'result': error}
+        result = self.cache.peek(key)
+        if result is not None:
+            return {'status': 'done', 'key': key, 'result': result}
+        return {'status': 'unknown', 'key': key}
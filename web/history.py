@@ -0,0 +1,92 @@
+"""Server-side analysis history.
+
+Results are stored in the ``analysis_history`` table (``history`` bind,
+instance/history.db) instead of the session cookie, so they are shared
+between gunicorn workers and the session stays small. Each user keeps
+at most MAX_HISTORY_ITEMS entries.
+"""
+
+import json
+
+from sqlalchemy.orm import defer
+
+from models import db, AnalysisHistory
+
+MAX_HISTORY_ITEMS = 200
+PER_PAGE = 20
+
+_table_ready = False
+
+
+def _ensure_table():
+    """Create the history table on first use (separate DB file)."""
+    global _table_ready
+    if not _table_ready:
+        db.create_all(bind_key='history')
+        _table_ready = True
+
+
+def add_entry(user, filename, resultado):
+    """Save an analysis result for ``user`` and return its id."""
+    _ensure_table()
+    entry = AnalysisHistory(
+        user_id=user.id,
+        username=user.username,
+        filename=filename,
+        mc_version=resultado.get('mc_version'),
+        prohibidos=len(resultado.get('mods_prohibidos') or []),
+        permitidos=len(resultado.get('mods_permitidos') or []),
+        resultado_json=json.dumps(resultado, ensure_ascii=False, default=str)
+    )
+    db.session.add(entry)
+    db.session.flush()
+    # Drop everything older than the newest MAX_HISTORY_ITEMS in one statement
+    oldest_kept = (
+        db.session.query(AnalysisHistory.id)
+        .filter_by(user_id=user.id)
+        .order_by(AnalysisHistory.id.desc())
+        .offset(MAX_HISTORY_ITEMS - 1)
+        .limit(1)
+        .scalar()
+    )
+    if oldest_kept is not None:
+        AnalysisHistory.query.filter(
+            AnalysisHistory.user_id == user.id,
+            AnalysisHistory.id < oldest_kept
+        ).delete(synchronize_session=False)
+    db.session.commit()
+    return entry.id
+
+
+def _user_query(user):
+    return AnalysisHistory.query.filter_by(user_id=user.id).order_by(AnalysisHistory.id.desc())
+
+
+def recent(user, limit=5):
+    """Summaries of the latest entries (for upload/paste pages)."""
+    _ensure_table()
+    return [e.to_summary() for e in _user_query(user).limit(limit).all()]
+
+
+def page(user, page_num=1, per_page=PER_PAGE):
+    """Paginated summaries; only summary columns are loaded."""
+    _ensure_table()
+    pagination = _user_query(user).options(defer(AnalysisHistory.resultado_json)).paginate(
+        page=page_num, per_page=per_page, error_out=False
+    )
+    return pagination, [e.to_summary() for e in pagination.items]
+
+
+def get_resultado(user, entry_id):
+    """Full result of one entry owned by ``user`` (None if missing)."""
+    _ensure_table()
+    entry = AnalysisHistory.query.filter_by(id=entry_id, user_id=user.id).first()
+    return entry.get_resultado() if entry else None
+
+
+def clear(user):
+    """Delete the whole history of ``user``; returns the number of rows removed."""
+    _ensure_table()
+    count = AnalysisHistory.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+    db.session.commit()
+    return count
@@ -0,0 +1,104 @@
+# keyword_matcher.py
+"""
+Búsqueda de muchas palabras clave a la vez (Aho-Corasick).
+
+Usa la extensión ``pyahocorasick`` si está instalada y, si no, un autómata
+equivalente en Python puro. En ambos casos cada línea se recorre una sola
+vez, sin importar cuántas palabras clave haya.
+"""
+from collections import deque
+from typing import Dict, List
+
+try:
+    import ahocorasick  # pyahocorasick (opcional)
+except ImportError:
+    ahocorasick = None
+
+
+class _PyAutomaton:
+    """Autómata Aho-Corasick en Python puro (respaldo sin dependencias)."""
+
+    def __init__(self, keywords: List[str]):
+        # goto[estado] = {caracter: estado}, out[estado] = palabras que terminan ahí
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[str]] = [[]]
+        for word in keywords:
+            state = 0
+            for ch in word:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = nxt
+                state = nxt
+            self.out[state].append(word)
+        # Enlaces de fallo por anchura; cada estado hereda las salidas de su fallo
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> set:
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class KeywordMatcher:
+    """Encuentra en una pasada qué palabras clave aparecen en una línea.
+
+    ``matches(line)`` devuelve las palabras encontradas en el mismo orden
+    (y con las mismas repeticiones) que la lista original, de modo que el
+    resultado es idéntico a comprobar ``palabra in line`` una por una.
+    """
+
+    def __init__(self, keywords: List[str], use_native: bool = True):
+        self.keywords = list(keywords)
+        # Posiciones de cada palabra en la lista original (puede repetirse)
+        self._positions: Dict[str, List[int]] = {}
+        for i, word in enumerate(self.keywords):
+            self._positions.setdefault(word, []).append(i)
+        # La cadena vacía está contenida en cualquier línea
+        self._always = self._positions.get('', [])
+        words = [w for w in self._positions if w]
+        if use_native and ahocorasick is not None and words:
+            self.backend = 'pyahocorasick'
+            self._automaton = ahocorasick.Automaton()
+            for word in words:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+            self._find = self._find_native
+        else:
+            self.backend = 'python'
+            self._automaton = _PyAutomaton(words)
+            self._find = self._automaton.find
+
+    def _find_native(self, text: str) -> set:
+        return {word for _, word in self._automaton.iter(text)}
+
+    def matches(self, text: str) -> List[str]:
+        found = self._find(text)
+        if not found and not self._always:
+            return []
+        positions = list(self._always)
+        for word in found:
+            positions.extend(self._positions[word])
+        positions.sort()
+        return [self.keywords[i] for i in positions]
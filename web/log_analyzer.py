@@ -3,40 +3,69 @@
 Módulo para analizar logs de Minecraft y detectar uso de hacks/clientes ilegales.
 """
 import re
-from typing import List, Dict
+from itertools import islice
+from typing import Dict, Iterable, List
+
+from keyword_matcher import KeywordMatcher
 
 
 class MinecraftLogAnalyzer:
-    def __init__(self, hacks_list: List[str], regex_patterns: List[str] = None, ml_model=None):
-        self.hacks_list = [h.lower() for h in hacks_list]
+    # Máximo de predicciones ML recordadas por llamada a parse_log
+    ML_CACHE_SIZE = 50000
+
+    def __init__(self, hacks_list: List[str], regex_patterns: List[str] = None, ml_model=None, ml_batch_size: int = 512, keyword_matcher: KeywordMatcher = None):
+        # Se puede pasar un KeywordMatcher ya construido (p. ej. desde ModelRegistry)
+        if keyword_matcher is None:
+            keyword_matcher = KeywordMatcher([h.lower() for h in hacks_list])
+        self.hacks_list = keyword_matcher.keywords
+        self.keyword_matcher = keyword_matcher
         self.regex_patterns = [re.compile(pat, re.IGNORECASE) for pat in (regex_patterns or [])]
         self.ml_model = ml_model  # Modelo de IA opcional
+        self.ml_batch_size = max(1, ml_batch_size)
+
+    def _predict_batch(self, batch: List[str], cache: Dict[str, int]) -> List[int]:
+        """Predice un lote con una sola llamada al modelo, sin repetir líneas duplicadas."""
+        if len(cache) + len(batch) > self.ML_CACHE_SIZE:
+            cache.clear()
+        pending = list(dict.fromkeys(line for line in batch if line not in cache))
+        if pending:
+            for line, pred in zip(pending, self.ml_model.predict(pending)):
+                cache[line] = pred
+        return [cache[line] for line in batch]
+
+    def parse_log(self, log_lines: Iterable[str]) -> List[Dict]:
+        """Procesa líneas de log y detecta posibles hacks/clientes ilegales usando palabras clave, regex y modelo ML.
 
-    def parse_log(self, log_lines: List[str]) -> List[Dict]:
-        """Procesa líneas de log y detecta posibles hacks/clientes ilegales usando palabras clave, regex y modelo ML."""
+        Las líneas se procesan en lotes de ``ml_batch_size`` para que el
+        modelo ML se invoque una vez por lote y no una vez por línea.
+        """
         detections = []
-        for line in log_lines:
-            lower_line = line.lower()
-            # Detección por palabras clave
-            for hack in self.hacks_list:
-                if hack in lower_line:
+        ml_cache = {}
+        lines_iter = iter(log_lines)
+        while True:
+            batch = list(islice(lines_iter, self.ml_batch_size))
+            if not batch:
+                break
+            # Detección por modelo ML (si está disponible), un lote a la vez
+            preds = self._predict_batch(batch, ml_cache) if self.ml_model else None
+            for i, line in enumerate(batch):
+                lower_line = line.lower()
+                # Detección por palabras clave (una sola pasada por línea)
+                for hack in self.keyword_matcher.matches(lower_line):
                     detections.append({
                         'type': 'keyword',
                         'pattern': hack,
                         'log': line
                     })
-            # Detección por patrones regex
-            for regex in self.regex_patterns:
-                if regex.search(line):
-                    detections.append({
-                        'type': 'regex',
-                        'pattern': regex.pattern,
-                        'log': line
-                    })
-            # Detección por modelo ML (si está disponible)
-            if self.ml_model:
-                pred = self.ml_model.predict([line])[0]
-                if pred == 1:  # 1 = sospechoso
+                # Detección por patrones regex
+                for regex in self.regex_patterns:
+                    if regex.search(line):
+                        detections.append({
+                            'type': 'regex',
+                            'pattern': regex.pattern,
+                            'log': line
+                        })
+                if preds is not None and preds[i] == 1:  # 1 = sospechoso
                     detections.append({
                         'type': 'ml',
                         'pattern': 'ML Model',
@@ -0,0 +1,215 @@
+"""Streaming readers for uploaded Minecraft logs.
+
+Uploads are never decoded as a whole: the raw stream is read line by
+line, each line is decoded on its own (UTF-8 with a latin-1 fallback,
+UTF-16 if the file starts with a BOM) and handed to the analyzer as a
+generator. ``latest.log.gz`` and zipped logs are decompressed on the fly.
+
+Lines are split like ``str.splitlines()`` on the whole text, which the
+routes used before (``\n``, ``\r\n`` and a bare ``\r`` all end a line), so
+the analyzer sees the same lines as with a pasted log. A line longer
+than ``MAX_LINE_BYTES`` is truncated, never split into several lines.
+"""
+
+import codecs
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+import zlib
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Tamaño máximo de una línea; de las más largas se descarta el resto
+MAX_LINE_BYTES = 64 * 1024
+# Bytes leídos de una vez del log (descomprimido)
+READ_BLOCK_BYTES = 256 * 1024
+# Tamaño máximo del log descomprimido (protege contra gzip/zip bombs)
+MAX_LOG_BYTES = int(os.environ.get('MAX_LOG_MB', 256)) * 1024 * 1024
+LOG_EXTENSIONS = ('.log', '.txt')
+
+
+class LogStreamError(ValueError):
+    """The upload cannot be read as a log (corrupt gzip/zip, empty archive...)."""
+
+
+class LogTooLargeError(LogStreamError):
+    """The decompressed log exceeds ``max_bytes``."""
+
+
+def decode_line(raw):
+    """Decode one line: UTF-8 first, latin-1 if it is not valid UTF-8."""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def _strip_eol(line):
+    if line.endswith('\n'):
+        line = line[:-1]
+    if line.endswith('\r'):
+        line = line[:-1]
+    return line
+
+
+def _decode_truncated(raw):
+    """Decode a line cut at ``MAX_LINE_BYTES`` without garbling a split UTF-8 character."""
+    for cut in range(4):
+        try:
+            return raw[:len(raw) - cut].decode('utf-8')
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('latin-1')
+
+
+def split_raw_lines(raw, max_line=MAX_LINE_BYTES, block=READ_BLOCK_BYTES):
+    """Yield each line of the binary stream ``raw`` as bytes.
+
+    Lines end at ``\n``, ``\r\n`` or ``\r`` (terminator not included).
+    Only the first ``max_line`` bytes of a line are kept, so memory stays
+    bounded even for a log without any line break.
+    """
+    pending = None  # Trozo inicial de una línea que sigue en el bloque siguiente
+    skip_lf = False  # El bloque anterior acabó en \r: un \n inicial es parte de él
+    for chunk in iter(lambda: raw.read(block), b''):
+        if skip_lf and chunk.startswith(b'\n'):
+            chunk = chunk[1:]
+            if not chunk:
+                skip_lf = False
+                continue
+        skip_lf = chunk.endswith(b'\r')
+        lines = chunk.splitlines()
+        # bytes.splitlines solo corta en \n, \r y \r\n
+        complete = chunk.endswith((b'\n', b'\r'))
+        if pending is not None:
+            lines[0] = pending + lines[0][:max_line - len(pending)]
+            pending = None
+        if not complete:
+            pending = lines.pop()[:max_line]
+        for line in lines:
+            yield line[:max_line] if len(line) > max_line else line
+    if pending is not None:
+        yield pending
+
+
+class _CountingReader:
+    """``read()`` wrapper that raises once more than ``max_bytes`` were read."""
+
+    def __init__(self, raw, max_bytes, error):
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.error = error
+        self.total = 0
+
+    def read(self, size):
+        data = self.raw.read(size)
+        self.total += len(data)
+        if self.total > self.max_bytes:
+            raise self.error()
+        return data
+
+
+class LogUpload:
+    """Re-iterable view of an uploaded log (plain, gzip or zip).
+
+    Args:
+        stream: Binary file object (e.g. ``FileStorage.stream`` or
+            ``request.stream``). Non-seekable streams are spooled to a
+            temporary file first so the log can be read more than once
+            (hash for the result cache, then analysis).
+        filename: Original name, only used to pick a member inside zips.
+        max_bytes: Limit for the decompressed size.
+    """
+
+    def __init__(self, stream, filename='', max_bytes=MAX_LOG_BYTES):
+        if not stream.seekable():
+            spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+            shutil.copyfileobj(stream, spool)
+            stream = spool
+        self.stream = stream
+        self.filename = filename or ''
+        self.max_bytes = max_bytes
+        self.stream.seek(0)
+        self.compression = self._detect_compression(self.stream.read(4))
+
+    @staticmethod
+    def _detect_compression(magic):
+        if magic.startswith(GZIP_MAGIC):
+            return 'gzip'
+        if magic.startswith(ZIP_MAGIC):
+            return 'zip'
+        return None
+
+    def _open_raw(self):
+        """Binary stream with the decompressed log, positioned at the start."""
+        self.stream.seek(0)
+        if self.compression == 'gzip':
+            return gzip.GzipFile(fileobj=self.stream, mode='rb')
+        if self.compression == 'zip':
+            archive = zipfile.ZipFile(self.stream)
+            members = [i for i in archive.infolist() if not i.is_dir()]
+            if not members:
+                raise LogStreamError('El archivo zip está vacío')
+            # Preferir latest.log / cualquier .log antes que otros archivos
+            members.sort(key=lambda i: (
+                os.path.basename(i.filename) != 'latest.log',
+                not i.filename.lower().endswith(LOG_EXTENSIONS),
+            ))
+            return archive.open(members[0])
+        return self.stream
+
+    def lines(self):
+        """Yield decoded lines without line terminators."""
+        try:
+            raw = self._open_raw()
+            bom = raw.read(2)
+            raw.seek(0)
+            if bom in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+                yield from self._utf16_lines(raw)
+                return
+            counted = _CountingReader(raw, self.max_bytes, self._too_large)
+            first = True
+            for chunk in split_raw_lines(counted):
+                line = _decode_truncated(chunk) if len(chunk) == MAX_LINE_BYTES else decode_line(chunk)
+                if first:
+                    line = line.lstrip('\ufeff')
+                    first = False
+                # Resto de separadores de str.splitlines() (\x0b, \x0c, \x1c-\x1e, \x85, \u2028...)
+                yield from line.splitlines() or ('',)
+        except (OSError, EOFError, zipfile.BadZipFile, zlib.error) as e:
+            raise LogStreamError(f'No se pudo leer el archivo comprimido: {e}') from e
+
+    def _utf16_lines(self, raw):
+        reader = io.TextIOWrapper(raw, encoding='utf-16', errors='replace')
+        try:
+            total = 0
+            for line in reader:
+                total += len(line) * 2
+                if total > self.max_bytes:
+                    raise self._too_large()
+                yield from _strip_eol(line)[:MAX_LINE_BYTES // 2].splitlines() or ('',)
+        finally:
+            # No cerrar el stream original al liberar el wrapper
+            reader.detach()
+
+    def _too_large(self):
+        return LogTooLargeError(f'El log supera el máximo de {self.max_bytes // (1024 * 1024)}MB')
+
+    def head(self, max_chars):
+        """First ``max_chars`` characters of the log (for the GPT prompt)."""
+        parts = []
+        size = 0
+        for line in self.lines():
+            parts.append(line)
+            size += len(line) + 1
+            if size >= max_chars:
+                break
+        return '\n'.join(parts)[:max_chars]
+
+    def has_content(self):
+        """True if the log has at least one non-blank line."""
+        return any(line.strip() for line in self.lines())
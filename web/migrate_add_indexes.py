@@ -0,0 +1,68 @@
+"""Add the indexes for mod list filters and the security dashboard.
+
+- ``ix_mods_status_name`` (mods.status, mods.name): lists filtered by
+  status and ordered by name (/api/mods, permitidos/prohibidos) read the
+  index range instead of scanning and sorting the table. Queries that
+  only filter by status use its first column, so a separate index on
+  ``status`` is not needed.
+- ``ix_login_attempts_last_attempt``: lookups and bulk deletes of
+  legacy login attempts by age.
+
+``db.create_all()`` only creates indexes together with new tables, so
+existing databases (blurkit.db in git) need this script. It is idempotent
+and runs from run_migration.py. tests/test_indexes.py checks with
+EXPLAIN QUERY PLAN that SQLite uses the indexes for those queries.
+"""
+
+import sys
+from pathlib import Path
+
+# Make sure web module can import models
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from models import db, Mod, LoginAttempt
+
+NEW_INDEXES = ('ix_mods_status_name', 'ix_login_attempts_last_attempt')
+
+
+def _model_indexes():
+    for table in (Mod.__table__, LoginAttempt.__table__):
+        for index in table.indexes:
+            if index.name in NEW_INDEXES:
+                yield index
+
+
+def create_indexes(engine):
+    """Create the missing indexes; returns the names of the new ones."""
+    with engine.begin() as conn:
+        existing = set()
+        for table in ('mods', 'login_attempts'):
+            existing.update(ix['name'] for ix in db.inspect(conn).get_indexes(table))
+        created = []
+        for index in _model_indexes():
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+def migrate_indexes():
+    """Create the indexes and print what was done; returns the new index names."""
+    created = create_indexes(db.engine)
+    if created:
+        print(f"✓ Índices creados: {', '.join(created)}")
+    else:
+        print("✓ Índices ya existentes")
+    return created
+
+
+def main():
+    # Importar la app solo al ejecutar el script: los tests usan create_indexes sin ella
+    from app import app
+
+    with app.app_context():
+        return migrate_indexes()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,11 @@
 """
 Carga el modelo entrenado y lo integra con el analizador de logs para detección automática.
 """
+import hashlib
+import os
 import pickle
+import threading
+import time
 
 
 MODEL_PATH = 'web/hack_detector_model.pkl'
@@ -23,6 +27,99 @@ class MLLogModel:
         X = self.vectorizer.transform(lines)
         return self.clf.predict(X)
 
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """Mantiene en memoria recursos cargados desde disco (modelo, listas...).
+
+    ``get(path, loader)`` devuelve ``loader(path)`` y lo guarda. En cada
+    llamada solo se hace un ``os.stat``; si cambian mtime o tamaño se calcula
+    el SHA-256 y el recurso se vuelve a cargar únicamente si el contenido
+    es distinto. Si el archivo no existe se devuelve ``default``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, path, loader, default=None):
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return default
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry['stamp'] == stamp:
+                entry['hits'] += 1
+                return entry['value']
+            sha256 = _file_sha256(path)
+            if entry is not None and entry['sha256'] == sha256:
+                # Solo cambió la fecha (touch, checkout): no hace falta recargar
+                entry['stamp'] = stamp
+                entry['hits'] += 1
+                return entry['value']
+            start = time.perf_counter()
+            try:
+                value = loader(path)
+                error = None
+            except Exception as e:
+                # Se recuerda el fallo para no reintentar hasta que cambie el archivo
+                value = default
+                error = str(e)
+            self._entries[path] = {
+                'stamp': stamp,
+                'sha256': sha256,
+                'value': value,
+                'error': error,
+                'load_seconds': time.perf_counter() - start,
+                'loaded_at': time.time(),
+                'loads': (entry['loads'] + 1) if entry else 1,
+                'hits': entry['hits'] if entry else 0,
+            }
+            return value
+
+    def stats(self):
+        """Por archivo: SHA-256 cargado, aciertos, cargas, tiempo de carga y último error (ver /admin/system)."""
+        with self._lock:
+            return {
+                path: {
+                    'sha256': e['sha256'],
+                    'load_seconds': round(e['load_seconds'], 4),
+                    'loaded_at': e['loaded_at'],
+                    'loads': e['loads'],
+                    'hits': e['hits'],
+                    'error': e['error'],
+                }
+                for path, e in self._entries.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _load_ml_log_model(path):
+    clf, vectorizer = load_ml_model(path)
+    return MLLogModel(clf, vectorizer)
+
+
+# Registro compartido por todo el proceso
+model_registry = ModelRegistry()
+
+
+def get_ml_log_model(model_path=MODEL_PATH):
+    """Devuelve el MLLogModel residente (o None si no hay modelo)."""
+    return model_registry.get(model_path, _load_ml_log_model)
+
 # Ejemplo de integración:
 # hacks = [...]  # Lista de mods prohibidos
 # regex_patterns = [...]  # Patrones adicionales si quieres
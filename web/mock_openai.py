@@ -0,0 +1,130 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers ``POST /v1/chat/completions`` with the same JSON shape GPT is
+asked for, computed with the local analyzer from the LOG part of the
+prompt and the permitted/prohibited lists it contains. Latency and
+failures are configurable, so GPT timing can be tested and benchmarked
+without network access or an API key.
+
+Uso:
+    python mock_openai.py --port 8765 --latency 1.5 --jitter 0.5
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from analyze_mc_log_utils import extract_mods
+from gpt_analysis import normalize_name
+
+
+def _section(prompt, start, end):
+    try:
+        block = prompt.split(start, 1)[1].split(end, 1)[0]
+    except IndexError:
+        return set()
+    return {normalize_name(line) for line in block.splitlines() if line.strip()}
+
+
+def fake_answer(prompt):
+    """Classify the mods of the prompt's LOG section like GPT is asked to."""
+    permitidos = _section(prompt, '  - Permitidos:\n', '  - Prohibidos:')
+    prohibidos = _section(prompt, '  - Prohibidos:\n', '- Si el nombre')
+    log_text = prompt.split('\nLOG', 1)[-1].split(':\n', 1)[-1]
+    found = extract_mods(log_text.splitlines())
+    answer = {'mods_permitidos': [], 'mods_prohibidos': [], 'mods_desconocidos': [],
+              'dependencias': [{'name': d['name'], 'version': d.get('version', '')} for d in found['dependencies']]}
+    for mod in found['mods']:
+        item = {'name': mod['name'], 'version': mod.get('version', '')}
+        key = normalize_name(mod['name'])
+        if key in prohibidos:
+            answer['mods_prohibidos'].append(item)
+        elif key in permitidos:
+            answer['mods_permitidos'].append(item)
+        else:
+            answer['mods_desconocidos'].append(item)
+    return answer
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.5, jitter=0.0, fail_rate=0.0, seed=None):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        server.requests += 1
+        time.sleep(max(0.0, server.latency + server.random.uniform(-server.jitter, server.jitter)))
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send(404, {'error': {'message': 'not found'}})
+        if server.random.random() < server.fail_rate:
+            return self._send(500, {'error': {'message': 'mock failure', 'type': 'server_error'}})
+        prompt = body['messages'][-1]['content']
+        content = json.dumps(fake_answer(prompt), ensure_ascii=False)
+        self._send(200, {
+            'id': f'chatcmpl-mock-{server.requests}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'mock'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4,
+                      'total_tokens': (len(prompt) + len(content)) // 4},
+        })
+
+    def _send(self, code, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente canceló la petición (tiempo límite agotado)
+            pass
+
+
+def start_mock_server(port=0, **kwargs):
+    """Start a server in a daemon thread; returns it (use ``server.base_url``)."""
+    server = MockOpenAIServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, name='mock-openai', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita la API de OpenAI')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='segundos por respuesta')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    server = MockOpenAIServer(('127.0.0.1', args.port), latency=args.latency,
+                              jitter=args.jitter, fail_rate=args.fail_rate)
+    print(f"Mock OpenAI escuchando en {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""In-memory lookup index of mods by normalized name or alias.
+
+Replaces the per-request linear scan over ``Mod.query.all()`` used to
+classify detected mods. The index is built once per process and rebuilt
+lazily after a mod write.
+
+The mods table carries a version counter (``mod_list_version``) that
+SQLite triggers increment on every insert, update or delete, whoever
+makes the write. Reading it is a single-row lookup, so every cache keyed
+by the mod list (index, GPT results, public pages) can check it on each
+request.
+"""
+
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db, Mod
+
+_COUNTER_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS mod_list_version ("
+    "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO mod_list_version (id, version) VALUES (1, 0)",
+] + [
+    f"CREATE TRIGGER IF NOT EXISTS mod_list_version_{event.lower()} AFTER {event} ON mods BEGIN "
+    "UPDATE mod_list_version SET version = version + 1 WHERE id = 1; END"
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+
+def normalize_key(name):
+    """Normalize a mod name the way /analyze compares it (lowercase, no spaces)."""
+    return (name or '').lower().replace(' ', '')
+
+
+class ModIndex:
+    """Maps normalized name/alias -> mod snapshot (``Mod.to_dict()``), and lists every mod.
+
+    Snapshots are plain dicts, so they can be shared between requests
+    without touching a SQLAlchemy session. Call :meth:`invalidate` after
+    committing a change to the ``mods`` table. Writes made by other
+    gunicorn workers are detected through the version counter (or,
+    without it, a cheap aggregate stamp: row count, max id, max updated_at).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._stamp = None
+        self._counter = None  # None: sin comprobar; True/False: disponible o no
+
+    def _ensure_counter(self):
+        """Create the version counter and its triggers (SQLite only, once per process)."""
+        if self._counter is None:
+            if db.engine.dialect.name != 'sqlite':
+                self._counter = False
+                return False
+            try:
+                # Conexión propia: no confirmar la transacción de la petición
+                with db.engine.begin() as conn:
+                    for statement in _COUNTER_SCHEMA:
+                        conn.execute(text(statement))
+                self._counter = True
+            except OperationalError as e:
+                print(f"[ModIndex] Version counter not available: {e}", flush=True)
+                self._counter = False
+        return self._counter
+
+    def _current_stamp(self):
+        if self._ensure_counter():
+            version = db.session.execute(text("SELECT version FROM mod_list_version WHERE id = 1")).scalar()
+            return ('v', version)
+        row = db.session.query(
+            db.func.count(Mod.id), db.func.max(Mod.id), db.func.max(Mod.updated_at)
+        ).one()
+        return tuple(row)
+
+    def _build(self):
+        """``(index, snapshots)``: the lookup dict and every mod by id."""
+        index = {}
+        snapshots = []
+        # The first mod (by id) wins when a name or alias is repeated,
+        # same as the old linear match_mod
+        for m in Mod.query.order_by(Mod.id).all():
+            snapshot = m.to_dict()
+            # Lista aparte: un mod cuyas claves ya tiene otro no está en el índice
+            snapshots.append(snapshot)
+            index.setdefault(normalize_key(m.name), snapshot)
+            if m.aliases:
+                for alias in m.aliases.split(','):
+                    index.setdefault(normalize_key(alias.strip()), snapshot)
+        return index, snapshots
+
+    def _get(self):
+        stamp = self._current_stamp()
+        index = self._index
+        if index is not None and stamp == self._stamp:
+            return index
+        with self._lock:
+            if self._index is None or stamp != self._stamp:
+                self._index = self._build()
+                self._stamp = stamp
+            return self._index
+
+    def lookup(self, name):
+        """Return the snapshot of the mod matching ``name`` or None."""
+        return self._get()[0].get(normalize_key(name))
+
+    def classify(self, names):
+        """Return one snapshot (or None) per name with a single index fetch."""
+        index = self._get()[0]
+        return [index.get(normalize_key(n)) for n in names]
+
+    def mods(self):
+        """Every mod snapshot, by id (also those whose names are all shadowed in the index)."""
+        return list(self._get()[1])
+
+    def version(self):
+        """Opaque string that changes whenever the mods table changes."""
+        return ':'.join(str(part) for part in self._current_stamp())
+
+    def invalidate(self):
+        """Drop the index; it is rebuilt on the next lookup."""
+        with self._lock:
+            self._index = None
+            self._stamp = None
+
+
+mod_index = ModIndex()
@@ -0,0 +1,224 @@
+"""Full-text search over the mods catalogue (/mods, /search, /modsjg).
+
+Replaces the ``name ILIKE '%term%' OR aliases ILIKE '%term%'`` table scan
+with an SQLite FTS5 index using the trigram tokenizer, so substring
+matches are answered from the index and latency does not grow with the
+catalogue. The index covers name, aliases, category and description and
+lives next to the ``mods`` table as an external-content table kept in
+sync by triggers: every write (app, migration scripts, other gunicorn
+workers) updates it in the same transaction, and a pulled blurkit.db
+already carries an up-to-date index.
+
+Ranking: exact name, then name prefix, then bm25 with name and aliases
+weighted above category and description. When nothing matches, terms of
+four or more characters fall back to a fuzzy search: mods sharing a
+trigram with the term are re-scored by similarity of their name and
+aliases, so small typos ("sodum") still find the mod.
+
+Databases without FTS5 (or other engines), and terms shorter than three
+characters, use ILIKE over the same columns. Support is probed before
+the table and triggers are created; on a SQLite without it, triggers
+left by another machine in the git-synced blurkit.db are dropped (they
+would break every write to ``mods``) and recreated, with a full
+reindex, on the next machine that has FTS5.
+"""
+
+import re
+import threading
+from difflib import SequenceMatcher
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db, Mod
+
+# Columnas indexadas y su peso en bm25 (el nombre pesa más que la descripción)
+INDEXED_COLUMNS = ('name', 'aliases', 'category', 'description')
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 0.5)
+# El tokenizer trigram no encuentra términos de menos de 3 caracteres
+MIN_TRIGRAM_CHARS = 3
+FUZZY_MIN_CHARS = 4
+FUZZY_CANDIDATES = 200
+FUZZY_MIN_SIMILARITY = 0.75
+
+_COLUMNS = ', '.join(INDEXED_COLUMNS)
+_NEW = ', '.join(f'new.{c}' for c in INDEXED_COLUMNS)
+_OLD = ', '.join(f'old.{c}' for c in INDEXED_COLUMNS)
+_TABLE = f"CREATE VIRTUAL TABLE mods_fts USING fts5({_COLUMNS}, content='mods', content_rowid='id', tokenize='trigram')"
+_TRIGGERS = {
+    'mods_fts_ai': f"CREATE TRIGGER IF NOT EXISTS mods_fts_ai AFTER INSERT ON mods BEGIN "
+                   f"INSERT INTO mods_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW}); END",
+    'mods_fts_ad': f"CREATE TRIGGER IF NOT EXISTS mods_fts_ad AFTER DELETE ON mods BEGIN "
+                   f"INSERT INTO mods_fts(mods_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD}); END",
+    'mods_fts_au': f"CREATE TRIGGER IF NOT EXISTS mods_fts_au AFTER UPDATE ON mods BEGIN "
+                   f"INSERT INTO mods_fts(mods_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD}); "
+                   f"INSERT INTO mods_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW}); END",
+}
+_REBUILD = "INSERT INTO mods_fts(mods_fts) VALUES ('rebuild')"
+_RANKED_SQL = (
+    "SELECT {select} FROM mods_fts JOIN mods ON mods.id = mods_fts.rowid "
+    "WHERE mods_fts MATCH :query "
+    "ORDER BY lower(mods.name) = :term DESC, lower(mods.name) LIKE :prefix ESCAPE '\\' DESC, "
+    "bm25(mods_fts, {weights}), mods.name"
+).format(select='{select}', weights=', '.join(str(w) for w in BM25_WEIGHTS))
+
+
+def _fts5_supported(conn):
+    """True if this SQLite has FTS5 and the trigram tokenizer (probed in the temp schema)."""
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE temp.mods_fts_probe USING fts5(probe, tokenize='trigram')"))
+        conn.execute(text("DROP TABLE temp.mods_fts_probe"))
+        return True
+    except OperationalError:
+        return False
+
+
+def _trigrams(value):
+    value = (value or '').lower()
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def _similarity(term, name, aliases):
+    """Best similarity between ``term`` and the name, an alias or one of their words."""
+    candidates = {name.lower()}
+    for alias in (aliases or '').split(','):
+        candidates.add(alias.strip().lower())
+    candidates.update(word for c in list(candidates) for word in re.split(r'[\s/()\-]+', c))
+    return max(SequenceMatcher(None, term, c).ratio() for c in candidates if c)
+
+
+def _phrase(term):
+    """FTS5 query matching ``term`` as a literal substring."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like_escape(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class ModSearch:
+    """Ranked mod search backed by the ``mods_fts`` index.
+
+    The index is created (and filled) on first use if the database does
+    not have it yet. ``available`` is False when FTS5 cannot be used; in
+    that case searches run the old ILIKE scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = False
+        self.available = False
+
+    def ensure_index(self):
+        """Create the FTS table and its triggers if missing; returns ``available``."""
+        if self._checked:
+            return self.available
+        with self._lock:
+            if self._checked:
+                return self.available
+            self.available = self._create_index()
+            self._checked = True
+        return self.available
+
+    def _create_index(self):
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        try:
+            # Conexión propia: no confirmar la transacción de la petición
+            with db.engine.begin() as conn:
+                triggers = {row[0] for row in conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'mods_fts_%'")
+                )}
+                if not _fts5_supported(conn):
+                    # blurkit.db viaja por git: si otra máquina creó el índice, sus triggers
+                    # harían fallar aquí cada escritura en mods
+                    for name in triggers:
+                        conn.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+                    print("[Search] FTS5 with trigram not available, using ILIKE", flush=True)
+                    return False
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mods_fts'")
+                ).first()
+                if not exists:
+                    conn.execute(text(_TABLE))
+                if not exists or triggers != set(_TRIGGERS):
+                    # Índice nuevo, o triggers quitados por una máquina sin FTS5: reindexar
+                    for statement in _TRIGGERS.values():
+                        conn.execute(text(statement))
+                    conn.execute(text(_REBUILD))
+                    print("[Search] Created FTS5 index for mods", flush=True)
+            return True
+        except OperationalError as e:
+            print(f"[Search] FTS5 not available, using ILIKE: {e}", flush=True)
+            return False
+
+    def rebuild(self):
+        """Re-index every mod (e.g. after editing the database with external tools)."""
+        if self.ensure_index():
+            with db.engine.begin() as conn:
+                conn.execute(text(_REBUILD))
+
+    def _ranked(self, select, term, limit):
+        sql = _RANKED_SQL.format(select=select)
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        params = {'query': _phrase(term), 'term': term, 'prefix': _like_escape(term) + '%'}
+        return sql, params
+
+    def search_ids(self, term, limit=None):
+        """Ids of the mods matching ``term``, best match first."""
+        term = (term or '').strip().lower()
+        if not term:
+            return []
+        if not self.ensure_index() or len(term) < MIN_TRIGRAM_CHARS:
+            return [m.id for m in self._like(term, limit)]
+        sql, params = self._ranked('mods.id', term, limit)
+        ids = [row[0] for row in db.session.execute(text(sql), params)]
+        if not ids and len(term) >= FUZZY_MIN_CHARS:
+            ids = self._fuzzy_ids(term, limit)
+        return ids
+
+    def search(self, term, limit=None):
+        """:class:`Mod` objects matching ``term``, best match first."""
+        term = (term or '').strip().lower()
+        if not term:
+            return []
+        if not self.ensure_index() or len(term) < MIN_TRIGRAM_CHARS:
+            return self._like(term, limit)
+        sql, params = self._ranked('mods.*', term, limit)
+        mods = db.session.execute(db.select(Mod).from_statement(text(sql)), params).scalars().all()
+        if not mods and len(term) >= FUZZY_MIN_CHARS:
+            ids = self._fuzzy_ids(term, limit)
+            by_id = {m.id: m for m in Mod.query.filter(Mod.id.in_(ids))} if ids else {}
+            mods = [by_id[i] for i in ids if i in by_id]
+        return mods
+
+    def _fuzzy_ids(self, term, limit):
+        """Mods whose name or an alias is close to ``term`` (typos)."""
+        query = ' OR '.join(_phrase(t) for t in sorted(_trigrams(term)))
+        rows = db.session.execute(text(
+            "SELECT mods.id, mods.name, mods.aliases FROM mods_fts JOIN mods ON mods.id = mods_fts.rowid "
+            f"WHERE mods_fts MATCH :query ORDER BY bm25(mods_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}) "
+            f"LIMIT {FUZZY_CANDIDATES}"
+        ), {'query': query}).all()
+        scored = []
+        for mod_id, name, aliases in rows:
+            similarity = _similarity(term, name, aliases)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((-similarity, name.lower(), mod_id))
+        scored.sort()
+        ids = [mod_id for _, _, mod_id in scored]
+        return ids[:limit] if limit else ids
+
+    def _like(self, term, limit):
+        # Mismas columnas que el índice FTS
+        pattern = f'%{_like_escape(term)}%'
+        query = Mod.query.filter(
+            db.or_(*(getattr(Mod, c).ilike(pattern, escape='\\') for c in INDEXED_COLUMNS))
+        ).order_by(Mod.name)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+
+mod_search = ModSearch()
@@ -0,0 +1,43 @@
+"""Mod catalogue statistics for the menu and dashboard.
+
+All counts come from a single ``GROUP BY status, category, platform``
+query; totals per status, category and platform are summed from its
+rows. The result is a plain dict, cached by the caller per mod-list
+version (see ``app.mod_stats``).
+"""
+
+from models import db, Mod
+
+NO_CATEGORY = 'Sin categoría'
+NO_PLATFORM = 'Sin plataforma'
+
+
+def _ranked(counts):
+    return [{'name': name, 'count': count}
+            for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0].lower()))]
+
+
+def compute_stats():
+    """Counts of mods by status, category and platform with one query."""
+    rows = db.session.query(
+        Mod.status, Mod.category, Mod.platform, db.func.count(Mod.id)
+    ).group_by(Mod.status, Mod.category, Mod.platform).all()
+    by_status = {}
+    by_category = {}
+    by_platform = {}
+    total = 0
+    for status, category, platform, count in rows:
+        total += count
+        by_status[status] = by_status.get(status, 0) + count
+        category = (category or '').strip() or NO_CATEGORY
+        by_category[category] = by_category.get(category, 0) + count
+        platform = (platform or '').strip() or NO_PLATFORM
+        by_platform[platform] = by_platform.get(platform, 0) + count
+    return {
+        'total': total,
+        'prohibidos': by_status.get('prohibido', 0),
+        'permitidos': by_status.get('permitido', 0),
+        'by_status': by_status,
+        'by_category': _ranked(by_category),
+        'by_platform': _ranked(by_platform),
+    }
@@ -5,6 +5,7 @@ Defines User and Mod models with SQLAlchemy.
 
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+import json
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -61,6 +62,8 @@ class Mod(db.Model):
     """Mod model with status, category, and aliases."""
     
     __tablename__ = 'mods'
+    # Filtro por estado + orden por nombre (listados, /api/mods) sin ordenar en memoria
+    __table_args__ = (db.Index('ix_mods_status_name', 'status', 'name'),)
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), unique=True, nullable=False, index=True)
@@ -105,7 +108,11 @@ class Mod(db.Model):
 
 
 class LoginAttempt(db.Model):
-    """Model to track failed login attempts by IP and username."""
+    """Failed login attempts by IP (legacy).
+
+    Login throttling now lives in rate_limit.py; the table is kept so
+    existing databases and migration scripts keep working.
+    """
     
     __tablename__ = 'login_attempts'
     
@@ -113,8 +120,48 @@ class LoginAttempt(db.Model):
     ip_address = db.Column(db.String(45), nullable=False, index=True)  # IPv4 and IPv6
     username = db.Column(db.String(80), nullable=False)
     attempts = db.Column(db.Integer, default=1, nullable=False)
-    last_attempt = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_attempt = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     is_blocked = db.Column(db.Boolean, default=False, nullable=False)
     
     def __repr__(self):
         return f'<LoginAttempt {self.ip_address} - {self.username} ({self.attempts})>'
+
+
+class AnalysisHistory(db.Model):
+    """Log analysis result saved per user (stored in instance/history.db).
+
+    Summary columns are kept apart from the full JSON result so history
+    lists can be rendered without loading every result.
+    """
+    
+    __tablename__ = 'analysis_history'
+    __bind_key__ = 'history'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    username = db.Column(db.String(80), nullable=False)
+    filename = db.Column(db.String(255))
+    mc_version = db.Column(db.String(20))
+    prohibidos = db.Column(db.Integer, default=0, nullable=False)
+    permitidos = db.Column(db.Integer, default=0, nullable=False)
+    resultado_json = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    
+    def __repr__(self):
+        return f'<AnalysisHistory {self.id} {self.username} ({self.filename})>'
+    
+    def to_summary(self):
+        """Lightweight row for history tables (no full result)."""
+        return {
+            'id': self.id,
+            'timestamp': self.created_at.strftime('%d/%m/%Y %H:%M:%S') if self.created_at else '',
+            'user': self.username,
+            'filename': self.filename,
+            'mc_version': self.mc_version,
+            'prohibidos': self.prohibidos,
+            'permitidos': self.permitidos
+        }
+    
+    def get_resultado(self):
+        """Decode the stored analysis result."""
+        return json.loads(self.resultado_json)
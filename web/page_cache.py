@@ -0,0 +1,69 @@
+"""Per-version cache for public pages and mod-list snapshots.
+
+``home`` and ``modsjg`` only change when the mods table changes, so
+their rendered HTML is kept until ``mod_index.version()`` moves on.
+Each entry also carries a strong ETag (hash of the body), identical in
+every gunicorn worker, so browsers revalidate with ``If-None-Match`` and
+get a 304 without the page being rendered or sent again.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def body_etag(body):
+    """Strong ETag for a response body (str or bytes)."""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class VersionedCache:
+    """LRU of values that are valid for one version of the mods table.
+
+    ``get_or_compute(key, version, compute)`` returns the stored value
+    while ``version`` matches; otherwise ``compute()`` runs again. Keys
+    with a search term are bounded by ``max_entries``.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (version, value)
+        self.counters = {'hits': 0, 'misses': 0}
+
+    def get_or_compute(self, key, version, compute):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] == version:
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return item[1]
+            self.counters['misses'] += 1
+        # Se calcula fuera del lock: dos peticiones simultáneas pueden
+        # renderizar la misma página, pero ninguna espera a la otra
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def page(self, key, version, render):
+        """``(html, etag)`` of a rendered page, cached for ``version``."""
+        def compute():
+            html = render()
+            return html, body_etag(html)
+        return self.get_or_compute(key, version, compute)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self.counters)
+            data['entries'] = len(self._entries)
+        return data
@@ -0,0 +1,298 @@
+"""Opt-in request timing, Server-Timing headers and sampled cProfile.
+
+Enabled with ``PROFILING=1``. For every request :class:`Profiler`
+records the total time and the time of each named stage
+(``with profiler.stage('extract'): ...`` or ``@profiler.timed('render')``),
+plus the SQL time of every engine (SQLAlchemy cursor events, as ``db``),
+and:
+
+- adds a ``Server-Timing`` header, so the browser's network panel shows
+  the breakdown (``decode;dur=12.3, extract;dur=410.0, ...``);
+- keeps rolling latency histograms per route and per route stage;
+- runs cProfile on a sample of requests (``PROFILE_SAMPLE_RATE``) and
+  keeps the last ``PROFILE_KEEP`` captures.
+
+/admin/profiling shows all of it. Figures are per process: with several
+gunicorn workers each one reports its own requests.
+
+Histograms use fixed log-scale buckets (each 20% wider than the last),
+so recording is O(1) and percentiles are accurate to one bucket. The
+window is split into slots; the oldest slot is dropped as time moves on.
+When disabled, ``stage()`` returns a shared no-op context manager.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import functools
+import io
+import itertools
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+
+from flask import g, has_request_context, request
+
+# Límites de los buckets en ms: de 0.1 ms a ~2 min, cada uno un 20% mayor
+BUCKET_BOUNDS = [0.1 * 1.2 ** i for i in range(78)]
+PERCENTILES = (50, 90, 99)
+# Funciones mostradas de cada captura de cProfile
+PROFILE_TOP = 40
+
+_NOOP = contextlib.nullcontext()
+
+
+class RollingHistogram:
+    """Latency histogram (ms) over the last ``window`` seconds, in ``slots`` slots."""
+
+    def __init__(self, window=3600, slots=6):
+        self.slot_seconds = window / slots
+        self.slots = slots
+        self._counts = {}  # slot -> [count per bucket]
+        self._totals = {}  # slot -> [n, sum, max]
+
+    def _live(self, now):
+        oldest = int(now // self.slot_seconds) - self.slots + 1
+        for slot in [s for s in self._counts if s < oldest]:
+            del self._counts[slot], self._totals[slot]
+        return oldest
+
+    def record(self, ms, now):
+        slot = int(now // self.slot_seconds)
+        counts = self._counts.get(slot)
+        if counts is None:
+            self._live(now)
+            counts = self._counts[slot] = [0] * (len(BUCKET_BOUNDS) + 1)
+            self._totals[slot] = [0, 0.0, 0.0]
+        counts[bisect.bisect_left(BUCKET_BOUNDS, ms)] += 1
+        totals = self._totals[slot]
+        totals[0] += 1
+        totals[1] += ms
+        totals[2] = max(totals[2], ms)
+
+    def summary(self, now):
+        """``{'count', 'mean', 'max', 'p50', 'p90', 'p99'}`` over the window (None if empty)."""
+        self._live(now)
+        if not self._counts:
+            return None
+        merged = [sum(column) for column in zip(*self._counts.values())]
+        count = sum(t[0] for t in self._totals.values())
+        if not count:
+            return None
+        data = {
+            'count': count,
+            'mean': sum(t[1] for t in self._totals.values()) / count,
+            'max': max(t[2] for t in self._totals.values()),
+        }
+        cumulative = list(itertools.accumulate(merged))
+        for pct in PERCENTILES:
+            index = bisect.bisect_left(cumulative, count * pct / 100)
+            # Límite superior del bucket, sin pasar del máximo observado
+            bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else data['max']
+            data[f'p{pct}'] = min(bound, data['max'])
+        return data
+
+
+class Profiler:
+    """Per-request stage timings for a Flask app (see the module docstring).
+
+    ``sample_rate`` is the fraction of requests run under cProfile; the
+    last ``keep`` captures are kept for /admin/profiling.
+    """
+
+    def __init__(self, app=None, enabled=False, sample_rate=0.01, keep=20, window=3600):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms = {}  # (ruta, etapa) -> RollingHistogram; etapa 'total' = la petición
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self.started_at = time.time()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        self._watch_sql()
+
+    def _watch_sql(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        # El inicio se guarda en el contexto de ejecución, que se descarta con la sentencia
+        # (también si falla); en conn.info quedaría acumulado para siempre
+        @event.listens_for(Engine, 'before_cursor_execute')
+        def before(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._profiling_start = time.perf_counter()
+
+        @event.listens_for(Engine, 'after_cursor_execute')
+        def after(conn, cursor, statement, parameters, context, executemany):
+            start = getattr(context, '_profiling_start', None)
+            if start is not None:
+                self.add('db', (time.perf_counter() - start) * 1000)
+
+        @event.listens_for(Engine, 'handle_error')
+        def failed(exception_context):
+            # Una sentencia que falla también cuenta como tiempo de base de datos
+            start = getattr(exception_context.execution_context, '_profiling_start', None)
+            if start is not None:
+                self.add('db', (time.perf_counter() - start) * 1000)
+
+    def _before(self):
+        if request.endpoint == 'static':
+            return
+        g.profiling_stages = {}
+        g.profiling_profile = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                g.profiling_profile = profile
+            except ValueError:
+                pass  # otro profiler activo en este hilo
+        g.profiling_start = time.perf_counter()
+
+    def _after(self, response):
+        start = g.pop('profiling_start', None)
+        if start is None:
+            return response
+        total = (time.perf_counter() - start) * 1000
+        stages = g.pop('profiling_stages', {})
+        profile = g.pop('profiling_profile', None)
+        if profile is not None:
+            profile.disable()
+        route = self.route_name()
+        response.headers['Server-Timing'] = ', '.join(
+            [f'{name};dur={ms:.1f}' for name, (ms, _) in stages.items()] + [f'total;dur={total:.1f}']
+        )
+        now = time.time()
+        with self._lock:
+            self._histogram(route, 'total').record(total, now)
+            for name, (ms, _) in stages.items():
+                self._histogram(route, name).record(ms, now)
+        if profile is not None:
+            self._store_profile(profile, route, total, now)
+        return response
+
+    def _teardown(self, exc):
+        # Petición que terminó con una excepción: no dejar el profiler activo
+        profile = g.pop('profiling_profile', None)
+        if profile is not None:
+            profile.disable()
+
+    @staticmethod
+    def route_name():
+        rule = request.url_rule.rule if request.url_rule else '(404)'
+        return f'{request.method} {rule}'
+
+    def _histogram(self, route, stage):
+        histogram = self._histograms.get((route, stage))
+        if histogram is None:
+            histogram = self._histograms[(route, stage)] = RollingHistogram(self.window)
+        return histogram
+
+    def stage(self, name):
+        """Context manager timing ``name`` in the current request (no-op outside one)."""
+        if not self.enabled or not has_request_context() or 'profiling_stages' not in g:
+            return _NOOP
+        return self._timed(name)
+
+    def timed(self, name):
+        """Decorator: time every call of the function as stage ``name``."""
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name, ms):
+        """Add ``ms`` to stage ``name`` of the current request (repeated stages are summed)."""
+        if not has_request_context():
+            return
+        stages = g.get('profiling_stages')
+        if stages is None:
+            return
+        total, count = stages.get(name, (0.0, 0))
+        stages[name] = (total + ms, count + 1)
+
+    def _store_profile(self, profile, route, total, now):
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+        capture = {
+            'id': next(self._ids),
+            'route': route,
+            'path': request.full_path.rstrip('?'),
+            'at': now,
+            'total_ms': total,
+            'text': stats.stream.getvalue(),
+            # Formato de pstats.dump_stats: se abre con snakeviz o pstats
+            'dump': marshal.dumps(stats.stats),
+        }
+        with self._lock:
+            self._profiles.appendleft(capture)
+
+    def profiles(self):
+        with self._lock:
+            return [{k: v for k, v in p.items() if k not in ('text', 'dump')} for p in self._profiles]
+
+    def profile(self, profile_id):
+        with self._lock:
+            return next((p for p in self._profiles if p['id'] == profile_id), None)
+
+    def report(self):
+        """Routes sorted by total time spent, each with its stage summaries."""
+        now = time.time()
+        routes = {}
+        with self._lock:
+            for (route, stage), histogram in self._histograms.items():
+                summary = histogram.summary(now)
+                if summary is None:
+                    continue
+                entry = routes.setdefault(route, {'route': route, 'total': None, 'stages': []})
+                if stage == 'total':
+                    entry['total'] = summary
+                else:
+                    entry['stages'].append(dict(summary, name=stage))
+        result = [r for r in routes.values() if r['total']]
+        for entry in result:
+            entry['stages'].sort(key=lambda s: -s['mean'] * s['count'])
+        result.sort(key=lambda r: -r['total']['mean'] * r['total']['count'])
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._profiles.clear()
+        self.started_at = time.time()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'window': self.window,
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+        }
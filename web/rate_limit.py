@@ -0,0 +1,306 @@
+"""Login throttling shared by every gunicorn worker.
+
+Failed attempts are counted with a sliding-window counter: each key
+keeps the number of hits in the current fixed window and in the previous
+one, and the estimate is
+
+    hits + prev_hits * (time left in the current window / window)
+
+so a burst cannot reset itself at a window boundary, and a key only
+needs one row (one upsert per attempt).
+
+Backends:
+    - ``MemoryBackend``: in-process, bounded LRU; entries older than two
+      windows are dropped in bulk. Only valid for a single worker.
+    - ``SQLiteBackend``: table ``rate_limits`` in its own SQLite file
+      (not blurkit.db, which is versioned in git), shared by all
+      workers. Expired rows are deleted in bulk every few writes.
+
+``RateLimiter`` keeps blocked verdicts for a few seconds in an
+in-process TTL cache, so a client hammering the login while blocked
+barely reaches SQLite, and falls back to memory if the database cannot
+be used.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import sqlite_tuning
+
+# Estado de una clave: intentos estimados en la ventana y si está bloqueada
+LimitStatus = namedtuple('LimitStatus', 'key label attempts blocked retry_after')
+
+# Cada cuántas escrituras se borran las entradas caducadas
+EXPIRE_EVERY = 50
+# Segundos que un worker recuerda un bloqueo sin consultar el backend
+# (corto, para que un desbloqueo desde el panel llegue pronto a todos)
+BLOCK_CACHE_SECONDS = 10
+
+
+def _estimate(bucket, hits, prev_hits, now, window):
+    """Sliding-window estimate of the hits in the last ``window`` seconds."""
+    current = int(now // window)
+    if bucket == current - 1:
+        hits, prev_hits = 0, hits
+    elif bucket != current:
+        return 0.0
+    elapsed = now - current * window
+    return hits + prev_hits * (window - elapsed) / window
+
+
+def _retry_after(bucket, hits, prev_hits, now, window, limit):
+    """Seconds until the estimate drops below ``limit`` (0 if it already is)."""
+    current = int(now // window)
+    if bucket == current - 1:
+        hits, prev_hits = 0, hits
+    elif bucket != current:
+        return 0
+    elapsed = now - current * window
+    if hits >= limit:
+        # Hasta la ventana siguiente, donde estos intentos pasan a ser los anteriores
+        wait = (window - elapsed) + window * (1 - limit / hits)
+    elif prev_hits:
+        wait = window * (1 - (limit - hits) / prev_hits) - elapsed
+    else:
+        wait = 0
+    return max(0, math.ceil(wait))
+
+
+class MemoryBackend:
+    """Per-process store: key -> [bucket, hits, prev_hits, label]."""
+
+    name = 'memory'
+
+    def __init__(self, window, max_entries=10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._writes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return tuple(entry) if entry is not None else None
+
+    def hit(self, key, label, now):
+        bucket = int(now // self.window)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [bucket, 0, 0, label]
+            elif entry[0] != bucket:
+                entry[2] = entry[1] if entry[0] == bucket - 1 else 0
+                entry[0], entry[1] = bucket, 0
+            entry[1] += 1
+            entry[3] = label
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._writes += 1
+            if self._writes % EXPIRE_EVERY == 0:
+                self._expire(bucket)
+            return tuple(entry)
+
+    def _expire(self, bucket):
+        for key in [k for k, e in self._entries.items() if e[0] < bucket - 1]:
+            del self._entries[key]
+
+    def expire(self, now):
+        with self._lock:
+            self._expire(int(now // self.window))
+
+    def reset(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def items(self):
+        with self._lock:
+            return [(key, tuple(entry)) for key, entry in self._entries.items()]
+
+
+class SQLiteBackend:
+    """Store shared by all workers in the ``rate_limits`` table of ``db_path``."""
+
+    name = 'sqlite'
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS rate_limits ('
+        'key TEXT PRIMARY KEY, bucket INTEGER NOT NULL, hits INTEGER NOT NULL, '
+        'prev_hits INTEGER NOT NULL, label TEXT, updated REAL NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_rate_limits_bucket ON rate_limits (bucket)',
+    )
+    # Un solo upsert: las expresiones del SET leen los valores anteriores de la fila
+    _UPSERT = (
+        'INSERT INTO rate_limits (key, bucket, hits, prev_hits, label, updated) '
+        'VALUES (:key, :bucket, 1, 0, :label, :now) '
+        'ON CONFLICT (key) DO UPDATE SET '
+        'prev_hits = CASE WHEN bucket = excluded.bucket THEN prev_hits '
+        'WHEN bucket = excluded.bucket - 1 THEN hits ELSE 0 END, '
+        'hits = CASE WHEN bucket = excluded.bucket THEN hits + 1 ELSE 1 END, '
+        'bucket = excluded.bucket, label = excluded.label, updated = excluded.updated'
+    )
+
+    def __init__(self, db_path, window):
+        self.db_path = str(db_path)
+        self.window = window
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=sqlite_tuning.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                                   isolation_level=None)
+            sqlite_tuning.apply_pragmas(conn)
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        return self._connect().execute(
+            'SELECT bucket, hits, prev_hits, label FROM rate_limits WHERE key = ?', (key,)
+        ).fetchone()
+
+    def hit(self, key, label, now):
+        bucket = int(now // self.window)
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(self._UPSERT, {'key': key, 'bucket': bucket, 'label': label, 'now': now})
+            row = conn.execute(
+                'SELECT bucket, hits, prev_hits, label FROM rate_limits WHERE key = ?', (key,)
+            ).fetchone()
+            self._writes += 1
+            if self._writes % EXPIRE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limits WHERE bucket < ?', (bucket - 1,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def expire(self, now):
+        self._connect().execute('DELETE FROM rate_limits WHERE bucket < ?', (int(now // self.window) - 1,))
+
+    def reset(self, key):
+        self._connect().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def clear(self):
+        return self._connect().execute('DELETE FROM rate_limits').rowcount
+
+    def items(self):
+        rows = self._connect().execute(
+            'SELECT key, bucket, hits, prev_hits, label FROM rate_limits ORDER BY updated DESC'
+        ).fetchall()
+        return [(row[0], row[1:]) for row in rows]
+
+
+class RateLimiter:
+    """``limit`` failed attempts per ``window`` seconds for each key.
+
+    ``check(key)`` before verifying credentials, ``hit(key, label)`` on a
+    failure and ``reset(key)`` on success.
+    """
+
+    def __init__(self, limit=5, window=900, backend=None, block_cache_seconds=BLOCK_CACHE_SECONDS):
+        self.limit = limit
+        self.window = window
+        self.backend = backend or MemoryBackend(window)
+        self.block_cache_seconds = block_cache_seconds
+        self._fallback = None
+        self._lock = threading.Lock()
+        self._blocked = {}  # key -> (cached until, blocked until, status)
+        self.counters = {'checks': 0, 'blocked': 0, 'cached_blocks': 0, 'errors': 0}
+
+    def _call(self, method, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except sqlite3.Error as e:
+            # Si la base de datos falla, se sigue limitando por proceso
+            with self._lock:
+                self.counters['errors'] += 1
+                if self._fallback is None:
+                    print(f"[RateLimit] {self.backend.name} backend failed, using memory: {e}", flush=True)
+                    self._fallback = MemoryBackend(self.window)
+            return getattr(self._fallback, method)(*args)
+
+    def _status(self, key, entry, now):
+        if entry is None:
+            return LimitStatus(key, '', 0, False, 0)
+        bucket, hits, prev_hits, label = entry
+        estimate = _estimate(bucket, hits, prev_hits, now, self.window)
+        blocked = estimate >= self.limit
+        retry = _retry_after(bucket, hits, prev_hits, now, self.window, self.limit) if blocked else 0
+        return LimitStatus(key, label or '', int(estimate), blocked, retry)
+
+    def _remember(self, status, now):
+        if status.blocked and self.block_cache_seconds:
+            until = now + status.retry_after
+            with self._lock:
+                self._blocked[status.key] = (min(until, now + self.block_cache_seconds), until, status)
+                if len(self._blocked) > 1000:
+                    for key in [k for k, c in self._blocked.items() if c[0] <= now]:
+                        del self._blocked[key]
+
+    def check(self, key, now=None):
+        """Current :class:`LimitStatus` of ``key`` (does not count an attempt)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.counters['checks'] += 1
+            cached = self._blocked.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self.counters['cached_blocks'] += 1
+                    self.counters['blocked'] += 1
+                    return cached[2]._replace(retry_after=math.ceil(cached[1] - now))
+                del self._blocked[key]
+        status = self._status(key, self._call('get', key), now)
+        if status.blocked:
+            with self._lock:
+                self.counters['blocked'] += 1
+            self._remember(status, now)
+        return status
+
+    def hit(self, key, label='', now=None):
+        """Count a failed attempt; returns the new :class:`LimitStatus`."""
+        now = time.time() if now is None else now
+        status = self._status(key, self._call('hit', key, label, now), now)
+        self._remember(status, now)
+        return status
+
+    def reset(self, key):
+        with self._lock:
+            self._blocked.pop(key, None)
+        self._call('reset', key)
+
+    def clear(self):
+        """Forget every key; returns how many were stored."""
+        with self._lock:
+            self._blocked.clear()
+        return self._call('clear')
+
+    def active(self, now=None):
+        """Statuses of the keys with attempts in the current window (expired ones are purged)."""
+        now = time.time() if now is None else now
+        self._call('expire', now)
+        statuses = [self._status(key, entry, now) for key, entry in self._call('items')]
+        return [s for s in statuses if s.attempts > 0]
+
+    def stats(self):
+        with self._lock:
+            data = dict(self.counters)
+        data['backend'] = self._fallback.name if self._fallback else self.backend.name
+        data['limit'] = self.limit
+        data['window'] = self.window
+        return data
@@ -0,0 +1,196 @@
+"""Content-addressed cache for log analysis results.
+
+The same latest.log is often uploaded by several staff members; its
+result is cached under the SHA-256 of the normalized log text plus the
+mod-list version, so a new analysis is only run when the log or the
+mods change.
+
+Two tiers:
+    - in-process LRU with TTL (always on);
+    - optional SQLite table shared by all gunicorn workers
+      (enabled with ``RESULT_CACHE_DB``).
+
+Values are stored as JSON, so every hit returns a fresh copy that the
+caller can modify freely. The in-process tier is bounded both by entry
+count and by the total size of the stored JSON (``max_bytes``): a result
+from a 256 MB log can carry a long ``errors`` list. A single result
+larger than a quarter of the budget is only kept in the SQLite tier.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(kind, text, version=''):
+    """SHA-256 of ``kind``, ``version`` and the normalized log text.
+
+    ``text`` is the log as a string or any iterable of lines (e.g. a
+    streamed upload). Normalization ignores line-ending style and
+    trailing whitespace, so the same log pasted or uploaded from
+    Windows/Linux hashes the same.
+    """
+    h = hashlib.sha256()
+    h.update(f'{kind}\0{version}\0'.encode('utf-8'))
+    lines = text.splitlines() if isinstance(text, str) else text
+    for line in lines:
+        h.update(line.rstrip().encode('utf-8', errors='ignore'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+class ResultCache:
+    """LRU + TTL cache of JSON-serializable results with hit/miss counters."""
+
+    def __init__(self, max_entries=256, ttl=3600, db_path=None, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (created, json)
+        self._bytes = 0  # Suma de len(json) de las entradas en memoria
+        self._db_ready = False
+        self._writes = 0
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'oversized': 0}
+
+    # ------------------------------------------------------------ SQLite tier
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS result_cache ('
+                'key TEXT PRIMARY KEY, created REAL NOT NULL, value TEXT NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_result_cache_created ON result_cache (created)')
+            self._db_ready = True
+        return conn
+
+    def _disk_get(self, key, now):
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT created, value FROM result_cache WHERE key = ? AND created > ?',
+                    (key, now - self.ttl)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        return row
+
+    def _disk_set(self, key, created, payload):
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO result_cache (key, created, value) VALUES (?, ?, ?)',
+                        (key, created, payload)
+                    )
+                    self._writes += 1
+                    # Expire old rows in bulk from time to time
+                    if self._writes % 50 == 0:
+                        conn.execute('DELETE FROM result_cache WHERE created <= ?', (created - self.ttl,))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    # -------------------------------------------------------------------- API
+
+    def get(self, key):
+        return self._lookup(key, count=True)
+
+    def peek(self, key):
+        """Like :meth:`get`, but not counted in the hit/miss statistics (status polls)."""
+        return self._lookup(key, count=False)
+
+    def _lookup(self, key, count):
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                created, payload = item
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.counters['hits'] += 1
+                    return json.loads(payload)
+                self._drop(key)
+                self.counters['expired'] += 1
+        if self.db_path:
+            row = self._disk_get(key, now)
+            if row is not None:
+                with self._lock:
+                    if count:
+                        self.counters['disk_hits'] += 1
+                    self._store(key, row[0], row[1])
+                return json.loads(row[1])
+        if count:
+            with self._lock:
+                self.counters['misses'] += 1
+        return None
+
+    def _drop(self, key):
+        created, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _store(self, key, created, payload):
+        if key in self._entries:
+            self._drop(key)
+        if len(payload) > self.max_bytes // 4:
+            # Demasiado grande para la memoria: solo en SQLite (si está activo)
+            self.counters['oversized'] += 1
+            return
+        self._entries[key] = (created, payload)
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.counters['evictions'] += 1
+
+    def set(self, key, value):
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        created = time.time()
+        with self._lock:
+            self._store(key, created, payload)
+        if self.db_path:
+            self._disk_set(key, created, payload)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key`` or compute, store and return it."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.db_path:
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute('DELETE FROM result_cache')
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        with self._lock:
+            data = dict(self.counters)
+            data['entries'] = len(self._entries)
+            data['bytes'] = self._bytes
+        lookups = data['hits'] + data['disk_hits'] + data['misses']
+        data['hit_rate'] = round((data['hits'] + data['disk_hits']) / lookups, 3) if lookups else 0.0
+        data['persistent'] = bool(self.db_path)
+        return data
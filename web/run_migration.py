@@ -8,6 +8,7 @@ web_dir = Path(__file__).parent
 sys.path.insert(0, str(web_dir))
 
 from migrate_json_to_db import main
+from migrate_add_indexes import migrate_indexes
 from models import db
 from app import app
 
@@ -17,6 +18,9 @@ if __name__ == '__main__':
         db.create_all()
         print("✓ Tablas creadas")
         
+        # Indexes that create_all() does not add to existing tables
+        migrate_indexes()
+        
         # Now run the migration
         print("\nEjecutando migración...")
         main()
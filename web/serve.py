@@ -0,0 +1,156 @@
+"""Production WSGI serving for the desktop launcher and Render.
+
+``app.run()`` is Werkzeug's development server: a new thread per
+connection with no limit, a single process (a large log being analysed
+holds the GIL while every other request waits), no request timeout and
+no graceful shutdown. :func:`serve` runs the app on a real server
+instead:
+
+- ``gunicorn`` (Linux, Render): ``workers`` processes with ``threads``
+  threads each (gthread). SIGTERM stops accepting and lets in-flight
+  requests finish for ``graceful_timeout`` seconds.
+- ``waitress`` (desktop, Windows): one process with a pool of
+  ``threads``. Request bodies are buffered by the event loop before a
+  thread picks them up, so a slow upload does not hold a thread.
+  SIGTERM / SIGINT stop accepting and wait for in-flight requests.
+- ``flask``: the development server, only as a fallback when neither
+  server is installed.
+
+Settings (arguments win over environment variables): ``WEB_SERVER``
+(auto, gunicorn, waitress, flask), ``WEB_WORKERS`` (default
+``WEB_CONCURRENCY`` or 1), ``WEB_THREADS`` (8), ``WEB_TIMEOUT`` (120 s)
+and ``WEB_GRACEFUL_TIMEOUT`` (30 s). More than one worker needs the
+app's state in shared storage (see ``app.unshared_state``).
+"""
+
+import importlib.util
+import os
+import signal
+import threading
+import time
+
+SERVERS = ('gunicorn', 'waitress', 'flask')
+
+
+def settings(server=None, workers=None, threads=None, timeout=None, graceful_timeout=None):
+    """Effective settings: explicit values, then environment, then defaults."""
+    def pick(value, env, default):
+        return value if value is not None else type(default)(os.environ.get(env, default))
+
+    return {
+        'server': pick(server, 'WEB_SERVER', 'auto'),
+        'workers': pick(workers, 'WEB_WORKERS', int(os.environ.get('WEB_CONCURRENCY', 1))),
+        'threads': pick(threads, 'WEB_THREADS', 8),
+        'timeout': pick(timeout, 'WEB_TIMEOUT', 120),
+        'graceful_timeout': pick(graceful_timeout, 'WEB_GRACEFUL_TIMEOUT', 30),
+    }
+
+
+def available(server):
+    if server == 'flask':
+        return True
+    if server == 'gunicorn' and os.name == 'nt':
+        return False
+    return importlib.util.find_spec(server) is not None
+
+
+def choose_server(requested='auto'):
+    """``requested`` if it can run here; for ``auto`` the first available of :data:`SERVERS`."""
+    if requested not in ('auto',) + SERVERS:
+        raise ValueError(f"Unknown server {requested!r} (expected auto, {', '.join(SERVERS)})")
+    if requested != 'auto':
+        if available(requested):
+            return requested
+        print(f"[Serve] {requested} is not available here, choosing another server", flush=True)
+    for server in SERVERS:
+        if available(server):
+            return server
+
+
+def serve(app, host='127.0.0.1', port=5000, on_start=None, **overrides):
+    """Serve ``app`` until a shutdown signal.
+
+    ``on_start`` runs in every serving process before it handles
+    requests (after the fork with gunicorn), e.g. to reopen database
+    connections and start the warm-up. ``overrides`` are the keyword
+    arguments of :func:`settings`.
+    """
+    config = settings(**overrides)
+    server = choose_server(config['server'])
+    if server == 'gunicorn':
+        print(f"[Serve] gunicorn on {host}:{port}: {config['workers']} workers x {config['threads']} threads",
+              flush=True)
+        _run_gunicorn(app, host, port, config, on_start)
+        return
+    if on_start:
+        on_start()
+    if server == 'waitress':
+        print(f"[Serve] waitress on {host}:{port}: {config['threads']} threads", flush=True)
+        _run_waitress(app, host, port, config)
+    else:
+        print("[Serve] WARNING: neither gunicorn nor waitress is installed, using the development server",
+              flush=True)
+        app.run(host=host, port=port, debug=False, threaded=True)
+
+
+def _run_gunicorn(app, host, port, config, on_start):
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': config['workers'],
+        'threads': config['threads'],
+        'worker_class': 'gthread',
+        'timeout': config['timeout'],
+        'graceful_timeout': config['graceful_timeout'],
+        # La app ya está importada: los workers la heredan al hacer fork
+        'preload_app': True,
+    }
+    if on_start:
+        options['post_worker_init'] = lambda worker: on_start()
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    Application().run()
+
+
+def _run_waitress(app, host, port, config):
+    from waitress import create_server, wasyncore
+
+    server = create_server(app, host=host, port=port, threads=config['threads'],
+                           channel_timeout=config['timeout'])
+    socket_map = server._map
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        stop.set()
+
+    for name in ('SIGTERM', 'SIGINT', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), request_stop)
+
+    while not stop.is_set():
+        wasyncore.loop(timeout=0.5, map=socket_map, count=1)
+
+    # Dejar de aceptar conexiones y terminar las peticiones en curso
+    print("[Serve] Shutting down, finishing in-flight requests...", flush=True)
+    wasyncore.dispatcher.close(server)
+    dispatcher = server.task_dispatcher
+    deadline = time.monotonic() + config['graceful_timeout']
+    while time.monotonic() < deadline and (dispatcher.active_count or dispatcher.queue or _busy_channels(socket_map)):
+        wasyncore.loop(timeout=0.1, map=socket_map, count=1)
+    dispatcher.shutdown(cancel_pending=True, timeout=1)
+    wasyncore.close_all(socket_map)
+    print("[Serve] Stopped", flush=True)
+
+
+def _busy_channels(socket_map):
+    """Connections with a request being handled or a response still being sent."""
+    return any(getattr(channel, 'requests', None) or getattr(channel, 'total_outbufs_len', 0)
+               for channel in list(socket_map.values()))
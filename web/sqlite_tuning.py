@@ -0,0 +1,119 @@
+"""SQLite engine settings for blurkit.db and history.db.
+
+With the default rollback journal a writer (login, LoginAttempt updates,
+mod edits) locks the whole file and every gunicorn worker reading it
+waits. Every new SQLite connection is configured with:
+
+- ``journal_mode=WAL``: readers keep reading while one writer commits;
+- ``synchronous=NORMAL``: safe with WAL, fsync only at checkpoints;
+- ``busy_timeout``: writers wait for the lock instead of failing at once;
+- ``mmap_size`` / ``cache_size``: reads served from memory.
+
+Each setting can be changed with an environment variable
+(``SQLITE_JOURNAL_MODE``, ``SQLITE_SYNCHRONOUS``, ``SQLITE_BUSY_TIMEOUT_MS``,
+``SQLITE_MMAP_MB``, ``SQLITE_CACHE_MB``, ``SQLITE_POOL_SIZE``);
+``SQLITE_JOURNAL_MODE=DELETE`` restores the old journal.
+
+blurkit.db is committed to git, so :func:`checkpoint` must run before it
+is staged or replaced: it moves the WAL contents into the main file
+(:func:`require_checkpoint` raises when it could not).
+"""
+
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL').upper()
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_MMAP_MB = int(os.environ.get('SQLITE_MMAP_MB', 64))
+SQLITE_CACHE_MB = int(os.environ.get('SQLITE_CACHE_MB', 16))
+SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 5))
+
+_JOURNAL_MODES = {'WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'OFF'}
+_SYNCHRONOUS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def _is_file_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def engine_options(uri):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for ``uri``.
+
+    File databases get a small connection pool (each connection keeps its
+    pragmas and page cache) and the busy timeout as the driver timeout.
+    In-memory SQLite keeps SQLAlchemy's default pool.
+    """
+    if _is_file_sqlite(uri):
+        return {
+            'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False},
+            'pool_size': SQLITE_POOL_SIZE,
+            'max_overflow': SQLITE_POOL_SIZE * 2,
+            'pool_timeout': 30,
+        }
+    if make_url(uri).get_backend_name() == 'sqlite':
+        return {}
+    return {'pool_pre_ping': True}
+
+
+def apply_pragmas(connection):
+    """Configure a DB-API SQLite connection (called for every new connection)."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+        if SQLITE_JOURNAL_MODE in _JOURNAL_MODES:
+            cursor.execute(f'PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}')
+        if SQLITE_SYNCHRONOUS in _SYNCHRONOUS:
+            cursor.execute(f'PRAGMA synchronous = {SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA mmap_size = {SQLITE_MMAP_MB * 1024 * 1024}')
+        # Valor negativo: tamaño en KiB en lugar de páginas
+        cursor.execute(f'PRAGMA cache_size = {-SQLITE_CACHE_MB * 1024}')
+    finally:
+        cursor.close()
+
+
+def _on_connect(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_pragmas(dbapi_connection)
+
+
+def install():
+    """Apply :func:`apply_pragmas` to every SQLite connection SQLAlchemy opens."""
+    if not event.contains(Engine, 'connect', _on_connect):
+        event.listen(Engine, 'connect', _on_connect)
+
+
+def checkpoint(path):
+    """Copy the WAL into the database file and truncate it; True on success.
+
+    Needed before ``git add`` (git only sees the main file) and before a
+    pull replaces the file under the WAL.
+    """
+    if not os.path.exists(path):
+        return False
+    try:
+        conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+        try:
+            busy, _, _ = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"[SQLite] Checkpoint failed for {path}: {e}", flush=True)
+        return False
+    return busy == 0
+
+
+def require_checkpoint(path):
+    """:func:`checkpoint` for the git hooks: raise RuntimeError if it did not complete.
+
+    A checkpoint blocked by readers (busy) leaves part of the data in the
+    WAL, so committing or replacing the file then would lose it; raising
+    makes the git sync retry later. A missing file is not an error.
+    """
+    if os.path.exists(path) and not checkpoint(path):
+        raise RuntimeError(f"WAL checkpoint of {os.path.basename(path)} did not complete (database busy)")
@@ -0,0 +1,27 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Los módulos de web/ se importan como módulos de primer nivel (models, mod_index...)
+WEB_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(WEB_DIR))
+
+
+@pytest.fixture(scope='session')
+def webapp(tmp_path_factory):
+    """El módulo ``app`` con bases de datos temporales (nunca instance/blurkit.db)."""
+    workdir = tmp_path_factory.mktemp('webapp')
+    os.environ.pop('FLASK_ENV', None)
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{workdir / 'blurkit.db'}",
+        'HISTORY_DATABASE_URL': f"sqlite:///{workdir / 'history.db'}",
+        'RATE_LIMIT_DB': str(workdir / 'rate_limits.db'),
+        'GPT_JOBS_DB': str(workdir / 'gpt_jobs.db'),
+    })
+    import app as webapp
+
+    with webapp.app.app_context():
+        webapp.db.create_all()
+    return webapp
@@ -0,0 +1,71 @@
+"""Paridad del extractor de una sola pasada con la implementación anterior."""
+
+import pytest
+
+import analyze_mc_log_utils as current
+import benchmark
+import gen_lunar_log
+from tests import legacy_analyze_mc_log_utils as legacy
+
+# La versión anterior solo definía ``skip`` al ver un Entrypoint fuera de
+# mods.<nombre>: con esta línea al principio se puede comparar con cualquier log
+PRIMER = "[14:22:00] [main/INFO]: Found Entrypoint(main) net.fabricmc.fabric.impl.lookup.ApiLookupImpl"
+
+
+def _fixture_logs():
+    with open(benchmark.WEB_DIR / 'logs_normales.txt', encoding='utf-8') as f:
+        normal = f.read().splitlines()
+    return {
+        'lunar_sample': gen_lunar_log.LUNAR_SAMPLE.splitlines(),
+        'logs_normales': normal,
+        'empty': [],
+    }
+
+
+def _generated_logs():
+    logs = {}
+    for loader in gen_lunar_log.LOADERS:
+        logs[f'{loader}_generated'] = gen_lunar_log.generate_log(
+            loader=loader, lines=3000, mods=40, prohibited=['wurst', 'baritone'],
+            chat_ratio=0.4, duplicate_ratio=0.2, seed=7)
+    logs['mc_synthetic'] = benchmark._mc_log_lines(3000)
+    # Todo junto, en el orden de un log real concatenado
+    logs['concatenated'] = [line for lines in list(logs.values()) for line in lines]
+    return logs
+
+
+LOGS = {**_fixture_logs(), **_generated_logs()}
+
+
+@pytest.fixture(params=sorted(LOGS), ids=str)
+def log_lines(request):
+    return [PRIMER] + LOGS[request.param]
+
+
+def test_extract_mods_matches_previous_implementation(log_lines):
+    assert current.extract_mods(log_lines) == legacy.extract_mods(log_lines)
+
+
+def test_extract_mods_accepts_any_iterable(log_lines):
+    assert current.extract_mods(iter(log_lines)) == current.extract_mods(log_lines)
+
+
+def test_analyze_log_lines_with_chat_matches_previous_implementation(log_lines):
+    result = current.analyze_log_lines(log_lines, include_chat=True)
+    # ``phases`` es nuevo: el resto del resultado tiene que coincidir
+    result.pop('phases')
+    assert result == legacy.analyze_log_lines(log_lines)
+
+
+def test_first_entrypoint_under_mods_package():
+    lines = [
+        "[14:22:00] [main/INFO]: Found Entrypoint(client) me.example.mods.sodium.client.SodiumClientMod",
+        "[14:22:01] [main/INFO]: Found Entrypoint(main) net.fabricmc.fabric.impl.lookup.ApiLookupImpl",
+    ]
+    # La versión anterior fallaba con UnboundLocalError en este caso
+    with pytest.raises(UnboundLocalError):
+        legacy.extract_mods(lines)
+    result = current.extract_mods(lines)
+    assert 'sodium' in [mod['name'] for mod in result['mods']]
+    # Desde la segunda línea las dos versiones coinciden
+    assert result == legacy.extract_mods([PRIMER] + lines)
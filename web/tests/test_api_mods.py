@@ -0,0 +1,85 @@
+"""/api/mods: validación de parámetros, paginación por cursor y ETag."""
+
+import pytest
+
+API_MODS_NAMES = ['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo']
+
+
+@pytest.fixture(scope='module')
+def client(webapp):
+    with webapp.app.app_context():
+        webapp.Mod.query.delete()
+        webapp.db.session.add_all(
+            webapp.Mod(name=name, status='prohibido' if i % 2 else 'permitido', category='Test')
+            for i, name in enumerate(API_MODS_NAMES)
+        )
+        webapp.db.session.commit()
+        webapp.mod_index.invalidate()
+    return webapp.app.test_client()
+
+
+@pytest.mark.parametrize('limit', ['abc', '0', '-3', '1.5'])
+def test_bad_limit(client, limit):
+    response = client.get(f'/api/mods?limit={limit}')
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('after', ['', 'x' * 201])
+def test_malformed_cursor(client, after):
+    response = client.get('/api/mods', query_string={'after': after})
+    assert response.status_code == 400
+    assert 'after' in response.get_json()['error']
+
+
+def test_unknown_field(client):
+    response = client.get('/api/mods?fields=name,secret')
+    assert response.status_code == 400
+    data = response.get_json()
+    assert 'secret' in data['error']
+    assert 'name' in data['fields']
+
+
+def test_paging_across_cursors(client):
+    names = []
+    url = '/api/mods?limit=2&fields=name'
+    pages = 0
+    while url:
+        data = client.get(url).get_json()
+        names += [m['name'] for m in data['mods']]
+        assert list(data['mods'][0]) == ['name']
+        url = data['next']
+        pages += 1
+    assert names == API_MODS_NAMES
+    assert pages == 3
+
+    data = client.get('/api/mods?limit=2&status=prohibido').get_json()
+    assert [m['name'] for m in data['mods']] == ['Bravo', 'Delta']
+    assert data['next_cursor'] is None
+
+
+def test_matching_etag_returns_304(client):
+    first = client.get('/api/mods?limit=2')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    again = client.get('/api/mods?limit=2', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    # Otra consulta tiene otro ETag
+    other = client.get('/api/mods?limit=3', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+
+
+def test_etag_changes_with_the_catalogue(client, webapp):
+    etag = client.get('/api/mods').headers['ETag']
+    with webapp.app.app_context():
+        mod = webapp.Mod(name='Foxtrot', status='permitido')
+        webapp.db.session.add(mod)
+        webapp.db.session.commit()
+        try:
+            response = client.get('/api/mods', headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert 'Foxtrot' in [m['name'] for m in response.get_json()['mods']]
+        finally:
+            webapp.db.session.delete(mod)
+            webapp.db.session.commit()
@@ -0,0 +1,95 @@
+"""Lotes de /api/analyze_batch: límite de bytes y pool de procesos."""
+
+import io
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import batch_analysis
+import gen_lunar_log
+from log_stream import LogTooLargeError
+
+
+def _upload(name, data):
+    return FileStorage(io.BytesIO(data), filename=name)
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_batch_within_budget(tmp_path):
+    files = [_upload('a.log', b'x' * 1000), _upload('b.zip', _zip({'c.log': b'y' * 1000}))]
+    entries, skipped = batch_analysis.collect_logs(files, str(tmp_path), max_bytes=2000)
+    assert [name for _, name in entries] == ['a.log', 'b.zip/c.log']
+    assert skipped == []
+
+
+def test_plain_files_over_budget(tmp_path):
+    files = [_upload(f'{i}.log', b'x' * 1000) for i in range(3)]
+    with pytest.raises(LogTooLargeError):
+        batch_analysis.collect_logs(files, str(tmp_path), max_bytes=2500)
+
+
+def test_zip_bomb_over_budget_is_rejected_before_extracting(tmp_path):
+    # Comprime muy bien: 200 miembros de 1 MB caben en unos pocos KB
+    archive = _zip({f'{i}.log': b'\n' * (1024 * 1024) for i in range(200)})
+    with pytest.raises(LogTooLargeError):
+        batch_analysis.collect_logs([_upload('bomb.zip', archive)], str(tmp_path), max_bytes=8 * 1024 * 1024)
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 8 * 1024 * 1024
+
+
+def test_process_pool_uses_spawn_and_matches_inline(tmp_path):
+    paths = []
+    for i, loader in enumerate(gen_lunar_log.LOADERS):
+        path = tmp_path / f'{i}.log'
+        gen_lunar_log.write_log(str(path), loader=loader, lines=3000, seed=i)
+        paths.append((str(path), path.name))
+    analyzer = batch_analysis.BatchAnalyzer(max_workers=2, inline_max_bytes=0)
+    analyzer.start()
+    try:
+        assert analyzer._executor._mp_context.get_start_method() == 'spawn'
+        pooled = analyzer.analyze(paths)
+        # Sin caer en el análisis en línea por un fallo del pool
+        assert analyzer._executor is not None
+    finally:
+        analyzer.shutdown()
+    assert pooled == [batch_analysis.analyze_path(path, name) for path, name in paths]
+
+
+MAIN_SCRIPT = '''
+import sys
+sys.path.insert(0, {web_dir!r})
+# Efecto de importar el script (como la configuración de app.py)
+with open({marker!r}, 'a') as f:
+    f.write('imported\\n')
+
+import batch_analysis
+
+if __name__ == '__main__':
+    analyzer = batch_analysis.BatchAnalyzer(max_workers=2, inline_max_bytes=0)
+    results = analyzer.analyze([({log!r}, 'a.log'), ({log!r}, 'b.log')])
+    assert analyzer._executor is not None
+    analyzer.shutdown()
+    print(len(results))
+'''
+
+
+def test_pool_processes_do_not_rerun_the_main_script(tmp_path):
+    log = tmp_path / 'latest.log'
+    gen_lunar_log.write_log(str(log), lines=500, seed=1)
+    marker = tmp_path / 'imports.txt'
+    script = tmp_path / 'main_script.py'
+    script.write_text(MAIN_SCRIPT.format(web_dir=os.path.dirname(batch_analysis.__file__), marker=str(marker), log=str(log)))
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['2']
+    assert marker.read_text() == 'imported\n'
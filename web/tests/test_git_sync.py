@@ -0,0 +1,116 @@
+"""Sincronización con git desde varios procesos sobre el mismo árbol de trabajo."""
+
+import multiprocessing
+import sqlite3
+import subprocess
+
+import pytest
+
+import git_sync
+import sqlite_tuning
+
+
+def _git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    remote = tmp_path / 'remote.git'
+    work = tmp_path / 'work'
+    _git(tmp_path, 'init', '-q', '--bare', '-b', 'main', str(remote))
+    _git(tmp_path, 'clone', '-q', str(remote), str(work))
+    _git(work, 'checkout', '-q', '-b', 'main')
+    (work / 'data.txt').write_text('0\n')
+    _git(work, 'add', 'data.txt')
+    _git(work, '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '-m', 'init')
+    _git(work, 'push', '-q', 'origin', 'main')
+    return work
+
+
+def _sync(work, index, barrier, results):
+    barrier.wait()
+    with open(work / 'data.txt', 'a') as f:
+        f.write(f'{index}\n')
+    worker = git_sync.GitSyncWorker(work, ['data.txt'], max_retries=1)
+    try:
+        results.put((index, worker.sync_once(f'change {index}')))
+    except Exception as e:
+        results.put((index, f'error: {e}'))
+
+
+def test_concurrent_syncs_do_not_collide(repo):
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(4)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_sync, args=(repo, i, barrier, results)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    outcomes = dict(results.get(timeout=5) for _ in processes)
+    assert all(not str(o).startswith('error') for o in outcomes.values()), outcomes
+    assert 'pushed' in outcomes.values()
+    # Todo lo escrito llegó al remoto y no quedó ningún index.lock
+    assert _git(repo, 'status', '--porcelain') == ''
+    assert _git(repo, 'rev-parse', 'HEAD') == _git(repo, 'rev-parse', 'origin/main')
+    assert not (repo / '.git' / 'index.lock').exists()
+
+
+def _hold_lock(work, held, release):
+    with git_sync.repo_lock(work):
+        held.set()
+        release.wait(30)
+
+
+def test_repo_lock_is_exclusive_across_processes(repo):
+    ctx = multiprocessing.get_context('spawn')
+    held, release = ctx.Event(), ctx.Event()
+    holder = ctx.Process(target=_hold_lock, args=(repo, held, release))
+    holder.start()
+    try:
+        assert held.wait(30)
+        with pytest.raises(RuntimeError):
+            with git_sync.repo_lock(repo, timeout=0.3):
+                pass
+    finally:
+        release.set()
+        holder.join(30)
+    with git_sync.repo_lock(repo, timeout=1):
+        pass
+
+
+def test_busy_checkpoint_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_tuning, 'SQLITE_BUSY_TIMEOUT_MS', 100)
+    path = str(tmp_path / 'blurkit.db')
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute('PRAGMA journal_mode=WAL')
+    writer.execute('CREATE TABLE t (x)')
+    reader = sqlite3.connect(path, isolation_level=None)
+    reader.execute('BEGIN')
+    reader.execute('SELECT count(*) FROM t').fetchone()
+    # El lector mantiene una instantánea anterior: el WAL no se puede vaciar
+    writer.execute('INSERT INTO t VALUES (1)')
+    with pytest.raises(RuntimeError):
+        sqlite_tuning.require_checkpoint(path)
+    reader.execute('COMMIT')
+    sqlite_tuning.require_checkpoint(path)
+    sqlite_tuning.require_checkpoint(str(tmp_path / 'missing.db'))
+    reader.close()
+    writer.close()
+
+
+def test_failed_prepare_is_retried(repo):
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('database busy')
+
+    (repo / 'data.txt').write_text('changed\n')
+    worker = git_sync.GitSyncWorker(repo, ['data.txt'], max_retries=3, backoff=0.01, prepare=prepare)
+    assert worker._sync_with_retries('change')
+    status = worker.status()
+    assert (status['retries'], status['last_status']) == (1, 'pushed')
+    assert _git(repo, 'rev-parse', 'HEAD') == _git(repo, 'rev-parse', 'origin/main')
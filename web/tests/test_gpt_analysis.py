@@ -0,0 +1,100 @@
+"""El estado de los análisis IA se comparte entre workers (tabla gpt_jobs)."""
+
+import threading
+import time
+
+import pytest
+
+import gpt_analysis
+from gpt_analysis import GptEnricher
+from result_cache import ResultCache
+
+
+@pytest.fixture
+def fake_gpt(monkeypatch):
+    """analyze_chunks falso que espera a ``release`` y cuenta las llamadas."""
+    release = threading.Event()
+    calls = []
+
+    async def analyze_chunks(chunks, api_key, permitidos, prohibidos, **kwargs):
+        calls.append(chunks)
+        release.wait(5)
+        if chunks == ['fallo']:
+            return {'error': 'timeout'}
+        return {'mods_prohibidos': ['wurst'], 'chunks': len(chunks)}
+
+    monkeypatch.setattr(gpt_analysis, 'analyze_chunks', analyze_chunks)
+    return release, calls
+
+
+def _wait_for(enricher, key, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        current = enricher.status(key)
+        if current['status'] == status:
+            return current
+        time.sleep(0.01)
+    raise AssertionError(f'{key} never reached {status}: {enricher.status(key)}')
+
+
+def test_status_is_shared_between_workers(tmp_path, fake_gpt):
+    release, calls = fake_gpt
+    db_path = tmp_path / 'gpt_jobs.db'
+    # Dos workers: cada uno con su caché en memoria, la misma tabla de trabajos
+    first = GptEnricher(ResultCache(), db_path=db_path)
+    second = GptEnricher(ResultCache(), db_path=db_path)
+
+    assert second.status('k')['status'] == 'unknown'
+    assert first.submit('k', ['chunk'], 'key', [], [])['status'] == 'pending'
+    assert second.status('k')['status'] == 'pending'
+    # El otro worker no lanza un segundo análisis de la misma clave
+    assert second.submit('k', ['chunk'], 'key', [], [])['status'] == 'pending'
+
+    release.set()
+    done = _wait_for(second, 'k', 'done')
+    assert done['result'] == {'mods_prohibidos': ['wurst'], 'chunks': 1}
+    assert len(calls) == 1
+
+
+def test_errors_are_shared_and_can_be_retried(tmp_path, fake_gpt):
+    release, calls = fake_gpt
+    release.set()
+    db_path = tmp_path / 'gpt_jobs.db'
+    first = GptEnricher(ResultCache(), db_path=db_path)
+    second = GptEnricher(ResultCache(), db_path=db_path)
+
+    first.submit('k', ['fallo'], 'key', [], [])
+    assert _wait_for(second, 'k', 'error')['result'] == {'error': 'timeout'}
+    assert second.submit('k', ['chunk'], 'key', [], [])['status'] == 'pending'
+    assert _wait_for(first, 'k', 'done')['result']['chunks'] == 1
+    assert len(calls) == 2
+
+
+def test_stale_pending_job_is_claimed_again(tmp_path, fake_gpt):
+    release, calls = fake_gpt
+    release.set()
+    db_path = tmp_path / 'gpt_jobs.db'
+    dead = GptEnricher(ResultCache(), db_path=db_path, stale_after=0.05)
+    # Worker que reclamó la clave y murió antes de terminar
+    assert dead._claim('k')
+    alive = GptEnricher(ResultCache(), db_path=db_path, stale_after=0.05)
+    assert alive.status('k')['status'] == 'pending'
+    time.sleep(0.1)
+    assert alive.status('k')['status'] == 'unknown'
+    assert alive.submit('k', ['chunk'], 'key', [], [])['status'] == 'pending'
+    _wait_for(alive, 'k', 'done')
+    assert len(calls) == 1
+
+
+def test_polling_does_not_touch_cache_counters(fake_gpt):
+    release, _ = fake_gpt
+    release.set()
+    cache = ResultCache()
+    enricher = GptEnricher(cache)
+    enricher.submit('k', ['chunk'], 'key', [], [])
+    _wait_for(enricher, 'k', 'done')
+    for _ in range(5):
+        enricher.status('k')
+        enricher.status('otra')
+    stats = cache.stats()
+    assert (stats['hits'], stats['disk_hits'], stats['misses']) == (0, 0, 0)
@@ -0,0 +1,65 @@
+"""Índices de migrate_add_indexes.py: se crean en bases existentes y SQLite los usa."""
+
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import select, text
+
+from migrate_add_indexes import NEW_INDEXES, create_indexes
+from models import db, Mod, LoginAttempt
+
+CUTOFF = datetime(2000, 1, 1)
+
+PLAN_CHECKS = [
+    ('mods por estado ordenados por nombre',
+     select(Mod).where(Mod.status == 'permitido').order_by(Mod.name).limit(100),
+     'ix_mods_status_name'),
+    ('página siguiente de /api/mods?status=',
+     select(Mod).where(Mod.status == 'prohibido', Mod.name > 'm').order_by(Mod.name).limit(100),
+     'ix_mods_status_name'),
+    ('intentos de login recientes',
+     select(LoginAttempt).where(LoginAttempt.last_attempt >= CUTOFF),
+     'ix_login_attempts_last_attempt'),
+    ('borrado de intentos caducados',
+     LoginAttempt.__table__.delete().where(LoginAttempt.last_attempt < CUTOFF),
+     'ix_login_attempts_last_attempt'),
+]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'blurkit.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'history': f"sqlite:///{tmp_path / 'history.db'}"}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        # Base anterior a los índices: create_all() no los añade a tablas existentes
+        with db.engine.begin() as conn:
+            for name in NEW_INDEXES:
+                conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+        yield app
+
+
+def explain(conn, statement):
+    """Detail column of the EXPLAIN QUERY PLAN rows for a SQLAlchemy statement."""
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    positional = tuple(params[name] for name in compiled.positiontup)
+    return [row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), positional)]
+
+
+def test_create_indexes_is_idempotent(app):
+    assert sorted(create_indexes(db.engine)) == sorted(NEW_INDEXES)
+    assert create_indexes(db.engine) == []
+
+
+@pytest.mark.parametrize('description, statement, index_name', PLAN_CHECKS, ids=[c[0] for c in PLAN_CHECKS])
+def test_query_plan_uses_index(app, description, statement, index_name):
+    create_indexes(db.engine)
+    with db.engine.connect() as conn:
+        plan = explain(conn, statement)
+    # El índice debe usarse y, si hay ORDER BY, sin B-tree temporal
+    assert any(index_name in step for step in plan), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
@@ -0,0 +1,58 @@
+"""Lectura en streaming de logs subidos frente al ``.splitlines()`` anterior."""
+
+import gzip
+import io
+
+import pytest
+
+import gen_lunar_log
+from analyze_mc_log_utils import analyze_log_lines
+from log_stream import MAX_LINE_BYTES, LogTooLargeError, LogUpload, split_raw_lines
+
+TEXT = gen_lunar_log.LUNAR_SAMPLE + '\n'.join(gen_lunar_log.generate_log(loader='fabric', lines=2000, seed=3))
+
+
+def _lines(data, **kwargs):
+    return list(LogUpload(io.BytesIO(data), **kwargs).lines())
+
+
+@pytest.mark.parametrize('eol', ['\n', '\r\n', '\r'], ids=['lf', 'crlf', 'cr'])
+def test_lines_match_splitlines(eol):
+    data = TEXT.replace('\n', eol).encode('utf-8')
+    assert _lines(data) == data.decode('utf-8').splitlines()
+
+
+def test_mixed_and_unicode_separators_match_splitlines():
+    text = 'a\r\nb\rc\n\r\nd\x0be\x0cf g\r\r\nh\n'
+    assert _lines(text.encode('utf-8')) == text.splitlines()
+
+
+def test_gzip_with_bare_cr():
+    data = TEXT.replace('\n', '\r').encode('utf-8')
+    assert _lines(gzip.compress(data)) == TEXT.splitlines()
+
+
+def test_analysis_matches_pasted_text():
+    data = TEXT.replace('\n', '\r').encode('utf-8')
+    assert analyze_log_lines(LogUpload(io.BytesIO(data)).lines()) == analyze_log_lines(TEXT.splitlines())
+
+
+def test_long_lines_are_truncated_not_split():
+    data = b'x' * (MAX_LINE_BYTES * 3) + b'\nshort\r' + ('é' * MAX_LINE_BYTES).encode('utf-8') + b'\rend'
+    lines = _lines(data)
+    assert [len(line) for line in lines[1:2] + lines[3:]] == [5, 3]
+    assert lines[0] == 'x' * MAX_LINE_BYTES
+    # Cortado en un límite de carácter UTF-8, sin caer en latin-1
+    assert set(lines[2]) == {'é'} and len(lines[2]) == MAX_LINE_BYTES // 2
+
+
+@pytest.mark.parametrize('block', [1, 2, 3, 7])
+def test_split_raw_lines_across_block_boundaries(block):
+    data = b'ab\r\n\r\ncdefgh\r\rij\nk'
+    assert list(split_raw_lines(io.BytesIO(data), max_line=4, block=block)) == \
+        [line[:4] for line in data.splitlines()]
+
+
+def test_log_without_line_breaks_is_bounded():
+    with pytest.raises(LogTooLargeError):
+        _lines(b'x' * 5000, max_bytes=4096)
@@ -0,0 +1,56 @@
+"""Registro de recursos cargados desde disco y su panel en /admin/system."""
+
+import os
+
+from ml_integration import ModelRegistry
+
+
+def test_registry_counts_hits_and_reloads(tmp_path):
+    path = tmp_path / 'model.pkl'
+    path.write_text('v1')
+    registry = ModelRegistry()
+    loads = []
+
+    def loader(p):
+        loads.append(p)
+        with open(p) as f:
+            return f.read()
+
+    assert registry.get(path, loader) == 'v1'
+    assert registry.get(path, loader) == 'v1'
+    # Solo cambia la fecha: no se recarga
+    os.utime(path, ns=(0, 0))
+    assert registry.get(path, loader) == 'v1'
+    path.write_text('v2-nuevo')
+    assert registry.get(path, loader) == 'v2-nuevo'
+
+    stats = registry.stats()[str(path)]
+    assert len(loads) == 2
+    assert (stats['hits'], stats['loads'], stats['error']) == (2, 2, None)
+    assert len(stats['sha256']) == 64
+
+
+def test_admin_system_shows_registry(webapp, tmp_path, monkeypatch):
+    registry = ModelRegistry()
+    model = tmp_path / 'hack_detector_model.pkl'
+    model.write_bytes(b'modelo')
+    registry.get(model, lambda p: 'ok')
+    registry.get(model, lambda p: 'ok')
+    monkeypatch.setattr(webapp, 'model_registry', registry)
+
+    with webapp.app.app_context():
+        admin = webapp.User.query.filter_by(username='admin-ml').first()
+        if admin is None:
+            admin = webapp.User(username='admin-ml', email='admin-ml@test', password_hash='x', role='admin')
+            webapp.db.session.add(admin)
+            webapp.db.session.commit()
+        admin_id = admin.id
+    client = webapp.app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+    response = client.get('/admin/system')
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert 'hack_detector_model.pkl' in page
+    assert registry.stats()[str(model)]['sha256'][:12] in page
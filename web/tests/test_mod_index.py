@@ -0,0 +1,41 @@
+"""Índice de mods: búsquedas por nombre/alias y listado completo."""
+
+import pytest
+from flask import Flask
+
+from models import db, Mod
+from mod_index import ModIndex
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'mods.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'history': f"sqlite:///{tmp_path / 'history.db'}"}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_mods_lists_mods_whose_keys_collide(app):
+    db.session.add_all([
+        Mod(name='Sodium', status='permitido', aliases='sodium-fabric'),
+        # Todas sus claves normalizadas ya son del primero
+        Mod(name='SO DIUM', status='prohibido', aliases='Sodium-Fabric, sodium'),
+        Mod(name='Iris', status='permitido'),
+    ])
+    db.session.commit()
+    index = ModIndex()
+    assert [m['name'] for m in index.mods()] == ['Sodium', 'SO DIUM', 'Iris']
+    # En las búsquedas gana el de menor id, como antes
+    assert index.lookup('so dium')['name'] == 'Sodium'
+    assert [m and m['name'] for m in index.classify(['iris', 'nada'])] == ['Iris', None]
+
+
+def test_mods_follow_writes(app):
+    index = ModIndex()
+    assert index.mods() == []
+    db.session.add(Mod(name='Wurst', status='prohibido'))
+    db.session.commit()
+    assert [m['name'] for m in index.mods()] == ['Wurst']
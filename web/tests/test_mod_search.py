@@ -0,0 +1,88 @@
+"""Búsqueda de mods: índice FTS5 y ILIKE buscan en las mismas columnas."""
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+import mod_search
+from models import db, Mod
+from mod_search import ModSearch
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'mods.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'history': f"sqlite:///{tmp_path / 'history.db'}"}
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Mod(name='Sodium', status='permitido', category='Rendimiento', aliases='sodium-fabric'),
+            Mod(name='Wurst', status='prohibido', category='Hack client', description='Cliente con xray'),
+            Mod(name='Iris', status='permitido', category='Shaders', description='Carga de shaders'),
+        ])
+        db.session.commit()
+        yield app
+
+
+def _names(mods):
+    return sorted(m.name for m in mods)
+
+
+@pytest.mark.parametrize('term, expected', [
+    ('xray', ['Wurst']),        # descripción
+    ('hack', ['Wurst']),        # categoría
+    ('fabric', ['Sodium']),     # alias
+    ('xr', ['Wurst']),          # < 3 caracteres: ILIKE en la descripción
+    ('ha', ['Iris', 'Wurst']),  # ILIKE en categoría y descripción
+])
+def test_index_and_like_search_same_columns(app, term, expected):
+    search = ModSearch()
+    assert search.ensure_index()
+    assert _names(search.search(term)) == expected
+    assert _names(search._like(term, None)) == expected
+
+
+def test_index_creation_does_not_commit_request_session(app):
+    db.session.add(Mod(name='Pendiente', status='prohibido'))
+    assert ModSearch().ensure_index()
+    db.session.rollback()
+    assert Mod.query.filter_by(name='Pendiente').first() is None
+
+
+def _fts_objects(kind=None):
+    """Tablas y triggers del índice (o solo los de tipo ``kind``)."""
+    return {name for name, type_ in db.session.execute(
+        text("SELECT name, type FROM sqlite_master WHERE name LIKE 'mods_fts%'")
+    ) if kind in (None, type_)}
+
+
+def test_without_fts5_nothing_is_created(app, monkeypatch):
+    monkeypatch.setattr(mod_search, '_fts5_supported', lambda conn: False)
+    search = ModSearch()
+    assert not search.ensure_index()
+    assert _fts_objects() == set()
+    db.session.add(Mod(name='Lithium', status='permitido'))
+    db.session.commit()
+    assert _names(search.search('lith')) == ['Lithium']
+
+
+def test_synced_index_triggers_are_dropped_without_fts5(app, monkeypatch):
+    # blurkit.db llega con el índice creado en otra máquina
+    assert ModSearch().ensure_index()
+    assert _fts_objects('trigger') == {'mods_fts_ai', 'mods_fts_ad', 'mods_fts_au'}
+
+    monkeypatch.setattr(mod_search, '_fts5_supported', lambda conn: False)
+    assert not ModSearch().ensure_index()
+    assert _fts_objects('trigger') == set()
+    # Las escrituras ya no pasan por los triggers
+    db.session.add(Mod(name='Lithium', status='permitido'))
+    db.session.commit()
+
+    # De vuelta en una máquina con FTS5: triggers recreados y el mod nuevo indexado
+    monkeypatch.undo()
+    search = ModSearch()
+    assert search.ensure_index()
+    assert _fts_objects('trigger') == {'mods_fts_ai', 'mods_fts_ad', 'mods_fts_au'}
+    assert _names(search.search('lithium')) == ['Lithium']
@@ -0,0 +1,33 @@
+"""Tiempo de SQL del profiler, también con sentencias que fallan."""
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from profiling import Profiler
+
+
+def test_failed_statements_do_not_leak_and_are_timed():
+    engine = create_engine('sqlite://')
+    app = Flask(__name__)
+    Profiler(app, enabled=True, sample_rate=0)
+    infos = []
+
+    @app.route('/query')
+    def query():
+        with engine.connect() as conn:
+            for _ in range(50):
+                try:
+                    conn.execute(text('SELECT * FROM missing_table'))
+                except OperationalError:
+                    pass
+            conn.execute(text('SELECT 1')).scalar()
+            infos.append(dict(conn.info))
+        return 'ok'
+
+    response = app.test_client().get('/query')
+    assert response.status_code == 200
+    # Nada acumulado en la conexión, que vuelve al pool y se reutiliza
+    assert infos == [{}]
+    timings = dict(part.split(';') for part in response.headers['Server-Timing'].split(', '))
+    assert 'db' in timings
@@ -0,0 +1,106 @@
+"""Limitador de intentos de login: ventana deslizante, Retry-After y backends."""
+
+import random
+
+import pytest
+
+from rate_limit import MemoryBackend, RateLimiter, SQLiteBackend, _estimate, _retry_after
+
+WINDOW = 100
+LIMIT = 5
+
+
+def _limiter(backend):
+    # Sin la caché de bloqueos, cada consulta llega al backend
+    return RateLimiter(limit=LIMIT, window=WINDOW, backend=backend, block_cache_seconds=0)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def limiter(request, tmp_path):
+    if request.param == 'memory':
+        return _limiter(MemoryBackend(WINDOW))
+    return _limiter(SQLiteBackend(tmp_path / 'rate_limits.db', WINDOW))
+
+
+def test_estimate_weights_the_previous_window():
+    # Ventana actual: bucket 2 (200-299)
+    assert _estimate(2, 3, 4, 200, WINDOW) == 3 + 4
+    assert _estimate(2, 3, 4, 275, WINDOW) == 3 + 4 * 0.25
+    # La entrada es de la ventana anterior: sus intentos pasan a ser los previos
+    assert _estimate(1, 4, 9, 250, WINDOW) == 4 * 0.5
+    # Más antigua: ya no cuenta
+    assert _estimate(0, 9, 9, 250, WINDOW) == 0
+
+
+def test_retry_after_values():
+    # Límite alcanzado en esta ventana: cambio de ventana más lo que tarden en pesar menos
+    assert _retry_after(1, 5, 0, 194, WINDOW, LIMIT) == 6
+    assert _retry_after(1, 10, 0, 150, WINDOW, LIMIT) == 50 + 50
+    # Bloqueado por los intentos de la ventana anterior
+    assert _retry_after(2, 1, 8, 200, WINDOW, LIMIT) == 50
+    assert _retry_after(2, 1, 8, 220, WINDOW, LIMIT) == 30
+    # Ya por debajo del límite
+    assert _retry_after(2, 1, 8, 260, WINDOW, LIMIT) == 0
+    assert _retry_after(0, 9, 9, 250, WINDOW, LIMIT) == 0
+
+
+def test_limit_at_a_window_boundary(limiter):
+    for t in range(190, 195):
+        status = limiter.hit('ip', 'user', now=t)
+    assert status.blocked and status.attempts == LIMIT
+    assert status.retry_after == 6
+    assert limiter.check('ip', now=199.9).blocked
+    # Cambiar de ventana no reinicia el contador: una ráfaga no se libera sola
+    assert limiter.check('ip', now=200).blocked
+    assert not limiter.check('ip', now=200.5).blocked
+    assert limiter.check('ip', now=250).attempts == 2
+
+
+def test_retry_after_is_when_the_key_unblocks(limiter):
+    rng = random.Random(3)
+    now = 1000.0
+    for _ in range(200):
+        now += rng.uniform(0, 30)
+        status = limiter.hit('ip', now=now)
+        if status.blocked:
+            assert status.retry_after >= 1
+            if status.retry_after > 1:
+                assert limiter.check('ip', now=now + status.retry_after - 1).blocked
+            assert not limiter.check('ip', now=now + status.retry_after + 0.01).blocked
+
+
+def test_memory_and_sqlite_backends_agree(tmp_path):
+    memory = _limiter(MemoryBackend(WINDOW))
+    sqlite = _limiter(SQLiteBackend(tmp_path / 'rate_limits.db', WINDOW))
+    rng = random.Random(7)
+    now = 5000.0
+    for _ in range(500):
+        now += rng.choice([0.5, 3, 20, 80, 150])
+        key = rng.choice(['a', 'b', 'c'])
+        action = rng.random()
+        if action < 0.6:
+            results = [limiter.hit(key, f'user-{key}', now=now) for limiter in (memory, sqlite)]
+        elif action < 0.95:
+            results = [limiter.check(key, now=now) for limiter in (memory, sqlite)]
+        else:
+            for limiter in (memory, sqlite):
+                limiter.reset(key)
+            continue
+        assert results[0] == results[1]
+    assert sorted(memory.active(now=now)) == sorted(sqlite.active(now=now))
+
+
+def test_sqlite_backends_share_one_file(tmp_path):
+    path = tmp_path / 'rate_limits.db'
+    first = _limiter(SQLiteBackend(path, WINDOW))
+    second = _limiter(SQLiteBackend(path, WINDOW))
+    for t in range(LIMIT - 1):
+        first.hit('ip', 'user', now=100 + t)
+    # Cada worker suma sobre la misma fila
+    status = second.hit('ip', 'user', now=110)
+    assert status.blocked and status.attempts == LIMIT
+    assert first.check('ip', now=111).blocked
+    assert [s.key for s in first.active(now=111)] == ['ip']
+    second.reset('ip')
+    assert not first.check('ip', now=112).blocked
+    assert first.clear() == 0
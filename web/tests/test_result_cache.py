@@ -0,0 +1,44 @@
+"""Límites de la caché de resultados en memoria."""
+
+from result_cache import ResultCache
+
+
+def _payload_size(value):
+    cache = ResultCache()
+    cache.set('probe', value)
+    return cache.stats()['bytes']
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    value = {'errors': ['x' * 1000] * 10}
+    size = _payload_size(value)
+    cache = ResultCache(max_entries=1000, max_bytes=size * 5)
+    for i in range(20):
+        cache.set(f'k{i}', value)
+    stats = cache.stats()
+    assert stats['bytes'] <= size * 5
+    assert stats['entries'] == 5
+    assert stats['evictions'] == 15
+    # Se conservan las más recientes
+    assert cache.get('k19') == value
+    assert cache.get('k0') is None
+
+
+def test_oversized_results_skip_the_memory_tier(tmp_path):
+    big = {'errors': ['error line'] * 10000}
+    cache = ResultCache(max_bytes=_payload_size(big) * 2, db_path=str(tmp_path / 'cache.db'))
+    cache.set('big', big)
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['oversized'] == 1
+    # Sigue disponible en el nivel SQLite
+    assert cache.get('big') == big
+
+
+def test_replacing_and_expiring_keep_the_byte_count():
+    cache = ResultCache()
+    cache.set('a', {'v': 'x' * 100})
+    cache.set('a', {'v': 'y' * 10})
+    assert cache.stats()['bytes'] == _payload_size({'v': 'y' * 10})
+    cache.ttl = -1
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0
@@ -0,0 +1,84 @@
+"""Startup warm-up and readiness report for ``/healthz``.
+
+Right after a start, the first real request paid for opening the
+database, creating the version counter and the search index and
+building the mod index. :class:`Warmup` runs those steps once in a
+background thread, inside an app context, and records how each one
+went. ``/healthz`` answers 503 until every step has succeeded, so the
+desktop launcher (run_app.py) and deploy health checks only send users
+to a warm server.
+"""
+
+import threading
+import time
+
+
+class Warmup:
+    """Run named warm-up steps once, in the background.
+
+    ``steps`` is a list of ``(name, callable)``; each callable may return
+    a short detail string for the report. A run with failed steps can be
+    started again (e.g. by the next ``/healthz``).
+    """
+
+    def __init__(self, app, steps):
+        self.app = app
+        self.steps = list(steps)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._done = threading.Event()
+        self._checks = {name: {'ok': False, 'ms': None} for name, _ in self.steps}
+        self.started_at = None
+        self.ready_at = None
+
+    def start(self):
+        """Start the warm-up thread unless it is running or already succeeded."""
+        with self._lock:
+            if self.ready or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._done.clear()
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+            self._thread.start()
+
+    def run(self):
+        with self.app.app_context():
+            for name, step in self.steps:
+                if self._checks[name]['ok']:
+                    continue
+                start = time.perf_counter()
+                check = {'ok': True}
+                try:
+                    detail = step()
+                    if detail:
+                        check['detail'] = detail
+                except Exception as e:
+                    check = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+                    print(f"[Warmup] {name} failed: {e}", flush=True)
+                check['ms'] = round((time.perf_counter() - start) * 1000, 1)
+                self._checks[name] = check
+        if self.ready:
+            self.ready_at = time.time()
+            print(f"[Warmup] Ready in {(self.ready_at - self.started_at) * 1000:.0f} ms", flush=True)
+        self._done.set()
+
+    @property
+    def ready(self):
+        return all(check['ok'] for check in self._checks.values())
+
+    def wait(self, timeout=None):
+        """Block until the current run finishes; returns :attr:`ready`."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def report(self):
+        if self.ready:
+            status = 'ok'
+        elif self._done.is_set():
+            status = 'error'
+        else:
+            status = 'starting'
+        return {
+            'status': status,
+            'checks': {name: dict(check) for name, check in self._checks.items()},
+        }